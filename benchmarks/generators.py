@@ -0,0 +1,51 @@
+"""
+Synthetic data generators for the benchmark suite.
+
+They follow create_sample_data (a random-walk price with a volume column)
+but are fully vectorized, so 10^7 ticks can be generated in a second.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from trading_bot.kline_store import KLINE_COLUMNS
+
+
+def synthetic_ticks(n: int, start: str = "2024-01-01", freq: str = "s", seed: int = 42) -> pd.DataFrame:
+    """Random-walk price ticks with columns timestamp, price, volume."""
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0.0, 0.05, n)  # Per-tick moves, scaled down from the daily sample data
+    prices = np.maximum(100.0 + np.cumsum(steps), 1.0)
+    return pd.DataFrame({
+        "timestamp": pd.date_range(start=start, periods=n, freq=freq),
+        "price": prices,
+        "volume": rng.integers(1000, 10000, n)
+    })
+
+
+def synthetic_triangle(n: int, seed: int = 7):
+    """Aligned close times and BTCUSDT, SOLUSDT, SOLBTC closes with small mispricings."""
+    rng = np.random.default_rng(seed)
+    times = 1752364800000 + np.arange(n, dtype=np.int64) * 60000
+    btc = 60000 + np.cumsum(rng.normal(0, 10, n))
+    sol = 150 + np.cumsum(rng.normal(0, 0.1, n))
+    solbtc = sol / btc * (1 + rng.normal(0, 0.0005, n))
+    return times, btc, sol, solbtc
+
+
+def write_kline_csv(directory: str, symbol: str, day: str, n: int, seed: int = 11) -> str:
+    """Write a Binance-style kline CSV with n rows and microsecond timestamps."""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.1, n))
+    open_time = 1752364800000000 + np.arange(n, dtype=np.int64) * 1000000
+    frame = pd.DataFrame({
+        "open_time": open_time, "open": close, "high": close, "low": close, "close": close,
+        "volume": rng.random(n), "close_time": open_time + 999999, "quote_asset_volume": rng.random(n),
+        "num_trades": rng.integers(1, 100, n), "taker_buy_base": rng.random(n),
+        "taker_buy_quote": rng.random(n), "ignore": 0
+    }, columns=KLINE_COLUMNS)
+    path = os.path.join(directory, f"{symbol}-1s-{day}.csv")
+    frame.to_csv(path, header=False, index=False)
+    return path
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the backtest, spread calculation and data-loading hot paths.
+
+Every (case, size) runs in a fresh process so peak RSS belongs to that case
+alone. Results are printed and saved as JSON so two commits can be compared:
+
+    python benchmarks/run_benchmarks.py --sizes 1e4,1e6 --save benchmarks/results/base.json
+    python benchmarks/run_benchmarks.py --sizes 1e4,1e6 --compare benchmarks/results/base.json
+"""
+
+import sys
+import os
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+# Add src and this directory to path
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from trading_bot.backtest import Backtest
+from trading_bot.data_fetcher import DataFetcher
+from trading_bot.depth import DepthEvaluator, SimulatedDepthFeed
+from trading_bot.kernels import KernelStrategy, TickAdapter
+from trading_bot.kline_store import KLINE_COLUMNS, KlineStore
+from trading_bot.stats import OnlineStats
+from trading_bot.triangular_backtest import scan_triangle
+from generators import synthetic_ticks, synthetic_triangle, write_kline_csv
+
+# name -> (setup function, largest size it is run at or None)
+CASES = {}
+
+# case -> (reference case, least speedup over it at the same size); checked after every run
+SPEEDUPS = {
+    "backtest_vectorized": ("backtest_tick", 2.0),
+    "backtest_kernel": ("backtest_tick", 2.0),
+    "stats_extend": ("stats_update", 2.0),
+}
+
+def case(name, max_size=None):
+    """
+    Register a benchmark. The function does its setup and returns the callable
+    to time, or (callable, cleanup) when the setup leaves files to remove.
+    """
+    def register(setup):
+        CASES[name] = (setup, max_size)
+        return setup
+    return register
+
+class BandStrategy:
+    """Buys in the bottom band of the price range and sells in the top band, so both paths trade."""
+
+    def __init__(self, data):
+        self.low, self.high = np.quantile(data["price"].to_numpy(), [0.2, 0.8])
+
+    def on_tick(self, data):
+        if data["price"] < self.low:
+            return {"side": "buy", "qty": 1}
+        if data["price"] > self.high:
+            return {"side": "sell", "qty": 1}
+        return None
+
+    def generate_signals(self, data):
+        prices = data["price"].to_numpy()
+        return np.where(prices < self.low, 1, np.where(prices > self.high, -1, 0))
+
+class BandKernel(KernelStrategy):
+    """BandStrategy as a kernel; the bands are passed in the state array."""
+
+    def __init__(self, data):
+        self.low, self.high = np.quantile(data["price"].to_numpy(), [0.2, 0.8])
+
+    @staticmethod
+    def kernel(price, volume, state, out):
+        for i in range(price.shape[0]):
+            if price[i] < state[0]:
+                out[i] = 1.0
+            elif price[i] > state[1]:
+                out[i] = -1.0
+
+    @staticmethod
+    def numpy_kernel(price, volume, state, out):
+        # What runs without numba (see kernels.kernel_function)
+        out[:] = np.where(price < state[0], 1.0, np.where(price > state[1], -1.0, 0.0))
+
+    def initial_state(self):
+        return np.array([self.low, self.high])
+
+@case("backtest_tick", max_size=10**5)
+def bench_backtest_tick(n):
+    data = synthetic_ticks(n)
+    strategy = BandStrategy(data)
+    return lambda: Backtest(initial_capital=10**6).run(data, strategy, mode="tick")
+
+@case("backtest_vectorized")
+def bench_backtest_vectorized(n):
+    data = synthetic_ticks(n)
+    strategy = BandStrategy(data)
+    return lambda: Backtest(initial_capital=10**6).run(data, strategy, mode="vectorized")
+
+@case("backtest_kernel")
+def bench_backtest_kernel(n):
+    data = synthetic_ticks(n)
+    strategy = BandKernel(data)
+    return lambda: Backtest(initial_capital=10**6).run(data, strategy, mode="kernel")
+
+@case("backtest_tick_adapter", max_size=10**6)
+def bench_backtest_tick_adapter(n):
+    data = synthetic_ticks(n)
+    strategy = TickAdapter(BandStrategy(data))
+    return lambda: Backtest(initial_capital=10**6).run(data, strategy, mode="vectorized")
+
+@case("stats_update", max_size=10**6)
+def bench_stats_update(n):
+    # What the tick path calls once per row
+    equity = (synthetic_ticks(n)["price"].to_numpy() * 100).tolist()
+    timestamps = list(range(n))
+
+    def run():
+        stats = OnlineStats(equity[0])
+        for value, ts in zip(equity, timestamps):
+            stats.update(value, 1.0, ts)
+    return run
+
+@case("stats_extend")
+def bench_stats_extend(n):
+    # What the vectorized/kernel paths call once per chunk
+    equity = synthetic_ticks(n)["price"].to_numpy() * 100
+    positions = np.ones(n)
+    timestamps = np.arange(n, dtype=np.int64)
+    chunk = 100_000
+
+    def run():
+        stats = OnlineStats(equity[0])
+        for start in range(0, n, chunk):
+            stop = start + chunk
+            stats.extend(equity[start:stop], positions[start:stop], timestamps[start:stop])
+    return run
+
+@case("calculate_spread", max_size=10**6)
+def bench_calculate_spread(n):
+    _, btc, _, _ = synthetic_triangle(n)
+    binance, kraken = btc.tolist(), (btc * 1.001).tolist()
+    return lambda: [DataFetcher.calculate_spread(a, b) for a, b in zip(binance, kraken)]
+
+@case("triangle_scan")
+def bench_triangle_scan(n):
+    times, btc, sol, solbtc = synthetic_triangle(n)
+    return lambda: scan_triangle(times, sol, solbtc, btc, 0.05)
+
+@case("depth_updates", max_size=10**5)
+def bench_depth_updates(n):
+    # Two venues, 20 levels a side; the diffs are made up front so only the evaluator is timed
+    feeds = [SimulatedDepthFeed("binance", "BTCUSDT", 60000.0, seed=1),
+             SimulatedDepthFeed("kraken", "BTCUSDT", 60000.0, seed=2)]
+    snapshots = [(feed.exchange, feed.snapshot()) for feed in feeds]
+    updates = [(feed.exchange, feed.step()) for _ in range(n // 2) for feed in feeds]
+
+    def run():
+        evaluator = DepthEvaluator({"binance": 0.1, "kraken": 0.26})
+        for venue, (bids, asks) in snapshots:
+            evaluator.update(venue, "BTCUSDT", bids, asks, ts=0.0, snapshot=True)
+        for venue, (bids, asks) in updates:
+            evaluator.update(venue, "BTCUSDT", bids, asks, ts=0.0)
+    return run
+
+@case("kline_csv_parse", max_size=10**6)
+def bench_kline_csv_parse(n):
+    import pandas as pd
+    directory = tempfile.TemporaryDirectory(prefix="bench_klines_")
+    path = write_kline_csv(directory.name, "BTCUSDT", "2025-07-13", n)
+    # The loader the historical script used before the columnar store
+    return lambda: pd.read_csv(path, header=None, names=KLINE_COLUMNS)[["close_time", "close"]], directory.cleanup
+
+@case("kline_store_load")
+def bench_kline_store_load(n):
+    directory = tempfile.TemporaryDirectory(prefix="bench_klines_")
+    store = KlineStore(os.path.join(directory.name, "store"))
+    store.ingest_csv(write_kline_csv(directory.name, "BTCUSDT", "2025-07-13", n))
+    # Sum the closes so every mapped page is really read
+    return lambda: float(store.load_day("BTCUSDT", "1s", "2025-07-13")["close"].sum()), directory.cleanup
+
+def measure(name, size, repeat, trace_allocs):
+    """Run one case in this (fresh) process and return its measurements."""
+    setup, _ = CASES[name]
+    run = setup(size)
+    cleanup = None
+    if isinstance(run, tuple):
+        run, cleanup = run  # The case made files that must not outlive it
+    try:
+        return _measure(run, name, size, repeat, trace_allocs)
+    finally:
+        if cleanup is not None:
+            cleanup()
+
+def _measure(run, name, size, repeat, trace_allocs):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    seconds = min(timings)
+    result = {
+        "case": name,
+        "size": size,
+        "seconds": seconds,
+        "ticks_per_sec": size / seconds if seconds > 0 else float("inf"),
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 ** 2 if sys.platform == "darwin" else 1024),
+    }
+    if trace_allocs:
+        # A separate pass: tracing slows the code down too much to time it
+        tracemalloc.start()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        result["alloc_peak_mb"] = peak / 1024 ** 2
+        result["alloc_blocks"] = sum(stat.count for stat in snapshot.statistics("filename"))
+    return result
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def compare(results, baseline_path, tolerance):
+    """Print speed ratios against a saved baseline; return the regressed entries."""
+    with open(baseline_path) as f:
+        baseline = {(r["case"], r["size"]): r for r in json.load(f)["results"]}
+    regressions = []
+    print(f"\nCompared with {baseline_path}:")
+    for r in results:
+        old = baseline.get((r["case"], r["size"]))
+        if old is None:
+            continue
+        ratio = r["ticks_per_sec"] / old["ticks_per_sec"]
+        flag = "  ❌ regression" if ratio < 1 - tolerance else ""
+        print(f"  {r['case']:<20} {r['size']:>10,}  {ratio:6.2f}x speed  "
+              f"RSS {r['peak_rss_mb'] - old['peak_rss_mb']:+8.1f} MB{flag}")
+        if flag:
+            regressions.append(r)
+    return regressions
+
+def check_speedups(results):
+    """Print each case's speed against its reference case; return the ones below their minimum."""
+    by_key = {(r["case"], r["size"]): r for r in results}
+    failures = []
+    for r in results:
+        if r["case"] not in SPEEDUPS:
+            continue
+        reference, minimum = SPEEDUPS[r["case"]]
+        base = by_key.get((reference, r["size"]))
+        if base is None:
+            continue
+        ratio = r["ticks_per_sec"] / base["ticks_per_sec"]
+        flag = f"  ❌ expected at least {minimum:g}x" if ratio < minimum else ""
+        print(f"  {r['case']:<20} {r['size']:>10,}  {ratio:6.2f}x {reference}{flag}")
+        if flag:
+            failures.append(r)
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the trading bot hot paths")
+    parser.add_argument("--sizes", default="1e4,1e6,1e7", help="Comma-separated tick counts")
+    parser.add_argument("--cases", default=",".join(CASES), help="Comma-separated case names")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case (best is kept)")
+    parser.add_argument("--trace-allocs", action="store_true", help="Also measure allocations with tracemalloc")
+    parser.add_argument("--no-size-cap", action="store_true",
+                        help="Run per-tick cases at every size, even past their normal cap")
+    parser.add_argument("--save", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    sizes = [int(float(size)) for size in args.sizes.split(",")]
+    results = []
+    context = multiprocessing.get_context("spawn")
+    print(f"{'case':<20} {'size':>10}  {'seconds':>9}  {'ticks/sec':>14}  {'peak RSS':>9}")
+    for name in args.cases.split(","):
+        _, max_size = CASES[name]
+        for size in sizes:
+            if max_size is not None and size > max_size and not args.no_size_cap:
+                print(f"{name:<20} {size:>10,}  skipped (per-tick path, cap {max_size:,})")
+                continue
+            # One fresh process per measurement keeps peak RSS per case
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                r = pool.submit(measure, name, size, args.repeat, args.trace_allocs).result()
+            results.append(r)
+            allocs = f"  allocs {r['alloc_peak_mb']:.1f} MB / {r['alloc_blocks']:,} blocks" if args.trace_allocs else ""
+            print(f"{name:<20} {size:>10,}  {r['seconds']:9.4f}  {r['ticks_per_sec']:14,.0f}  "
+                  f"{r['peak_rss_mb']:6.0f} MB{allocs}")
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=1)
+        print(f"\nSaved {len(results)} results to {args.save}")
+    print("\nSpeedups:")
+    failed = check_speedups(results)
+    if args.compare and compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -3,44 +3,173 @@
 Simple arbitrage bot that monitors BTC/USDT prices on Binance and Bitget
 """
 
+import time
+
+STARTED = time.perf_counter()  # Reference point for the startup report
+
 import sys
 import os
-import time
+import argparse
+import logging
+import threading
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from trading_bot.strategy import ArbitrageStrategy
 from trading_bot.data_fetcher import DataFetcher
+from trading_bot.journal import TradeJournal, setup_console_logging
+from trading_bot.metrics import start_metrics
+from trading_bot.scheduler import AdaptivePoller
+from trading_bot.stats import OnlineStats
+
+IMPORTED = time.perf_counter()
+
+log = logging.getLogger("run_arbitrage")
+
+def print_startup(first_quote_at):
+    imports_ms = (IMPORTED - STARTED) * 1000
+    first_quote_ms = (first_quote_at - STARTED) * 1000
+    log.info(f"⏱️  Startup: imports {imports_ms:.0f} ms, first quote {first_quote_ms:.0f} ms")
+
+def print_signal(signal):
+    log.info(f"🎯 ARBITRAGE OPPORTUNITY FOUND!")
+    log.info(f"   Buy: {signal['buy_exchange']} at ${signal['buy_price']:,.2f}")
+    log.info(f"   Sell: {signal['sell_exchange']} at ${signal['sell_price']:,.2f}")
+    log.info(f"   Spread: {signal['spread_pct']:.3f}%")
+    log.info(f"   Quantity: {signal['qty']} BTC")
+    log.info("   💡 In a real bot, you would execute these trades here!")
+    log.info("")
+
+def print_paper_stats(stats):
+    summary = stats.snapshot()
+    log.info(f"📈 Paper P&L over {summary['ticks']} ticks: {summary['total_return_pct']:+.3f}% | "
+             f"max drawdown {summary['max_drawdown_pct']:.3f}% | "
+             f"{stats.closed_trades} trades, {summary['win_rate_pct']:.0f}% won")
+
+def run_streaming(strategy, record_dir=None, replay_dir=None, symbol="BTCUSDT", journal=None):
+    """
+    React to every best bid/ask change from the Binance and Kraken streams
+    instead of polling. With replay_dir, frames recorded earlier with
+    record_dir are played back through a local replay server. Signals are
+    written to the journal when one is given.
+    """
+    from trading_bot.stream import (BookTopCache, LineSocketTransport, MarketDataFeed, RecordingTransport,
+                                    ReplayServer, WebSocketTransport, load_recording)
+
+    cache = BookTopCache()
+    lock = threading.Lock()  # Both feed threads call back into the same strategy
+
+    def on_change(top):
+        with lock:
+            signal = strategy.on_book_update(top, cache)
+            if signal:
+                latency_ms = (time.time() - top.received_ts) * 1000
+                log.info(f"⚡ Detected {latency_ms:.2f} ms after the {top.exchange} update")
+                print_signal(signal)
+                if journal is not None:
+                    journal.trade(signal)
+
+    feeds, servers = [], []
+    for exchange in ("binance", "kraken"):
+        transport, url = WebSocketTransport(), None
+        if replay_dir:
+            server = ReplayServer(load_recording(os.path.join(replay_dir, f"{exchange}.jsonl"))).start()
+            servers.append(server)
+            transport, url = LineSocketTransport(), server.url
+        elif record_dir:
+            os.makedirs(record_dir, exist_ok=True)
+            transport = RecordingTransport(transport, os.path.join(record_dir, f"{exchange}.jsonl"))
+        feeds.append(MarketDataFeed(exchange, [symbol], cache, on_change, transport=transport, url=url).start())
+
+    log.info("📡 Streaming best bid/ask from Binance and Kraken. Press Ctrl+C to stop")
+    try:
+        for feed in feeds:
+            feed.wait()  # Returns when a replay runs out of frames
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for feed in feeds:
+            feed.stop()
+        for server in servers:
+            server.stop()
+    log.info(f"\n🛑 Stream stopped after {sum(feed.updates for feed in feeds)} book updates")
 
 def main():
-    print("🚀 Starting BTC Arbitrage Bot (Binance vs Kraken)")
-    print("=" * 50)
-    
-    # Test the data fetcher first
-    print("🔍 Testing API connections...")
-    fetcher = DataFetcher()
-    binance_price, kraken_price = fetcher.get_both_prices()
-    
-    if not binance_price or not kraken_price:
-        print("❌ Failed to connect to exchanges. Check your internet connection.")
+    parser = argparse.ArgumentParser(description="BTC arbitrage monitor (Binance vs Kraken)")
+    parser.add_argument("--stream", action="store_true", help="Use WebSocket book-ticker streams instead of polling")
+    parser.add_argument("--record", metavar="DIR", help="With --stream, save every frame to DIR for replay")
+    parser.add_argument("--replay", metavar="DIR", help="Replay frames saved with --record (no network)")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this local port")
+    parser.add_argument("--metrics-json", metavar="PATH", help="Dump metrics as JSON to PATH periodically")
+    parser.add_argument("--metrics-interval", type=float, default=10.0, help="Seconds between JSON dumps")
+    parser.add_argument("--journal", metavar="DIR", default="journal",
+                        help="Directory of the quote/trade journal (default: journal)")
+    parser.add_argument("--no-journal", action="store_true", help="Do not write a journal")
+    parser.add_argument("--replay-quotes", metavar="PATH",
+                        help="Poll quotes from a journal recorded earlier instead of the exchanges")
+    parser.add_argument("--speed", type=float, default=None,
+                        help="With --replay-quotes, replay at this multiple of recorded time (default: max speed)")
+    parser.add_argument("--min-interval", type=float, default=1.0,
+                        help="Seconds between polls when the spread is at the threshold (default: 1)")
+    parser.add_argument("--max-interval", type=float, default=10.0,
+                        help="Seconds between polls when the spread is far from it (default: 10)")
+    parser.add_argument("--paper-capital", type=float, default=100000.0,
+                        help="Capital of the paper account that takes every signal (default: 100000)")
+    args = parser.parse_args()
+
+    # Quotes and signals are written to disk by a background thread as they happen
+    journal = None if args.no_journal else TradeJournal(args.journal)
+    # Console output is printed (and journaled) by a listener thread, not by the loop
+    listener = setup_console_logging(journal)
+    metrics, exporters = start_metrics(args.metrics_port, args.metrics_json, args.metrics_interval)
+    try:
+        run(args, metrics, journal)
+    finally:
+        for exporter in exporters:
+            exporter.stop()
+        listener.stop()  # Prints (and journals) whatever is still queued
+        if journal is not None:
+            journal.close()
+
+def run(args, metrics, journal=None):
+    log.info("🚀 Starting BTC Arbitrage Bot (Binance vs Kraken)")
+    log.info("=" * 50)
+
+    if args.stream or args.replay:
+        # The strategy only needs a fetcher for polling; skip the REST connection check
+        strategy = ArbitrageStrategy(min_spread_pct=0.2, metrics=metrics)
+        run_streaming(strategy, record_dir=args.record, replay_dir=args.replay, journal=journal)
         return
     
-    print("✅ Connected to both exchanges!")
-    print(f"   Binance: ${binance_price:,.2f}")
-    print(f"   Kraken:  ${kraken_price:,.2f}")
-    
-    # Calculate initial spread
-    spread_info = fetcher.calculate_spread(binance_price, kraken_price)
-    print(f"📊 Current spread: {spread_info['spread_pct']:.3f}%")
-    print()
-    
-    # Create arbitrage strategy (0.2% minimum spread)
-    strategy = ArbitrageStrategy(min_spread_pct=0.2)
+    # No separate connection check: the first tick is the check, so a restart
+    # reaches its first quote after a single round trip
+    fetcher = DataFetcher(metrics=metrics)
+    if args.replay_quotes:
+        from trading_bot.quotes import ReplayQuoteSource
+
+        source = ReplayQuoteSource.from_journal(args.replay_quotes, speed=args.speed)
+        log.info(f"⏪ Replaying {len(source)} recorded quote pairs from {args.replay_quotes}")
+    elif journal is not None:
+        from trading_bot.quotes import QuoteRecorder
+
+        source = QuoteRecorder(fetcher, journal)  # Live quotes, saved for later replays
+    else:
+        source = fetcher
+    # Create arbitrage strategy (0.2% minimum spread), sharing the fetcher's open connections
+    strategy = ArbitrageStrategy(min_spread_pct=0.2, data_fetcher=fetcher, metrics=metrics, quote_source=source)
+    replaying = args.replay_quotes is not None
+    first_tick = True
+    # Poll faster while the spread is close to the 0.2% threshold; the fetcher's
+    # scheduler keeps the requests within each exchange's rate limit
+    poller = AdaptivePoller(strategy.min_spread_pct, args.min_interval, args.max_interval)
+    spread_pct = None
+    # Running statistics of a paper account that takes every signal; O(1) per tick
+    paper = OnlineStats(args.paper_capital)
     
-    print("🔄 Starting monitoring loop...")
-    print("   Press Ctrl+C to stop")
-    print()
+    log.info("🔄 Starting monitoring loop...")
+    log.info("   Press Ctrl+C to stop")
+    log.info("")
     
     try:
         while True:
@@ -49,28 +178,48 @@ def main():
             
             # Run the strategy
             signal = strategy.on_tick(tick_data)
+
+            if first_tick:
+                first_tick = False
+                if not all(strategy.last_quotes):
+                    log.error("❌ Failed to connect to exchanges. Check your internet connection.")
+                    return
+                print_startup(time.perf_counter())
+
+            if journal is not None and signal:
+                journal.trade(signal)
             
+            spread_pct = signal["spread_pct"] if signal else None
             if signal:
-                print(f"🎯 ARBITRAGE OPPORTUNITY FOUND!")
-                print(f"   Buy: {signal['buy_exchange']} at ${signal['buy_price']:,.2f}")
-                print(f"   Sell: {signal['sell_exchange']} at ${signal['sell_price']:,.2f}")
-                print(f"   Spread: {signal['spread_pct']:.3f}%")
-                print(f"   Quantity: {signal['qty']} BTC")
-                print("   💡 In a real bot, you would execute these trades here!")
-                print()
+                paper_capital = paper.equity + (signal["sell_price"] - signal["buy_price"]) * signal["qty"]
+                paper.record_trade("buy", signal["qty"], signal["buy_price"])
+                paper.record_trade("sell", signal["qty"], signal["sell_price"])
+                paper.update(paper_capital)
+                print_signal(signal)
             else:
-                # Show current prices on every check
-                binance_price, kraken_price = fetcher.get_both_prices()
-                if binance_price and kraken_price:
+                paper.update(paper.equity)
+                # Show the prices the strategy just checked (no second round trip)
+                binance_quote, kraken_quote = strategy.last_quotes
+                if binance_quote and kraken_quote:
+                    binance_price, kraken_price = binance_quote.price, kraken_quote.price
                     spread_info = fetcher.calculate_spread(binance_price, kraken_price)
-                    print(f"📊 Binance ${binance_price:,.2f} | Kraken ${kraken_price:,.2f} | Spread {spread_info['spread_pct']:.3f}%")
+                    spread_pct = spread_info["spread_pct"]
+                    log.info(f"📊 Binance ${binance_price:,.2f} | Kraken ${kraken_price:,.2f} | Spread {spread_info['spread_pct']:.3f}%")
             
-            # Wait 10 seconds between checks (to avoid hitting API limits)
-            time.sleep(10)
+            if replaying:
+                if source.exhausted:
+                    log.info("⏹️  End of the recording")
+                    break
+                continue  # The replay source paces itself
+            time.sleep(poller.next_interval(spread_pct))
             
     except KeyboardInterrupt:
-        print("\n🛑 Stopping arbitrage bot...")
-        print("Thanks for using the arbitrage bot!")
+        log.info("\n🛑 Stopping arbitrage bot...")
+        log.info("Thanks for using the arbitrage bot!")
+    finally:
+        if paper.ticks:
+            print_paper_stats(paper)
+        fetcher.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -5,6 +5,7 @@ Simple script to run backtesting on your trading strategy
 
 import sys
 import os
+import argparse
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
@@ -13,21 +14,49 @@ from trading_bot.backtest import Backtest, create_sample_data
 from trading_bot.strategy import Strategy
 
 def main():
+    parser = argparse.ArgumentParser(description="Backtest the example strategy")
+    parser.add_argument("--csv", metavar="PATH",
+                        help="Price CSV with 'timestamp' and 'price' columns, read in chunks (default: sample data)")
+    parser.add_argument("--chunksize", type=int, default=1_000_000, help="Rows per chunk with --csv")
+    parser.add_argument("--equity-file", metavar="PATH", help="With --csv, write the full equity curve to PATH")
+    parser.add_argument("--keep-every", type=int, default=1000,
+                        help="With --csv, keep every Nth equity row in memory (0 = none)")
+    parser.add_argument("--checkpoint", metavar="PATH",
+                        help="With --csv, save the backtest state to PATH after every chunk")
+    parser.add_argument("--resume", action="store_true",
+                        help="With --csv, continue from --checkpoint, skipping rows already played")
+    args = parser.parse_args()
+
     print("🚀 Running Trading Bot Backtest")
     print("=" * 50)
-    
-    # Create sample data
-    print("📊 Generating sample price data...")
-    data = create_sample_data(days=60)  # 60 days of data
-    print(f"Generated {len(data)} data points")
-    print(f"Price range: ${data['price'].min():.2f} - ${data['price'].max():.2f}")
-    print()
-    
-    # Run backtest
-    print("⚡ Running backtest...")
     strategy = Strategy()
     backtest = Backtest(initial_capital=10000)
-    results = backtest.run(data, strategy)
+
+    if args.csv:
+        # Only one chunk is in memory at a time, so the file can be larger than RAM
+        from trading_bot.chunks import read_csv_chunks
+
+        resume = args.resume and args.checkpoint is not None and os.path.exists(args.checkpoint)
+        if resume:
+            from trading_bot.checkpoint import load_checkpoint
+
+            load_checkpoint(args.checkpoint, backtest, strategy)
+            print(f"♻️  Resuming from {args.checkpoint} after {backtest.stats.ticks:,} ticks")
+        print(f"⚡ Running backtest over {args.csv} in chunks of {args.chunksize:,} rows...")
+        results = backtest.run_stream(read_csv_chunks(args.csv, args.chunksize), strategy,
+                                      equity_path=args.equity_file, keep_every=args.keep_every,
+                                      resume=resume, checkpoint_path=args.checkpoint)
+    else:
+        # Create sample data
+        print("📊 Generating sample price data...")
+        data = create_sample_data(days=60)  # 60 days of data
+        print(f"Generated {len(data)} data points")
+        print(f"Price range: ${data['price'].min():.2f} - ${data['price'].max():.2f}")
+        print()
+
+        # Run backtest
+        print("⚡ Running backtest...")
+        results = backtest.run(data, strategy)
     
     # Display results
     print("📈 Backtest Results:")
@@ -41,7 +70,7 @@ def main():
         print(f"\n📋 Recent Trades:")
         for trade in results['trades'][-5:]:  # Last 5 trades
             print(f"  {trade['timestamp'].date()} | {trade['side'].upper():4} | "
-                  f"Price: ${trade['price']:6.2f} | Qty: {trade['qty']}")
+                  f"Price: ${trade['price']:6.2f} | Qty: {trade['qty']:g}")
     else:
         print("\n📋 No trades executed during backtest period")
 
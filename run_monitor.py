@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Watches hundreds of symbols across several exchanges and reports every
+venue pair whose bid/ask spread beats the fees. Settings come from a JSON
+config file (see trading_bot.monitor.DEFAULT_CONFIG).
+"""
+
+import sys
+import os
+import argparse
+import functools
+import logging
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from trading_bot.data_fetcher import DataFetcher
+from trading_bot.exchanges import make_adapters, poll_venues
+from trading_bot.journal import TradeJournal, setup_console_logging
+from trading_bot.metrics import start_metrics
+from trading_bot.monitor import SpreadMonitor, load_config, pick_symbols
+
+log = logging.getLogger("run_monitor")
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-exchange spread monitor for many symbols")
+    parser.add_argument("--config", metavar="PATH", help="JSON file overriding the default settings")
+    parser.add_argument("--cycles", type=int, help="Stop after this many snapshots (default: run until Ctrl+C)")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this local port")
+    parser.add_argument("--metrics-json", metavar="PATH", help="Dump metrics as JSON to PATH periodically")
+    parser.add_argument("--metrics-interval", type=float, default=10.0, help="Seconds between JSON dumps")
+    parser.add_argument("--journal", metavar="DIR", default="journal",
+                        help="Directory of the quote/trade journal (default: journal)")
+    parser.add_argument("--no-journal", action="store_true", help="Do not write a journal")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Scan in this many processes over a shared-memory quote board, "
+                             "with one fetcher process per venue (default: one loop)")
+    parser.add_argument("--simulate", action="store_true",
+                        help="With --workers, use simulated venue feeds instead of the exchanges")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    journal = None if args.no_journal else TradeJournal(args.journal, prefix="monitor")
+    listener = setup_console_logging(journal)
+    metrics, exporters = start_metrics(args.metrics_port, args.metrics_json, args.metrics_interval)
+    try:
+        if args.workers:
+            run_sharded(config, metrics, journal, args.cycles, args.workers, args.simulate)
+        else:
+            run(config, metrics, journal, args.cycles)
+    finally:
+        for exporter in exporters:
+            exporter.stop()
+        listener.stop()  # Prints (and journals) whatever is still queued
+        if journal is not None:
+            journal.close()
+
+def run(config, metrics, journal=None, cycles=None):
+    fetcher = DataFetcher(metrics=metrics)
+    adapters = make_adapters(config["venues"])
+    log.info(f"🛰️  Spread monitor: {', '.join(config['venues'])}")
+    try:
+        # The first snapshot waits for every venue, so "auto" sees all listings
+        first = poll_venues(fetcher, adapters, wait=True)
+        symbols = config["symbols"]
+        if symbols == "auto":
+            symbols = pick_symbols(first, config["quotes"], config["max_symbols"])
+        monitor = SpreadMonitor(symbols, config["venues"], config["threshold_pct"], config["fees"], config["max_age"])
+        for tops in first.values():
+            monitor.update(tops)
+        log.info(f"👀 Watching {len(monitor.symbols)} symbols on {len(monitor.venues)} venues, "
+                 f"threshold {config['threshold_pct']}% after fees. Press Ctrl+C to stop")
+
+        done = 0
+        while cycles is None or done < cycles:
+            cycle_started = time.perf_counter()
+            # Venues without request budget left this round keep their last quotes
+            for tops in poll_venues(fetcher, adapters).values():
+                monitor.update(tops)
+            with metrics.timer("monitor_scan_seconds"):
+                opportunities = monitor.scan()
+            for o in opportunities:
+                report(o, journal)
+            elapsed = time.perf_counter() - cycle_started
+            metrics.observe("monitor_cycle_seconds", elapsed)
+            done += 1
+            time.sleep(max(0.0, config["interval"] - elapsed))
+    except KeyboardInterrupt:
+        log.info("\n🛑 Stopping spread monitor.")
+    finally:
+        fetcher.close()
+
+def report(o, journal=None):
+    log.info(f"🚨 {o.symbol}: buy {o.buy_venue} ${o.buy_price:,.6g} -> sell {o.sell_venue} "
+             f"${o.sell_price:,.6g} | spread {o.spread_pct:.3f}% ({o.net_pct:.3f}% after fees)")
+    if journal is not None:
+        journal.record("opportunity", **o._asdict())
+
+def run_sharded(config, metrics, journal=None, cycles=None, workers=2, simulate=False):
+    from trading_bot.sharded import AdapterFeed, ShardedScanner, SimulatedFeed
+
+    venues = config["venues"]
+    symbols = config["symbols"]
+    if simulate:
+        if symbols == "auto":
+            symbols = [f"SIM{i}USDT" for i in range(config["max_symbols"])]
+        # Each venue quotes the same walk a little higher than the previous one
+        feeds = {venue: functools.partial(SimulatedFeed, venue, symbols, skew_pct=0.2 * k)
+                 for k, venue in enumerate(venues)}
+    else:
+        if symbols == "auto":
+            fetcher = DataFetcher(metrics=metrics)
+            try:
+                symbols = pick_symbols(poll_venues(fetcher, make_adapters(venues), wait=True),
+                                       config["quotes"], config["max_symbols"])
+            finally:
+                fetcher.close()
+        feeds = {venue: functools.partial(AdapterFeed, venue) for venue in venues}
+    log.info(f"🛰️  Sharded spread monitor: {len(symbols)} symbols on {', '.join(venues)}, "
+             f"{workers} scanner processes. Press Ctrl+C to stop")
+    scanner = ShardedScanner(symbols, feeds, workers, config["threshold_pct"], config["fees"], config["max_age"],
+                             feed_interval=config["interval"], scan_interval=config["interval"])
+    results = 0
+    try:
+        with scanner:
+            while cycles is None or results < cycles * workers:
+                for result in scanner.poll_results():
+                    results += 1
+                    metrics.observe("monitor_scan_seconds", result.scan_seconds)
+                    for o in result.spreads:
+                        report(o, journal)
+    except KeyboardInterrupt:
+        log.info("\n🛑 Stopping spread monitor.")
+
+if __name__ == "__main__":
+    main()
@@ -2,56 +2,205 @@
 """
 Checks both BTC cross-exchange (Binance vs Kraken) and SOL triangular arbitrage (on Binance) every 10 seconds.
 """
+import time
+
+STARTED = time.perf_counter()  # Reference point for the startup report
+
 import sys
 import os
-import time
+import argparse
+import logging
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from trading_bot.data_fetcher import DataFetcher
+from trading_bot.journal import TradeJournal, setup_console_logging
+from trading_bot.metrics import start_metrics
+from trading_bot.scheduler import AdaptivePoller
+
+IMPORTED = time.perf_counter()
+
+log = logging.getLogger("run_multi_arbitrage")
+
+def build_scanner(fetcher, max_legs, min_profit_pct):
+    """Build a scanner over every Binance symbol (cycles are found once, here)."""
+    from trading_bot.scanner import TriangleScanner
+
+    pairs = fetcher.get_binance_symbol_pairs()
+    scanner = TriangleScanner(pairs, max_legs=max_legs, min_profit_pct=min_profit_pct)
+    log.info(f"🔺 Watching {scanner.cycle_count} cycles over {len(pairs)} Binance symbols")
+    return scanner
+
+def size_btc_spread(fetcher, spread_info, levels, fee_pct):
+    """Largest BTC trade the two order books pay for after fees, with the average price of each leg."""
+    from trading_bot.depth import executable_spread
+
+    binance_book, kraken_book = fetcher.fetch_concurrently(
+        lambda: fetcher.get_binance_book("BTCUSDT", levels),
+        lambda: fetcher.get_kraken_book("XBTUSDT", levels)
+    )
+    if binance_book is None or kraken_book is None:
+        log.info("Could not fetch both BTC/USDT order books.")
+        return {}
+    books = {"binance": binance_book, "kraken": kraken_book}
+    fill = executable_spread(books[spread_info["lower_exchange"]], books[spread_info["higher_exchange"]],
+                             fee_pct, fee_pct)
+    if fill is None:
+        log.info(f"No executable size: the books do not cover {fee_pct:g}% fees per leg")
+        return {"qty": 0.0, "profit": 0.0}
+    log.info(f"Executable: {fill.qty:.6f} BTC, buy avg ${fill.buy_vwap:,.2f}, sell avg ${fill.sell_vwap:,.2f} "
+             f"(profit ${fill.profit:,.2f}, {fill.profit_pct:.3f}% after fees)")
+    return {"qty": fill.qty, "buy_vwap": fill.buy_vwap, "sell_vwap": fill.sell_vwap, "profit": fill.profit,
+            "net_pct": fill.profit_pct}
 
 def main():
-    fetcher = DataFetcher()
+    parser = argparse.ArgumentParser(description="BTC cross-exchange and Binance triangular arbitrage monitor")
+    parser.add_argument("--all-triangles", action="store_true",
+                        help="Also scan every triangle over all Binance symbols")
+    parser.add_argument("--max-legs", type=int, default=3, choices=(3, 4), help="Longest cycle to scan")
+    parser.add_argument("--min-cycle-pct", type=float, default=0.4, help="Minimum cycle profit to report")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this local port")
+    parser.add_argument("--metrics-json", metavar="PATH", help="Dump metrics as JSON to PATH periodically")
+    parser.add_argument("--metrics-interval", type=float, default=10.0, help="Seconds between JSON dumps")
+    parser.add_argument("--journal", metavar="DIR", default="journal",
+                        help="Directory of the quote/trade journal (default: journal)")
+    parser.add_argument("--no-journal", action="store_true", help="Do not write a journal")
+    parser.add_argument("--min-interval", type=float, default=1.0,
+                        help="Seconds between checks when the BTC spread is at the threshold (default: 1)")
+    parser.add_argument("--max-interval", type=float, default=5.0,
+                        help="Seconds between checks when it is far from it (default: 5)")
+    parser.add_argument("--depth", type=int, default=0,
+                        help="Size each opportunity from this many order book levels (default: prices only)")
+    parser.add_argument("--fee-pct", type=float, default=0.1,
+                        help="Taker fee per trade in percent, used with --depth (default: 0.1)")
+    args = parser.parse_args()
+
+    # Quotes and trades are written to disk by a background thread as they happen
+    journal = None if args.no_journal else TradeJournal(args.journal)
+    # Console output is printed (and journaled) by a listener thread, not by the loop
+    listener = setup_console_logging(journal)
+    if journal is not None:
+        log.info(f"📓 Journal: {journal.path}")
+    metrics, exporters = start_metrics(args.metrics_port, args.metrics_json, args.metrics_interval)
+    fetcher = DataFetcher(metrics=metrics)
     trades = []  # List to store all virtual trades
-    print("🚀 Multi-Arbitrage Monitor (BTC cross-exchange & SOL triangle)")
-    print("=" * 60)
-    print("Checks every 5 seconds. Press Ctrl+C to stop.")
-    print()
+    log.info("🚀 Multi-Arbitrage Monitor (BTC cross-exchange & SOL triangle)")
+    log.info("=" * 60)
+    log.info(f"Checks every {args.min_interval:g}-{args.max_interval:g} seconds, faster near the BTC threshold. "
+             f"Press Ctrl+C to stop.")
+    log.info("")
+    scanner = build_scanner(fetcher, args.max_legs, args.min_cycle_pct) if args.all_triangles else None
+    first_cycle = True
+    journaled = 0  # Trades already handed to the journal
+    poller = AdaptivePoller(0.2, args.min_interval, args.max_interval)
     try:
         while True:
-            print("\n--- BTC Cross-Exchange Arbitrage (Binance vs Kraken) ---")
-            binance_price, kraken_price = fetcher.get_both_prices()
+            cycle_started = time.perf_counter()
+            # One batch request for all Binance legs and one Kraken request, sent at the same time
+            with metrics.timer("cycle_section_seconds", section="fetch"):
+                binance_quotes, kraken_btc = fetcher.fetch_concurrently(
+                    lambda: fetcher.get_binance_quotes(["BTCUSDT", "SOLUSDT", "SOLBTC"]),
+                    lambda: fetcher.get_kraken_quote("XBTUSDT")
+                )
+            binance_btc = binance_quotes.get("BTCUSDT")
+            binance_sol = binance_quotes.get("SOLUSDT")
+            binance_solbtc = binance_quotes.get("SOLBTC")
+            quotes = [q for q in (binance_btc, kraken_btc, binance_sol, binance_solbtc) if q]
+            if first_cycle and quotes:
+                first_cycle = False
+                log.info(f"⏱️  Startup: imports {(IMPORTED - STARTED) * 1000:.0f} ms, "
+                         f"first quote {(time.perf_counter() - STARTED) * 1000:.0f} ms")
+            if quotes:
+                skew_ms = (max(q.response_ts for q in quotes) - min(q.response_ts for q in quotes)) * 1000
+                log.info(f"\nFetched {len(quotes)}/4 quotes (skew {skew_ms:.0f} ms)")
+
+            if journal is not None:
+                for q in quotes:
+                    journal.quote(q)
+
+            if metrics.enabled:
+                # How old each price is when the checks below act on it
+                now = time.time()
+                for q in quotes:
+                    metrics.observe("quote_age_seconds", now - q.response_ts, exchange=q.exchange.label)
+
+            btc_started = time.perf_counter()
+            log.info("\n--- BTC Cross-Exchange Arbitrage (Binance vs Kraken) ---")
+            spread_pct = None
+            binance_price = binance_btc.price if binance_btc else None
+            kraken_price = kraken_btc.price if kraken_btc else None
             if binance_price and kraken_price:
-                spread_info = fetcher.calculate_spread(binance_price, kraken_price)
-                print(f"Binance BTC/USDT: ${binance_price:,.2f}")
-                print(f"Kraken  BTC/USDT: ${kraken_price:,.2f}")
-                print(f"Spread: ${spread_info['spread']:.2f} ({spread_info['spread_pct']:.3f}%)")
-                if float(spread_info['spread_pct']) > 0.2:
-                    print(f"🚨 BTC Arbitrage Opportunity! Buy on {spread_info['lower_exchange']}, sell on {spread_info['higher_exchange']}")
-                    trades.append({
+                with metrics.timer("spread_calc_seconds"):
+                    spread_info = fetcher.calculate_spread(binance_price, kraken_price)
+                log.info(f"Binance BTC/USDT: ${binance_price:,.2f}")
+                log.info(f"Kraken  BTC/USDT: ${kraken_price:,.2f}")
+                log.info(f"Spread: ${spread_info.spread:.2f} ({spread_info.spread_pct:.3f}%)")
+                spread_pct = spread_info.spread_pct
+                if spread_pct > 0.2:
+                    log.info(f"🚨 BTC Arbitrage Opportunity! Buy on {spread_info['lower_exchange']}, sell on {spread_info['higher_exchange']}")
+                    trade = {
                         "type": "BTC",
                         "buy_exchange": spread_info['lower_exchange'],
                         "sell_exchange": spread_info['higher_exchange'],
-                        "spread_pct": float(spread_info['spread_pct']),
-                        "spread": float(spread_info['spread']),
-                        "buy_price": float(spread_info['lower_price']),
-                        "sell_price": float(spread_info['higher_price']),
+                        "spread_pct": spread_pct,
+                        "spread": spread_info.spread,
+                        "buy_price": spread_info.lower_price,
+                        "sell_price": spread_info.higher_price,
                         "timestamp": time.strftime('%Y-%m-%d %H:%M:%S')
-                    })
+                    }
+                    if args.depth:
+                        trade.update(size_btc_spread(fetcher, spread_info, args.depth, args.fee_pct))
+                    trades.append(trade)
             else:
-                print("Could not fetch both BTC/USDT prices.")
+                log.info("Could not fetch both BTC/USDT prices.")
+
+            sol_started = time.perf_counter()
+            metrics.observe("cycle_section_seconds", sol_started - btc_started, section="btc")
+            log.info("\n--- SOL Triangular Arbitrage (on Binance) ---")
+            prices = tuple(q.price if q else None for q in (binance_btc, binance_sol, binance_solbtc))
+            fetcher.check_sol_triangular_arbitrage(min_spread_pct=0.4, trades=trades, prices=prices,
+                                                   depth=args.depth, fee_pct=args.fee_pct)
+            metrics.observe("cycle_section_seconds", time.perf_counter() - sol_started, section="sol")
+
+            if scanner is not None:
+                cycles_started = time.perf_counter()
+                log.info("\n--- All Binance Cycles ---")
+                # One all-symbols request; only cycles whose prices moved are re-evaluated
+                for opportunity in scanner.update(fetcher.get_binance_prices())[:10]:
+                    path = " -> ".join(opportunity.currencies + opportunity.currencies[:1])
+                    legs = ", ".join(f"{side} {symbol}" for symbol, side in opportunity.legs)
+                    log.info(f"🔺 {path}: {opportunity.profit_pct:.3f}% ({legs})")
+                    trades.append({
+                        "type": "CYCLE",
+                        "currencies": opportunity.currencies,
+                        "legs": opportunity.legs,
+                        "spread_pct": opportunity.profit_pct,
+                        "timestamp": time.strftime('%Y-%m-%d %H:%M:%S')
+                    })
+                metrics.observe("cycle_section_seconds", time.perf_counter() - cycles_started, section="cycles")
 
-            print("\n--- SOL Triangular Arbitrage (on Binance) ---")
-            fetcher.check_sol_triangular_arbitrage(min_spread_pct=0.4, trades=trades)
+            if journal is not None:
+                for trade in trades[journaled:]:
+                    journal.trade(trade)
+            journaled = len(trades)
 
-            print("\nWaiting 5 seconds...")
-            time.sleep(5)
+            metrics.observe("cycle_section_seconds", time.perf_counter() - cycle_started, section="total")
+            interval = poller.next_interval(spread_pct)
+            log.info(f"\nWaiting {interval:.1f} seconds...")
+            time.sleep(interval)
     except KeyboardInterrupt:
-        print("\n🛑 Stopping multi-arbitrage monitor.")
-        print(f"\nSummary: {len(trades)} trades would have been made.")
+        log.info("\n🛑 Stopping multi-arbitrage monitor.")
+        log.info(f"\nSummary: {len(trades)} trades would have been made.")
         for t in trades:
-            print(t)
+            log.info(t)
+    finally:
+        fetcher.close()
+        for exporter in exporters:
+            exporter.stop()
+        listener.stop()  # Prints (and journals) whatever is still queued
+        if journal is not None:
+            journal.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,38 @@
+"""
+Trading bot package.
+
+Names are loaded lazily on first use, so the live runners (which only need
+the data fetcher and strategies) never pay for importing pandas/numpy;
+those load only when a backtesting name such as Backtest is touched.
+"""
+
+import importlib  # For loading submodules on first attribute access
+
+# Public name -> submodule that defines it
+_LAZY_NAMES = {
+    "ArbitrageStrategy": "strategy",
+    "Strategy": "strategy",
+    "DataFetcher": "data_fetcher",
+    "Quote": "models",
+    "Backtest": "backtest",
+    "create_sample_data": "backtest",
+    "run_sweep": "sweep",
+    "TriangleScanner": "scanner",
+    "EventEngine": "event_engine",
+    "FeatureStore": "features",
+}
+
+__all__ = sorted(_LAZY_NAMES)
+
+
+def __getattr__(name):
+    # Called only for names not yet in the module namespace (PEP 562)
+    if name not in _LAZY_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_LAZY_NAMES[name]}", __name__), name)
+    globals()[name] = value  # Cache so the next lookup is a plain attribute read
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,45 +1,183 @@
+import numpy as np  # Import numpy for array math in the vectorized engine
 import pandas as pd  # Import pandas for data manipulation
 from datetime import datetime, timezone  # Import datetime for timestamps
-from typing import Dict, List, Optional, Any  # Import typing for type hints
+from typing import Dict, Iterable, List, Optional, Any, Union  # Import typing for type hints
 from .strategy import Strategy  # Import the Strategy class from the same package
+from .ledger import EquityCurve, TradeLedger, column_to_ns, to_ns  # Array-backed result buffers
+from .models import Side, Signal, to_side  # Typed signals
+from .stats import OnlineStats  # Running performance statistics
 
 # Define the Backtest class, which will handle running the backtest simulation
 class Backtest:
-    def __init__(self, initial_capital: float = 10000):
+    def __init__(self, initial_capital: float = 10000, record_equity: bool = True,
+                 periods_per_year: Optional[float] = None):
+        """
+        Args:
+            initial_capital: Starting cash
+            record_equity: Keep the full equity curve; with False only the
+                           running statistics are kept (for very long runs)
+            periods_per_year: Ticks per year, to annualize Sharpe/Sortino
+        """
+        self.record_equity = record_equity
+        self.periods_per_year = periods_per_year
         # Set the initial amount of money to start with
         self.initial_capital = initial_capital
         # Set the current available cash (starts as initial_capital)
         self.capital = initial_capital
         # Set the number of positions (units of asset held)
         self.positions = 0
-        # List to store all executed trades
-        self.trades = []
-        # List to store the equity (account value) over time
-        self.equity_curve = []
+        # Typed buffer of all executed trades
+        self.trades = TradeLedger()
+        # Typed buffer of the equity (account value) over time
+        self.equity_curve = EquityCurve()
+        # Statistics updated on every tick, readable mid-run
+        self.stats = OnlineStats(initial_capital, periods_per_year)
+        # Kernel state carried from chunk to chunk
+        self._kernel_state = None
+        # Where the run has got to, so a resumed run skips rows already played
+        self.last_timestamp_ns: Optional[int] = None
+        self.equity_rows_written = 0  # Rows in the run_stream equity file
         
-    def run(self, data: pd.DataFrame, strategy: Strategy) -> Dict[str, Any]:
+    def run(self, data: pd.DataFrame, strategy: Strategy, mode: str = "auto", resume: bool = False) -> Dict[str, Any]:
         """
         Run the backtest on historical data using the provided strategy.
         Args:
             data: DataFrame with columns ['timestamp', 'price', ...]
             strategy: Strategy instance to test
+            mode: "tick" calls strategy.on_tick once per row, "vectorized" asks
+                  strategy.generate_signals for the whole signal array at once,
+                  "kernel" runs strategy.kernel over the price/volume arrays
+                  (numba-compiled when installed, see kernels.py), "auto"
+                  picks "kernel", then "vectorized", when the strategy supports it
+            resume: Continue from the current state (e.g. after load_checkpoint)
+                    instead of starting over; rows up to the last one already
+                    played are skipped, so a daily run can pass only the new day
         Returns:
             Dictionary with backtest results and statistics
         """
-        # Reset all state for a new run
+        if resume:
+            return self.run_stream([data], strategy, mode, keep_every=1 if self.record_equity else 0, resume=True)
+        self._reset(len(data) if self.record_equity else 1)  # One equity row per tick
+        self._run_chunk(data, strategy, self._pick_mode(strategy, mode), self.record_equity)
+        # After all ticks, calculate and return the results
+        return self._calculate_results()
+
+    def run_stream(self, chunks: Iterable[Union[pd.DataFrame, Dict[str, Any]]], strategy: Strategy,
+                   mode: str = "auto", equity_path: Optional[str] = None, keep_every: int = 1,
+                   resume: bool = False, checkpoint_path: Optional[str] = None,
+                   checkpoint_every: int = 1) -> Dict[str, Any]:
+        """
+        Run the backtest over data that arrives in chunks (e.g. from
+        read_csv_chunks), so only one chunk is in memory at a time. Cash,
+        positions, trades and the running statistics carry over from chunk
+        to chunk, as does the strategy object itself; in vectorized mode
+        generate_signals is called once per chunk.
+        Args:
+            chunks: DataFrames (or dicts of arrays) with 'timestamp' and 'price'
+            strategy: Strategy instance to test
+            mode: Same as run()
+            equity_path: Write every equity row to this file as it is made
+                         (read it back with read_equity_file)
+            keep_every: Keep every Nth equity row in memory (0 = none)
+            resume: Continue from the current state, as in run(); the equity
+                    file is cut back to the rows written by then and appended to
+            checkpoint_path: Save a checkpoint (see checkpoint.py) here every
+                             checkpoint_every chunks, so a crashed run can resume
+        Returns:
+            Dictionary with backtest results and statistics, like run();
+            "equity_curve" holds the rows kept in memory
+        """
+        from .chunks import EquityFileWriter  # Disk output of the equity curve
+        from .checkpoint import save_checkpoint
+
+        if not resume:
+            self._reset(1)
+        skip_until = self.last_timestamp_ns if resume else None
+        mode = self._pick_mode(strategy, mode)
+        kept = self.equity_curve  # Rows kept in memory (continued when resuming)
+        writer = None
+        if equity_path:
+            writer = EquityFileWriter(equity_path, keep_rows=self.equity_rows_written if resume else 0)
+        record = writer is not None or keep_every > 0
+        seen = self.stats.ticks  # Ticks before this chunk, so every Nth row counts across chunks
+        try:
+            for number, chunk in enumerate(chunks, start=1):
+                if not isinstance(chunk, pd.DataFrame):
+                    chunk = pd.DataFrame(chunk)
+                if skip_until is not None and len(chunk):
+                    chunk = chunk[column_to_ns(chunk["timestamp"]) > skip_until]  # Played before the checkpoint
+                if len(chunk) == 0:
+                    continue
+                self.equity_curve = EquityCurve(capacity=len(chunk) if record else 1)
+                self._run_chunk(chunk.reset_index(drop=True), strategy, mode, record)
+                if writer is not None:
+                    writer.write(self.equity_curve)
+                    self.equity_rows_written = writer.rows
+                if keep_every > 0:
+                    rows = np.flatnonzero((np.arange(seen, seen + len(chunk)) % keep_every) == 0)
+                    kept.extend(**{name: self.equity_curve.column(name)[rows] for name in EquityCurve.COLUMNS})
+                self.equity_curve = kept
+                seen += len(chunk)
+                if checkpoint_path and number % checkpoint_every == 0:
+                    if writer is not None:
+                        writer.flush()  # The checkpoint must not count rows that are not on disk
+                    save_checkpoint(checkpoint_path, self, strategy)
+        finally:
+            self.equity_curve = kept
+            if writer is not None:
+                writer.close()
+        return self._calculate_results()
+
+    def _reset(self, capacity: int):
+        """Reset all state for a new run."""
         self.capital = self.initial_capital
         self.positions = 0
-        self.trades = []
-        self.equity_curve = []
-        
-        # Iterate over each row (tick) in the data
-        for index, row in data.iterrows():
-            # Prepare the tick data for the strategy (price, timestamp, and any other columns)
-            tick_data = {
-                "price": row["price"],  # Current price
-                "timestamp": row["timestamp"],  # Current timestamp
-                **row.to_dict()  # Include all other columns (e.g., volume)
-            }
+        self.trades = TradeLedger()
+        self.equity_curve = EquityCurve(capacity=capacity)
+        self.stats = OnlineStats(self.initial_capital, self.periods_per_year)
+        self._kernel_state = None  # Kernel state carried from chunk to chunk
+        self.last_timestamp_ns = None
+        self.equity_rows_written = 0
+
+    @staticmethod
+    def _pick_mode(strategy: Strategy, mode: str) -> str:
+        if mode == "auto":
+            if getattr(strategy, "kernel", None) is not None and _follows_on_tick(strategy, "kernel"):
+                mode = "kernel"
+            elif hasattr(strategy, "generate_signals") and _follows_on_tick(strategy, "generate_signals"):
+                mode = "vectorized"
+            else:
+                mode = "tick"
+        if mode not in ("tick", "vectorized", "kernel"):
+            raise ValueError(f"Unknown backtest mode: {mode!r}")
+        return mode
+
+    def _run_chunk(self, data: pd.DataFrame, strategy: Strategy, mode: str, record: bool):
+        """
+        Play one block of rows, continuing from the current cash/positions.
+        Args:
+            record: Append an equity row per tick to self.equity_curve
+        """
+        if len(data):
+            self.last_timestamp_ns = int(column_to_ns(data["timestamp"].iloc[-1:])[0])
+        if mode == "kernel":
+            from .kernels import run_kernel  # Loads numba (if installed) only for kernel runs
+
+            signals, self._kernel_state = run_kernel(strategy, data, self._kernel_state)
+            self._run_signals(data, signals, record)
+            return
+        if mode == "vectorized":
+            self._run_signals(data, strategy.generate_signals(data), record)
+            return
+
+        timestamps_ns = column_to_ns(data["timestamp"])  # int64 timestamps for the equity curve
+        columns = list(data.columns)
+
+        # Iterate over each row (tick) in the data; itertuples yields plain tuples
+        # instead of building a pandas Series per row like iterrows
+        for timestamp_ns, row in zip(timestamps_ns, data.itertuples(index=False, name=None)):
+            # Tick data for the strategy: price, timestamp and any other columns (e.g., volume)
+            tick_data = dict(zip(columns, row))
             
             # Get the trading signal from the strategy (e.g., {"side": "buy", "qty": 1})
             signal = strategy.on_tick(tick_data)
@@ -50,90 +188,194 @@ class Backtest:
             
             # Calculate the current equity (cash + value of held positions)
             current_equity = self.capital + (self.positions * tick_data["price"])
+            self.stats.update(current_equity, self.positions, timestamp_ns)
             # Record the equity, price, and positions at this tick
-            self.equity_curve.append({
-                "timestamp": tick_data["timestamp"],
-                "equity": current_equity,
-                "price": tick_data["price"],
-                "positions": self.positions
-            })
-        
-        # After all ticks, calculate and return the results
-        return self._calculate_results()
+            if record:
+                self.equity_curve.append(timestamp_ns, current_equity, tick_data["price"], self.positions)
+
+    def _run_signals(self, data: pd.DataFrame, signals, record: bool = True):
+        """
+        Run the backtest from a whole signal array instead of one call per row.
+        The signals (from generate_signals or a kernel) hold one signed quantity
+        per row: positive to buy that many units, negative to sell, 0 (or NaN)
+        for no action. Fills follow exactly the same cash/position rules as the per-tick path,
+        so trades, final_equity and max_drawdown_pct match it.
+        Args:
+            data: DataFrame with columns ['timestamp', 'price', ...]
+            signals: Array with one signed quantity per row
+            record: Append the equity rows to self.equity_curve
+        """
+        prices = data["price"].to_numpy(dtype=np.float64)  # Price column as a float array
+        signals = np.asarray(signals)  # One signed qty per row
+        if signals.shape != prices.shape:
+            raise ValueError(
+                f"Strategy returned {signals.shape[0] if signals.ndim else 0} "
+                f"signals for {prices.shape[0]} rows"
+            )
+
+        # NaN/inf (e.g. rolling features warming up) means no action, not a trade
+        signals = np.nan_to_num(signals, nan=0.0, posinf=0.0, neginf=0.0)
+
+        timestamps_ns = column_to_ns(data["timestamp"])  # int64 timestamps, converted once
+        # Only rows with a signal need a look; fills depend on the cash/positions
+        # left by earlier fills, so they are walked in order (on plain Python lists)
+        rows = np.flatnonzero(signals)
+        trade_rows, sides, qtys, cash_levels, position_levels = fill_signals(
+            rows.tolist(), prices[rows].tolist(), signals[rows].tolist(), self.capital, self.positions)
+        if trade_rows:
+            trade_prices = prices[trade_rows]
+            self.trades.extend(timestamp=timestamps_ns[trade_rows], side=sides, qty=qtys, price=trade_prices)
+            for side, qty, price in zip(sides, qtys, trade_prices.tolist()):
+                self.stats.record_trade("buy" if side == Side.BUY else "sell", qty, price)
+            self.capital, self.positions = cash_levels[-1], position_levels[-1]
+
+        # Spread the cash/position levels over all rows: each row takes the level
+        # set by the last trade at or before it
+        level_index = np.searchsorted(np.asarray(trade_rows, dtype=np.int64), np.arange(len(prices)), side="right")
+        cash = np.asarray(cash_levels, dtype=np.float64)[level_index]
+        positions = np.asarray(position_levels, dtype=np.float64)[level_index]
+        equity = cash + positions * prices  # Equity at every tick
+
+        self.stats.extend(equity, positions, timestamps_ns)
+        if record:
+            self.equity_curve.extend(
+                timestamp=timestamps_ns,
+                equity=equity,
+                price=prices,
+                positions=positions
+            )
     
-    def _execute_signal(self, signal: Dict[str, Any], tick_data: Dict[str, Any]):
+    def _execute_signal(self, signal: Union[Signal, Dict[str, Any]], tick_data: Dict[str, Any]):
         """
         Execute a trading signal (buy or sell) from the strategy.
         Args:
-            signal: Dictionary with trade info (e.g., {"side": "buy", "qty": 1})
+            signal: Signal, or a dictionary with trade info (e.g., {"side": "buy", "qty": 1})
             tick_data: Dictionary with current tick info
         """
-        side = signal.get("side")  # 'buy' or 'sell'
-        qty = signal.get("qty", 1)  # Quantity to trade (default 1)
+        if isinstance(signal, Signal):
+            side = signal.side  # Side.BUY, Side.SELL or Side.ARBITRAGE
+            qty = signal.qty
+        else:
+            side = to_side(signal.get("side"))  # 'buy', 'sell' or 'arbitrage'
+            qty = signal.get("qty", 1)  # Quantity to trade (default 1)
         price = tick_data["price"]  # Current price
         
         # If the signal is to buy and we have enough cash
-        if side == "buy" and self.capital >= price * qty:
+        if side == Side.BUY and self.capital >= price * qty:
             cost = price * qty  # Total cost of the buy
             self.capital -= cost  # Subtract cost from cash
             self.positions += qty  # Add to positions
-            # Record the trade
-            self.trades.append({
-                "timestamp": tick_data["timestamp"],
-                "side": "buy",
-                "price": price,
-                "qty": qty,
-                "cost": cost
-            })
+            # Record the trade (cost is price * qty, derived on export)
+            self.trades.append(to_ns(tick_data["timestamp"]), Side.BUY, qty, price)
+            self.stats.record_trade("buy", qty, price)
         # If the signal is to sell and we have enough positions
-        elif side == "sell" and self.positions >= qty:
+        elif side == Side.SELL and self.positions >= qty:
             revenue = price * qty  # Total revenue from the sell
             self.capital += revenue  # Add revenue to cash
             self.positions -= qty  # Subtract from positions
-            # Record the trade
-            self.trades.append({
-                "timestamp": tick_data["timestamp"],
-                "side": "sell",
-                "price": price,
-                "qty": qty,
-                "revenue": revenue
-            })
-    
+            # Record the trade (revenue is price * qty, derived on export)
+            self.trades.append(to_ns(tick_data["timestamp"]), Side.SELL, qty, price)
+            self.stats.record_trade("sell", qty, price)
+        # An arbitrage signal buys on one exchange and sells on the other at once
+        elif side == Side.ARBITRAGE and self.capital >= signal["buy_price"] * qty:
+            buy_price, sell_price = signal["buy_price"], signal["sell_price"]
+            timestamp_ns = to_ns(tick_data["timestamp"])
+            self.capital += (sell_price - buy_price) * qty  # Positions end flat
+            self.trades.append(timestamp_ns, Side.BUY, qty, buy_price)
+            self.trades.append(timestamp_ns, Side.SELL, qty, sell_price)
+            self.stats.record_trade("buy", qty, buy_price)
+            self.stats.record_trade("sell", qty, sell_price)
+
     def _calculate_results(self) -> Dict[str, Any]:
         """
         Calculate statistics and results for the backtest.
         Returns:
-            Dictionary with performance metrics and trade history
+            Dictionary with performance metrics and trade history. "trades" and
+            "equity_curve" are the TradeLedger/EquityCurve buffers themselves
+            (the curve is empty with record_equity=False); call .to_frame() or
+            .to_dicts() on them to export.
         """
         # If no data was processed, return an error
-        if not self.equity_curve:
+        if self.stats.ticks == 0:
             return {"error": "No data processed"}
-        
-        initial_equity = self.initial_capital  # Starting equity
-        final_equity = self.equity_curve[-1]["equity"]  # Ending equity
-        total_return = (final_equity - initial_equity) / initial_equity * 100  # % return
-        
-        # Calculate max drawdown (largest drop from a peak)
-        peak = initial_equity  # Highest equity seen so far
-        max_drawdown = 0  # Largest drawdown seen so far
-        for point in self.equity_curve:
-            if point["equity"] > peak:
-                peak = point["equity"]  # Update peak
-            drawdown = (peak - point["equity"]) / peak * 100  # % drop from peak
-            if drawdown > max_drawdown:
-                max_drawdown = drawdown  # Update max drawdown
-        
-        # Return all results as a dictionary
+
+        # Everything comes from the running statistics, so the curve is not walked again
+        stats = self.stats.snapshot()
         return {
-            "initial_capital": initial_equity,
-            "final_equity": final_equity,
-            "total_return_pct": total_return,
+            "initial_capital": self.initial_capital,
+            "final_equity": stats["equity"],
+            "total_return_pct": stats["total_return_pct"],
             "total_trades": len(self.trades),
-            "max_drawdown_pct": max_drawdown,
+            "max_drawdown_pct": stats["max_drawdown_pct"],
+            "max_drawdown_ticks": stats["max_drawdown_ticks"],
+            "max_drawdown_seconds": stats["max_drawdown_seconds"],
+            "sharpe": stats["sharpe"],
+            "sortino": stats["sortino"],
+            "win_rate_pct": stats["win_rate_pct"],
+            "turnover": stats["turnover"],
+            "exposure_pct": stats["exposure_pct"],
             "trades": self.trades,
             "equity_curve": self.equity_curve
         }
 
+def _defining_class(strategy, name: str) -> int:
+    """Position in the strategy's MRO of the class that defines `name` (len(MRO) if none does)."""
+    if name in getattr(strategy, "__dict__", {}):
+        return -1  # Set on the instance itself
+    mro = type(strategy).__mro__
+    for depth, klass in enumerate(mro):
+        if name in vars(klass):
+            return depth
+    return len(mro)
+
+
+def _follows_on_tick(strategy, name: str) -> bool:
+    """
+    True if `name` (kernel or generate_signals) is defined on the same class
+    as on_tick or on a subclass of it. A subclass that only overrides on_tick
+    inherits the base class's array version of a different rule, which must
+    not replace its own on_tick in auto mode.
+    """
+    return _defining_class(strategy, name) <= _defining_class(strategy, "on_tick")
+
+
+def fill_signals(rows: List[int], prices: List[float], signals: List[float], capital: float, positions: float):
+    """
+    Execute signed-quantity signals in order with the same cash/position
+    rules as Backtest._execute_signal: a buy needs the cash, a sell needs
+    the positions, otherwise the signal is skipped.
+    Args:
+        rows, prices, signals: Row index, price and signed quantity of each signal
+        capital, positions: Cash and positions before the first signal
+    Returns:
+        (trade_rows, sides, qtys, cash_levels, position_levels): row, side code
+        and quantity of every executed trade, and the cash/positions before the
+        first trade followed by the levels after each one
+    """
+    trade_rows, sides, qtys = [], [], []
+    cash_levels, position_levels = [capital], [positions]
+    buy, sell = int(Side.BUY), int(Side.SELL)
+    for row, price, qty in zip(rows, prices, signals):
+        if qty > 0:
+            cost = price * qty
+            if capital < cost:
+                continue  # Not enough cash
+            capital -= cost
+            positions += qty
+            sides.append(buy)
+        else:
+            qty = -qty
+            if positions < qty:
+                continue  # Not enough positions
+            capital += price * qty
+            positions -= qty
+            sides.append(sell)
+        trade_rows.append(row)
+        qtys.append(qty)
+        cash_levels.append(capital)
+        position_levels.append(positions)
+    return trade_rows, sides, qtys, cash_levels, position_levels
+
 # Function to create sample price data for testing the backtest
 # You can replace this with your own data loader
 
@@ -174,4 +416,4 @@ if __name__ == "__main__":
         print(f"\nFirst few trades:")
         for trade in results['trades'][:5]:
             print(f"  {trade['timestamp'].date()} | {trade['side'].upper()} | "
-                  f"Price: ${trade['price']:.2f} | Qty: {trade['qty']}") 
\ No newline at end of file
+                  f"Price: ${trade['price']:.2f} | Qty: {trade['qty']:g}") 
\ No newline at end of file
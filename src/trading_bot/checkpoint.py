@@ -0,0 +1,111 @@
+import os  # For atomic replace and fsync
+import pickle  # For the state payload
+import struct  # For the file header
+import zlib  # For compressing the payload and its checksum
+from typing import Any, Dict  # For type hints
+
+# File layout: MAGIC, header (format version, CRC32 of the payload), then the
+# zlib-compressed pickle of the state
+MAGIC = b"TBCK"
+VERSION = 1
+_HEADER = struct.Struct("<HI")
+
+# Backtest attributes saved in a checkpoint. The trade ledger, equity curve
+# and running statistics are array/number objects, so they pickle compactly.
+BACKTEST_FIELDS = (
+    "initial_capital",
+    "capital",
+    "positions",
+    "record_equity",
+    "periods_per_year",
+    "trades",
+    "equity_curve",
+    "stats",
+    "_kernel_state",
+    "last_timestamp_ns",
+    "equity_rows_written",
+)
+
+
+def strategy_state(strategy) -> Any:
+    """
+    The part of a strategy a checkpoint keeps: strategy.get_state() if it
+    has one, else its attributes (which must then be picklable).
+    """
+    if hasattr(strategy, "get_state"):
+        return strategy.get_state()
+    return dict(vars(strategy))
+
+
+def restore_strategy(strategy, state: Any):
+    """Put state from strategy_state back into a strategy object."""
+    if hasattr(strategy, "set_state"):
+        strategy.set_state(state)
+    else:
+        vars(strategy).update(state)
+
+
+def save_checkpoint(path: str, backtest, strategy=None):
+    """
+    Write the state of a backtest (cash, positions, trades, equity rows kept
+    in memory, running statistics, kernel state, how far it got) and of its
+    strategy to a compact binary file. The file is written next to `path`
+    and renamed over it, so a crash mid-write leaves the last good
+    checkpoint in place.
+    Args:
+        path: Checkpoint file
+        backtest: Backtest to save
+        strategy: Strategy to save with it (optional)
+    """
+    state: Dict[str, Any] = {
+        "backtest": {name: getattr(backtest, name) for name in BACKTEST_FIELDS},
+        "strategy": strategy_state(strategy) if strategy is not None else None,
+    }
+    payload = zlib.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL))
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER.pack(VERSION, zlib.crc32(payload)))
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: str, backtest=None, strategy=None) -> Dict[str, Any]:
+    """
+    Read a checkpoint written by save_checkpoint and restore it into the
+    given objects; then call backtest.run(..., resume=True) or
+    run_stream(..., resume=True) to carry on. The payload is a pickle, so
+    only load checkpoints you wrote yourself.
+    Args:
+        path: Checkpoint file
+        backtest: Backtest to restore into (optional)
+        strategy: Strategy to restore into (optional)
+    Returns:
+        The saved state: {"backtest": {attribute: value}, "strategy": ...}
+    Raises:
+        ValueError: If the file is not a checkpoint, has another format
+                    version or is damaged
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a backtest checkpoint")
+    start = len(MAGIC) + _HEADER.size
+    if len(data) < start:
+        raise ValueError(f"Checkpoint {path} is truncated")
+    version, crc = _HEADER.unpack_from(data, len(MAGIC))
+    if version != VERSION:
+        raise ValueError(f"Checkpoint {path} has format version {version}, expected {VERSION}")
+    payload = data[start:]
+    if zlib.crc32(payload) != crc:
+        raise ValueError(f"Checkpoint {path} is damaged (checksum mismatch)")
+    state = pickle.loads(zlib.decompress(payload))
+
+    if backtest is not None:
+        for name, value in state["backtest"].items():
+            setattr(backtest, name, value)
+    if strategy is not None and state["strategy"] is not None:
+        restore_strategy(strategy, state["strategy"])
+    return state
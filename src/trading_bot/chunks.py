@@ -0,0 +1,99 @@
+import os  # For file sizes
+
+import numpy as np  # For the binary equity records
+import pandas as pd  # For the chunked readers
+from typing import Iterator, Optional, Sequence  # For type hints
+
+from .ledger import EquityCurve  # Rows written by EquityFileWriter
+
+# One equity row on disk: the EquityCurve columns as a packed record
+EQUITY_RECORD = np.dtype([(name, dtype) for name, dtype in EquityCurve.COLUMNS.items()])
+
+
+def read_csv_chunks(path: str, chunksize: int = 1_000_000, timestamp_column: str = "timestamp",
+                    price_column: str = "price", usecols: Optional[Sequence[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Read a price CSV a block of rows at a time, for Backtest.run_stream.
+    Args:
+        path: CSV file with a timestamp and a price column
+        chunksize: Rows per chunk
+        timestamp_column, price_column: Renamed to 'timestamp' and 'price'
+        usecols: Columns to read (default: all)
+    """
+    reader = pd.read_csv(path, chunksize=chunksize, usecols=usecols)
+    for chunk in reader:
+        chunk = chunk.rename(columns={timestamp_column: "timestamp", price_column: "price"})
+        chunk["timestamp"] = pd.to_datetime(chunk["timestamp"])
+        yield chunk
+
+
+def read_parquet_chunks(path: str, chunksize: int = 1_000_000,
+                        columns: Optional[Sequence[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Read a Parquet file a record batch at a time (needs pyarrow).
+    """
+    try:
+        import pyarrow.parquet as pq  # Optional dependency: pip install pyarrow
+    except ImportError as e:
+        raise ImportError("read_parquet_chunks needs the pyarrow package") from e
+    parquet = pq.ParquetFile(path)
+    for batch in parquet.iter_batches(batch_size=chunksize, columns=columns):
+        yield batch.to_pandas()
+
+
+def frame_chunks(data: pd.DataFrame, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Split a DataFrame into consecutive blocks of chunksize rows (views, no copy)."""
+    for start in range(0, len(data), chunksize):
+        yield data.iloc[start:start + chunksize]
+
+
+class EquityFileWriter:
+    """
+    Appends equity rows to a binary file as packed records (int64 timestamp,
+    float64 equity, price and positions), so a long backtest never holds
+    its whole equity curve in memory. Read it back with read_equity_file.
+    """
+
+    def __init__(self, path: str, keep_rows: int = 0):
+        """
+        Args:
+            path: File to write
+            keep_rows: Keep the first keep_rows rows of an existing file and
+                       append after them (resuming from a checkpoint); 0 starts
+                       a new file. Rows written after the checkpoint are cut off.
+        """
+        self.path = path
+        self.rows = keep_rows
+        if keep_rows:
+            self._file = open(path, "r+b")
+            self._file.truncate(keep_rows * EQUITY_RECORD.itemsize)
+            self._file.seek(0, os.SEEK_END)
+        else:
+            self._file = open(path, "wb")
+
+    def write(self, curve: EquityCurve):
+        """Append every row of an EquityCurve."""
+        records = np.empty(len(curve), dtype=EQUITY_RECORD)
+        for name in EquityCurve.COLUMNS:
+            records[name] = curve.column(name)
+        records.tofile(self._file)
+        self.rows += len(records)
+
+    def flush(self):
+        """Push the written rows to disk."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def read_equity_file(path: str) -> np.ndarray:
+    """
+    Memory-map an equity file written by Backtest.run_stream (no copy).
+    Returns:
+        Record array with 'timestamp' (ns), 'equity', 'price' and 'positions' fields
+    """
+    if os.path.getsize(path) == 0:
+        return np.empty(0, dtype=EQUITY_RECORD)  # np.memmap cannot map an empty file
+    return np.memmap(path, dtype=EQUITY_RECORD, mode="r")
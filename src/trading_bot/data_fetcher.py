@@ -1,34 +1,258 @@
+import json  # For encoding the symbol list of batch requests
+import logging  # For console output that can go through a background queue
+import threading  # For guarding the snapshot cache
 import requests  # For making HTTP requests to APIs
+from requests.adapters import HTTPAdapter  # For a keep-alive connection pool per host
 import time  # For adding delays between requests
-from typing import Dict, Optional, Tuple  # For type hints
+from concurrent.futures import ThreadPoolExecutor  # For sending several requests at once
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple  # For type hints
 from datetime import datetime, timezone  # For timestamps
+from .depth import L2Book, best_triangle_fill, parse_binance_depth, parse_kraken_depth, sol_triangle_legs  # L2 books
+from .metrics import NULL_METRICS  # Default no-op instrumentation
+from .models import Quote, SpreadInfo, to_exchange  # Typed quote/spread records
+from .scheduler import RequestScheduler  # Rate limits, retries and coalescing
+
+logger = logging.getLogger(__name__)
 
 class DataFetcher:
-    def __init__(self):
+    def __init__(self, timeout: float = 5, max_workers: int = 8, snapshot_ttl: float = 1.0, metrics=None,
+                 scheduler: Optional[RequestScheduler] = None):
+        """
+        Args:
+            timeout: Seconds to wait for each HTTP request
+            max_workers: Requests that can be in flight at the same time
+            snapshot_ttl: Seconds a batch of Binance prices is reused for callers
+                          asking for the same symbols (0 disables the cache)
+            metrics: Metrics registry for request timings and error counts
+                     (default: a no-op that records nothing)
+            scheduler: Keeps requests within each exchange's rate limit, retries
+                       429/5xx/timeouts with backoff and coalesces duplicate
+                       requests (default: one with DEFAULT_LIMITS)
+        """
         # API endpoints for getting BTC/USDT prices
         self.binance_url = "https://api.binance.com/api/v3/ticker/price"
         self.kraken_url = "https://api.kraken.com/0/public/Ticker"
+        self.timeout = timeout
+        # One shared session keeps TCP/TLS connections open between calls
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # Worker threads used to send all legs of a check at the same time
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetcher")
+        # Latest Binance quote per symbol from batch requests, served while fresh
+        self.snapshot_ttl = snapshot_ttl
+        self._snapshot: Dict[str, Quote] = {}
+        self._full_snapshot_ts = 0.0  # response time of the last all-symbols request
+        self._snapshot_lock = threading.Lock()
+        self.metrics = metrics or NULL_METRICS
+        self.scheduler = scheduler or RequestScheduler(metrics=self.metrics)
 
-    def get_binance_price(self, symbol: str) -> Optional[float]:
-        url = f"https://api.binance.com/api/v3/ticker/price?symbol={symbol}"
+    def close(self):
+        """Close pooled connections and stop the worker threads."""
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _get_json(self, url: str, params: Optional[Dict[str, str]] = None,
+                  exchange: str = "binance", weight: float = 1.0) -> Tuple[Any, float, float]:
+        """
+        GET a URL on the pooled session, through the scheduler: it waits for
+        the exchange's request budget, retries rate-limit and server errors,
+        and callers asking for the same URL at the same time share one request.
+        Returns:
+            (parsed JSON, request timestamp, response timestamp)
+        """
+        key = (url, tuple(sorted(params.items())) if params else ())
+        return self.scheduler.call(exchange, key, lambda: self._send(url, params, exchange), weight)
+
+    def _send(self, url: str, params: Optional[Dict[str, str]], exchange: str) -> Tuple[Any, float, float]:
+        """
+        One GET attempt. Network and JSON parsing time are recorded separately,
+        with request and error counts per exchange.
+        """
+        metrics = self.metrics
+        metrics.inc("fetch_requests_total", exchange=exchange)
+        request_ts = time.time()
         try:
-            response = requests.get(url, timeout=5)
+            response = self.session.get(url, params=params, timeout=self.timeout)
+            response_ts = time.time()
             response.raise_for_status()
-            return float(response.json()['price'])
-        except Exception as e:
-            print(f"Error fetching {symbol} from Binance: {e}")
+        except requests.Timeout:
+            metrics.inc("fetch_errors_total", exchange=exchange, kind="timeout")
+            raise
+        except requests.HTTPError:
+            metrics.inc("fetch_errors_total", exchange=exchange, kind="http")
+            raise
+        except Exception:
+            metrics.inc("fetch_errors_total", exchange=exchange, kind="other")
+            raise
+        metrics.observe("fetch_network_seconds", response_ts - request_ts, exchange=exchange)
+        with metrics.timer("fetch_parse_seconds", exchange=exchange):
+            data = response.json()
+        return data, request_ts, response_ts
+
+    def fetch_concurrently(self, *calls: Callable[[], Any]) -> List[Any]:
+        """
+        Run several fetch calls at the same time and wait for all of them.
+        Args:
+            calls: Zero-argument callables, e.g. lambda: fetcher.get_binance_quote("BTCUSDT")
+        Returns:
+            Their results, in the same order as the calls
+        """
+        futures = [self._executor.submit(call) for call in calls]
+        return [future.result() for future in futures]
+
+    def _cached_binance_quotes(self, symbols: Optional[List[str]], max_age: float) -> Optional[Dict[str, Quote]]:
+        """Quotes from the snapshot if every requested symbol is fresh enough, else None."""
+        if max_age <= 0:
             return None
+        oldest_allowed = time.time() - max_age
+        with self._snapshot_lock:
+            if symbols is None:
+                if self._full_snapshot_ts < oldest_allowed:
+                    return None
+                return dict(self._snapshot)
+            quotes = {symbol: self._snapshot.get(symbol) for symbol in symbols}
+        if any(quote is None or quote.response_ts < oldest_allowed for quote in quotes.values()):
+            return None
+        return quotes
+
+    def get_binance_quotes(self, symbols: Optional[Iterable[str]] = None,
+                           max_age: Optional[float] = None) -> Dict[str, Quote]:
+        """
+        Fetch the prices of many Binance symbols with a single request.
+        Args:
+            symbols: Symbols to fetch, e.g. ["BTCUSDT", "SOLUSDT"]; None fetches every listed symbol
+            max_age: Reuse a snapshot younger than this many seconds (default: snapshot_ttl)
+        Returns:
+            Symbol -> Quote (empty dict if the request failed)
+        """
+        with self.metrics.timer("fetch_call_seconds", call="get_binance_quotes"):
+            return self._get_binance_quotes(symbols, max_age)
+
+    def _get_binance_quotes(self, symbols: Optional[Iterable[str]], max_age: Optional[float]) -> Dict[str, Quote]:
+        symbols = sorted(set(symbols)) if symbols is not None else None
+        cached = self._cached_binance_quotes(symbols, self.snapshot_ttl if max_age is None else max_age)
+        if cached is not None:
+            self.metrics.inc("snapshot_hits_total")
+            return cached
+
+        # Binance expects the list as compact JSON: symbols=["BTCUSDT","SOLUSDT"]
+        params = {"symbols": json.dumps(symbols, separators=(",", ":"))} if symbols is not None else None
+        try:
+            # Request weight: 2 for one symbol, 4 for a list or all of them
+            weight = 2 if symbols is not None and len(symbols) == 1 else 4
+            data, request_ts, response_ts = self._get_json(self.binance_url, params, weight=weight)
+        except Exception as e:
+            logger.warning(f"Error fetching {', '.join(symbols) if symbols else 'all symbols'} from Binance: {e}")
+            return {}
+        quotes = {
+            item["symbol"]: Quote("binance", item["symbol"], float(item["price"]), request_ts, response_ts)
+            for item in data
+        }
+        with self._snapshot_lock:
+            self._snapshot.update(quotes)
+            if symbols is None:
+                self._full_snapshot_ts = response_ts
+        return quotes
+
+    def get_binance_prices(self, symbols: Optional[Iterable[str]] = None,
+                           max_age: Optional[float] = None) -> Dict[str, float]:
+        """Same as get_binance_quotes, but returns symbol -> price."""
+        return {symbol: quote.price for symbol, quote in self.get_binance_quotes(symbols, max_age).items()}
+
+    def get_binance_symbol_pairs(self) -> Dict[str, Tuple[str, str]]:
+        """
+        Base and quote currency of every symbol Binance is trading, e.g.
+        {"SOLBTC": ("SOL", "BTC")}. Meant to be called once at startup.
+        """
+        try:
+            data, _, _ = self._get_json("https://api.binance.com/api/v3/exchangeInfo")
+        except Exception as e:
+            logger.warning(f"Error fetching Binance exchange info: {e}")
+            return {}
+        return {
+            item["symbol"]: (item["baseAsset"], item["quoteAsset"])
+            for item in data["symbols"] if item.get("status") == "TRADING"
+        }
+
+    def get_binance_quote(self, symbol: str) -> Optional[Quote]:
+        return self.get_binance_quotes([symbol]).get(symbol)
+
+    def get_binance_price(self, symbol: str) -> Optional[float]:
+        quote = self.get_binance_quote(symbol)
+        return quote.price if quote else None
+
+    def get_sol_triangular_quotes(self) -> Tuple[Optional[Quote], Optional[Quote], Optional[Quote]]:
+        # All three legs come from one batch request, so the prices line up
+        quotes = self.get_binance_quotes(["BTCUSDT", "SOLUSDT", "SOLBTC"])
+        return quotes.get("BTCUSDT"), quotes.get("SOLUSDT"), quotes.get("SOLBTC")
+
+    def get_binance_book(self, symbol: str, limit: int = 20) -> Optional[L2Book]:
+        """
+        Fetch the top `limit` levels of a Binance order book.
+        Returns:
+            depth.L2Book, or None if the request failed
+        """
+        with self.metrics.timer("fetch_call_seconds", call="get_binance_book"):
+            try:
+                # Request weight: 5 up to 100 levels, 25 up to 500, 50 up to 1000
+                weight = 5 if limit <= 100 else 25 if limit <= 500 else 50
+                data, _, response_ts = self._get_json("https://api.binance.com/api/v3/depth",
+                                                      {"symbol": symbol, "limit": str(limit)}, weight=weight)
+                return parse_binance_depth(data, symbol, response_ts)
+            except Exception as e:
+                logger.warning(f"Error fetching {symbol} order book from Binance: {e}")
+                return None
+
+    def get_kraken_book(self, pair: str = "XBTUSDT", count: int = 20) -> Optional[L2Book]:
+        """Same as get_binance_book, for a Kraken pair."""
+        with self.metrics.timer("fetch_call_seconds", call="get_kraken_book"):
+            try:
+                data, _, response_ts = self._get_json("https://api.kraken.com/0/public/Depth",
+                                                      {"pair": pair, "count": str(count)}, exchange="kraken")
+                return parse_kraken_depth(data, pair, response_ts)
+            except Exception as e:
+                logger.warning(f"Error fetching {pair} order book from Kraken: {e}")
+                return None
+
+    def get_sol_triangular_books(self, limit: int = 20) -> Tuple[Optional[L2Book], ...]:
+        """Order books of the three triangle legs (BTCUSDT, SOLUSDT, SOLBTC), fetched at the same time."""
+        return tuple(self.fetch_concurrently(*(
+            lambda symbol=symbol: self.get_binance_book(symbol, limit) for symbol in ("BTCUSDT", "SOLUSDT", "SOLBTC")
+        )))
 
     def get_sol_triangular_prices(self):
-        btc_usdt = self.get_binance_price("BTCUSDT")
-        sol_usdt = self.get_binance_price("SOLUSDT")
-        sol_btc = self.get_binance_price("SOLBTC")
+        quotes = self.get_sol_triangular_quotes()
+        btc_usdt, sol_usdt, sol_btc = (quote.price if quote else None for quote in quotes)
         return btc_usdt, sol_usdt, sol_btc
 
-    def check_sol_triangular_arbitrage(self, min_spread_pct=0.2, trades=None):
-        btc_usdt, sol_usdt, sol_btc = self.get_sol_triangular_prices()
+    def check_sol_triangular_arbitrage(self, min_spread_pct=0.2, trades=None, prices=None, depth=0,
+                                       fee_pct=0.1, books=None):
+        """
+        Check the SOL/BTC/USDT triangle for an arbitrage opportunity.
+        Args:
+            min_spread_pct: Minimum spread percentage to report
+            trades: Optional list that detected opportunities are appended to
+            prices: Optional (btc_usdt, sol_usdt, sol_btc) already fetched by
+                    the caller; fetched here when not given
+            depth: When an opportunity shows up, fetch this many order book
+                   levels per leg and size the trade from them (0 = prices only)
+            fee_pct: Taker fee per leg in percent, used when sizing from the books
+            books: Optional (btc_usdt, sol_usdt, sol_btc) depth.L2Book already
+                   fetched by the caller, used instead of fetching `depth` levels
+        """
+        if prices is None:
+            prices = self.get_sol_triangular_prices()
+        btc_usdt, sol_usdt, sol_btc = prices
         if None in (btc_usdt, sol_usdt, sol_btc):
-            print("Could not fetch all prices for SOL triangular arbitrage.")
+            logger.warning("Could not fetch all prices for SOL triangular arbitrage.")
             return
 
         assert isinstance(btc_usdt, float)
@@ -39,57 +263,97 @@ class DataFetcher:
         spread = implied_sol_usdt - sol_usdt
         spread_pct = (spread / sol_usdt) * 100
 
-        print(f"SOL/USDT: {sol_usdt}")
-        print(f"Implied SOL/USDT via BTC: {implied_sol_usdt}")
-        print(f"Spread: {abs(spread):.4f} ({abs(spread_pct):.3f}%)")
+        logger.info(f"SOL/USDT: {sol_usdt}")
+        logger.info(f"Implied SOL/USDT via BTC: {implied_sol_usdt}")
+        logger.info(f"Spread: {abs(spread):.4f} ({abs(spread_pct):.3f}%)")
 
         if abs(spread_pct) > min_spread_pct:
-            print("🚨 SOL Triangular Arbitrage Opportunity Detected!")
+            logger.info("🚨 SOL Triangular Arbitrage Opportunity Detected!")
+            trade = {
+                "type": "SOL",
+                "direction": "forward" if spread > 0 else "reverse",
+                "spread_pct": abs(spread_pct),
+                "spread": abs(spread),
+                "sol_usdt": sol_usdt,
+                "implied_sol_usdt": implied_sol_usdt,
+                "timestamp": time.strftime('%Y-%m-%d %H:%M:%S')
+            }
+            if books is None and depth:
+                books = self.get_sol_triangular_books(depth)
+            if books is not None:
+                trade.update(self._size_sol_triangle(books, spread > 0, fee_pct))
             if trades is not None:
-                trades.append({
-                    "type": "SOL",
-                    "direction": "forward" if spread > 0 else "reverse",
-                    "spread_pct": abs(spread_pct),
-                    "spread": abs(spread),
-                    "sol_usdt": sol_usdt,
-                    "implied_sol_usdt": implied_sol_usdt,
-                    "timestamp": time.strftime('%Y-%m-%d %H:%M:%S')
-                })
+                trades.append(trade)
             if spread > 0:
-                print("Buy SOL/USDT, Sell SOL/BTC for BTC, Sell BTC/USDT for USDT")
+                logger.info("Buy SOL/USDT, Sell SOL/BTC for BTC, Sell BTC/USDT for USDT")
             else:
-                print("Buy SOL/BTC for BTC, Buy BTC/USDT for USDT, Sell SOL/USDT")
+                logger.info("Buy SOL/BTC for BTC, Buy BTC/USDT for USDT, Sell SOL/USDT")
+
+    @staticmethod
+    def _size_sol_triangle(books, forward: bool, fee_pct: float) -> Dict[str, Any]:
+        """Most profitable USDT amount for the triangle, walking each leg's book."""
+        if None in books:
+            logger.warning("Could not fetch all order books for SOL triangular arbitrage.")
+            return {}
+        fill = best_triangle_fill(sol_triangle_legs(*books, forward=forward), fee_pct)
+        if fill is None:
+            logger.info(f"No executable size: the books do not cover {fee_pct:g}% fees per leg")
+            return {"amount_usdt": 0.0, "profit_usdt": 0.0}
+        logger.info(f"Executable: {fill.amount_in:,.2f} USDT -> {fill.amount_out:,.2f} USDT "
+                    f"(profit {fill.profit:,.2f}, {fill.profit_pct:.3f}% after fees)")
+        return {"amount_usdt": fill.amount_in, "profit_usdt": fill.profit, "net_pct": fill.profit_pct,
+                "legs": [{"symbol": symbol, "side": side, "qty": qty, "vwap": vwap}
+                         for symbol, side, qty, vwap in fill.legs]}
 
     def get_binance_btc_usdt(self) -> Optional[float]:
         return self.get_binance_price("BTCUSDT")
 
+    def get_kraken_quote(self, pair: str = "XBTUSDT") -> Optional[Quote]:
+        with self.metrics.timer("fetch_call_seconds", call="get_kraken_quote"):
+            try:
+                data, request_ts, response_ts = self._get_json(self.kraken_url, {"pair": pair}, exchange="kraken")
+                price = float(data['result'][pair]['c'][0])
+                return Quote("kraken", pair, price, request_ts, response_ts)
+            except Exception as e:
+                logger.warning(f"Error fetching Kraken price: {e}")
+                return None
+
     def get_kraken_btc_usdt(self) -> Optional[float]:
-        try:
-            response = requests.get(f"{self.kraken_url}?pair=XBTUSDT", timeout=5)
-            response.raise_for_status()
-            data = response.json()
-            price = float(data['result']['XBTUSDT']['c'][0])
-            return price
-        except Exception as e:
-            print(f"Error fetching Kraken price: {e}")
-            return None
+        quote = self.get_kraken_quote("XBTUSDT")
+        return quote.price if quote else None
+
+    def get_both_quotes(self) -> Tuple[Optional[Quote], Optional[Quote]]:
+        # Both exchanges are asked at the same time, so one round trip per check
+        binance_quote, kraken_quote = self.fetch_concurrently(
+            lambda: self.get_binance_quote("BTCUSDT"),
+            lambda: self.get_kraken_quote("XBTUSDT")
+        )
+        return binance_quote, kraken_quote
 
     def get_both_prices(self) -> Tuple[Optional[float], Optional[float]]:
-        binance_price = self.get_binance_btc_usdt()
-        kraken_price = self.get_kraken_btc_usdt()
+        binance_quote, kraken_quote = self.get_both_quotes()
+        binance_price = binance_quote.price if binance_quote else None
+        kraken_price = kraken_quote.price if kraken_quote else None
         return binance_price, kraken_price
 
-    def calculate_spread(self, price1: float, price2: float) -> Dict[str, float | str]:
-        spread = abs(price1 - price2)
-        spread_pct = (spread / min(price1, price2)) * 100
-        return {
-            "spread": spread,
-            "spread_pct": spread_pct,
-            "lower_price": min(price1, price2),
-            "higher_price": max(price1, price2),
-            "lower_exchange": "binance" if price1 < price2 else "kraken",
-            "higher_exchange": "kraken" if price1 < price2 else "binance"
-        }
+    @staticmethod
+    def calculate_spread(price1: float, price2: float, exchange1: str = "binance",
+                         exchange2: str = "kraken") -> SpreadInfo:
+        """
+        Spread between two prices of the same asset.
+        Args:
+            price1, price2: The prices
+            exchange1, exchange2: Where each price comes from (default Binance and Kraken);
+                                  see monitor.SpreadMonitor for many venues at once
+        Returns:
+            SpreadInfo with typed fields (spread_info.spread_pct is always a float);
+            spread_info["lower_exchange"] etc. still work as with the old dict
+        """
+        if price1 < price2:
+            return SpreadInfo(price2 - price1, (price2 - price1) / price1 * 100, price1, price2,
+                              to_exchange(exchange1), to_exchange(exchange2))
+        return SpreadInfo(price1 - price2, (price1 - price2) / price2 * 100, price2, price1,
+                          to_exchange(exchange2), to_exchange(exchange1))
 
 # Test function to verify the data fetcher works
 def test_data_fetcher():
@@ -109,4 +373,5 @@ def test_data_fetcher():
     fetcher.check_sol_triangular_arbitrage(min_spread_pct=0.2)
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")  # Show the arbitrage checks
     test_data_fetcher() 
\ No newline at end of file
@@ -0,0 +1,446 @@
+import math  # For the golden-section search
+import random  # For the simulated depth feed
+import time  # For update timestamps
+from bisect import bisect_left  # For finding price levels in the sorted lists
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple  # For type hints
+
+from .stream import BookTop  # Best bid/ask of one symbol on one exchange
+
+Level = Tuple[float, float]  # (price, quantity)
+
+
+class BookSide:
+    """
+    One side of an L2 order book: price levels kept sorted best first in
+    plain lists, so finding a level is a binary search and walking the book
+    for a fill reads the lists in order. A quantity of 0 removes a level.
+    """
+
+    def __init__(self, descending: bool):
+        """
+        Args:
+            descending: True for bids (highest price first), False for asks
+        """
+        self._sign = -1.0 if descending else 1.0
+        self._keys: List[float] = []  # sign * price, ascending, for bisect
+        self.prices: List[float] = []  # Best first
+        self.qtys: List[float] = []
+
+    def set(self, price: float, qty: float):
+        """Set the quantity at one price level (0 removes the level)."""
+        key = price * self._sign
+        i = bisect_left(self._keys, key)
+        found = i < len(self._keys) and self._keys[i] == key
+        if qty <= 0:
+            if found:
+                del self._keys[i], self.prices[i], self.qtys[i]
+        elif found:
+            self.qtys[i] = qty
+        else:
+            self._keys.insert(i, key)
+            self.prices.insert(i, price)
+            self.qtys.insert(i, qty)
+
+    def clear(self):
+        self._keys.clear()
+        self.prices.clear()
+        self.qtys.clear()
+
+    def best(self) -> Optional[Level]:
+        return (self.prices[0], self.qtys[0]) if self.prices else None
+
+    def levels(self) -> Iterator[Level]:
+        """(price, qty) from the best level outwards."""
+        return zip(self.prices, self.qtys)
+
+    def depth(self) -> float:
+        """Total quantity on this side."""
+        return sum(self.qtys)
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+
+class Fill(NamedTuple):
+    """Result of walking one side of a book."""
+    qty: float  # Base quantity filled (less than asked if the book ran out)
+    notional: float  # Quote amount paid or received
+    vwap: float  # notional / qty (NaN if nothing filled)
+
+
+class L2Book:
+    """Bids and asks of one symbol on one exchange, updated level by level."""
+
+    def __init__(self, exchange: str, symbol: str):
+        self.exchange = exchange
+        self.symbol = symbol
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide(descending=False)
+        self.updated_ts = 0.0  # time.time() of the last update
+
+    def apply(self, bids: Iterable[Level] = (), asks: Iterable[Level] = (), ts: Optional[float] = None):
+        """Apply changed levels (quantity 0 removes a level), as depth diff streams send them."""
+        for price, qty in bids:
+            self.bids.set(float(price), float(qty))
+        for price, qty in asks:
+            self.asks.set(float(price), float(qty))
+        self.updated_ts = time.time() if ts is None else ts
+
+    def replace(self, bids: Iterable[Level], asks: Iterable[Level], ts: Optional[float] = None):
+        """Replace the whole book with a snapshot."""
+        self.bids.clear()
+        self.asks.clear()
+        self.apply(bids, asks, ts)
+
+    def top(self) -> Optional[BookTop]:
+        """Best bid/ask as a BookTop (None while a side is empty)."""
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return BookTop(self.exchange, self.symbol, bid[0], bid[1], ask[0], ask[1], self.updated_ts)
+
+    def fill(self, side: str, qty: float) -> Fill:
+        """
+        Price of a market order for qty base units.
+        Args:
+            side: "buy" takes the asks, "sell" hits the bids
+        """
+        book_side = self.asks if side == "buy" else self.bids
+        remaining = qty
+        notional = 0.0
+        for price, size in book_side.levels():
+            take = size if size < remaining else remaining
+            notional += take * price
+            remaining -= take
+            if remaining <= 0:
+                break
+        filled = qty - max(remaining, 0.0)
+        return Fill(filled, notional, notional / filled if filled > 0 else math.nan)
+
+    def spend(self, quote_amount: float) -> Fill:
+        """Market buy for a quote budget instead of a base quantity (walks the asks)."""
+        remaining = quote_amount
+        qty = 0.0
+        for price, size in self.asks.levels():
+            cost = size * price
+            if cost >= remaining:
+                qty += remaining / price
+                remaining = 0.0
+                break
+            qty += size
+            remaining -= cost
+        spent = quote_amount - remaining
+        return Fill(qty, spent, spent / qty if qty > 0 else math.nan)
+
+
+class DepthSpread(NamedTuple):
+    """Largest cross-venue trade that still makes money after fees, priced level by level."""
+    symbol: str
+    buy_venue: str
+    sell_venue: str
+    qty: float  # Base quantity to buy on buy_venue and sell on sell_venue
+    buy_vwap: float  # Average price paid
+    sell_vwap: float  # Average price received
+    profit: float  # Quote currency, after both taker fees
+    profit_pct: float  # profit / amount paid (fees included), in percent
+
+
+def executable_spread(buy_book: L2Book, sell_book: L2Book, buy_fee_pct: float = 0.0, sell_fee_pct: float = 0.0,
+                      max_qty: Optional[float] = None) -> Optional[DepthSpread]:
+    """
+    Walk buy_book's asks and sell_book's bids together while the next unit
+    still sells for more than it costs after fees. That stops exactly at the
+    most profitable size: every level pair taken adds profit, the next one
+    would lose money.
+    Args:
+        buy_book, sell_book: Books of the same symbol on two venues
+        buy_fee_pct, sell_fee_pct: Taker fee of each venue in percent
+        max_qty: Cap on the size (e.g. the balance available)
+    Returns:
+        DepthSpread, or None if not even the best levels are profitable
+    """
+    asks, bids = buy_book.asks, sell_book.bids
+    buy_mult = 1 + buy_fee_pct / 100
+    sell_mult = 1 - sell_fee_pct / 100
+    limit = math.inf if max_qty is None else max_qty
+    i = j = 0
+    ask_left = asks.qtys[0] if asks.qtys else 0.0
+    bid_left = bids.qtys[0] if bids.qtys else 0.0
+    qty = cost = revenue = 0.0
+    while i < len(asks) and j < len(bids) and qty < limit:
+        ask_price, bid_price = asks.prices[i], bids.prices[j]
+        if bid_price * sell_mult <= ask_price * buy_mult:
+            break
+        take = min(ask_left, bid_left, limit - qty)
+        qty += take
+        cost += take * ask_price
+        revenue += take * bid_price
+        ask_left -= take
+        bid_left -= take
+        if ask_left <= 0:
+            i += 1
+            ask_left = asks.qtys[i] if i < len(asks) else 0.0
+        if bid_left <= 0:
+            j += 1
+            bid_left = bids.qtys[j] if j < len(bids) else 0.0
+    if qty <= 0:
+        return None
+    paid = cost * buy_mult
+    profit = revenue * sell_mult - paid
+    return DepthSpread(buy_book.symbol, buy_book.exchange, sell_book.exchange, qty,
+                       cost / qty, revenue / qty, profit, profit / paid * 100)
+
+
+class DepthEvaluator:
+    """
+    L2 books of many symbols on many venues. Each update re-evaluates only
+    the updated symbol against the other venues' books of that symbol, in
+    both directions, so the work per update does not grow with the number
+    of symbols watched.
+    """
+
+    def __init__(self, fees: Optional[Dict[str, float]] = None, min_profit: float = 0.0,
+                 max_age: Optional[float] = None):
+        """
+        Args:
+            fees: Taker fee per venue in percent (default 0)
+            min_profit: Only report trades making more than this (quote currency)
+            max_age: Ignore books not updated for this many seconds (None = never stale)
+        """
+        self.fees = fees or {}
+        self.min_profit = min_profit
+        self.max_age = max_age
+        self.books: Dict[str, Dict[str, L2Book]] = {}  # symbol -> venue -> book
+
+    def book(self, venue: str, symbol: str) -> L2Book:
+        """The book of symbol on venue, created empty on first use."""
+        venues = self.books.setdefault(symbol, {})
+        if venue not in venues:
+            venues[venue] = L2Book(venue, symbol)
+        return venues[venue]
+
+    def update(self, venue: str, symbol: str, bids: Iterable[Level] = (), asks: Iterable[Level] = (),
+               ts: Optional[float] = None, snapshot: bool = False) -> List[DepthSpread]:
+        """
+        Apply a depth update (or a whole snapshot) and evaluate the symbol.
+        Returns:
+            Profitable cross-venue trades for this symbol, best first
+        """
+        book = self.book(venue, symbol)
+        if snapshot:
+            book.replace(bids, asks, ts)
+        else:
+            book.apply(bids, asks, ts)
+        return self.evaluate(symbol, now=book.updated_ts)
+
+    def evaluate(self, symbol: str, now: Optional[float] = None) -> List[DepthSpread]:
+        """Best executable trade between every pair of venues quoting symbol."""
+        now = time.time() if now is None else now
+        books = [book for book in self.books.get(symbol, {}).values()
+                 if self.max_age is None or now - book.updated_ts <= self.max_age]
+        results = []
+        for buy_book in books:
+            for sell_book in books:
+                if buy_book is sell_book:
+                    continue
+                spread = executable_spread(buy_book, sell_book, self.fees.get(buy_book.exchange, 0.0),
+                                           self.fees.get(sell_book.exchange, 0.0))
+                if spread is not None and spread.profit > self.min_profit:
+                    results.append(spread)
+        results.sort(key=lambda spread: spread.profit, reverse=True)
+        return results
+
+
+class TriangleLeg(NamedTuple):
+    book: L2Book
+    side: str  # "buy": spend the quote currency on the base; "sell": sell the base for the quote
+
+
+class TriangleFill(NamedTuple):
+    """Most profitable start amount for a cycle of trades, priced level by level."""
+    amount_in: float  # Start currency put in (e.g. USDT)
+    amount_out: float  # Start currency back after all legs and fees
+    profit: float
+    profit_pct: float
+    legs: Tuple[Tuple[str, str, float, float], ...]  # (symbol, side, base qty, vwap) per leg
+
+
+def _run_legs(legs: Sequence[TriangleLeg], amount: float, fee_mult: float) -> Optional[List[Fill]]:
+    """Fills of every leg for a start amount; None if some book is too thin for it."""
+    fills = []
+    for leg in legs:
+        if leg.side == "buy":
+            fill = leg.book.spend(amount)
+            if fill.notional < amount * (1 - 1e-12):
+                return None
+            amount = fill.qty * fee_mult
+        else:
+            fill = leg.book.fill("sell", amount)
+            if fill.qty < amount * (1 - 1e-12):
+                return None
+            amount = fill.notional * fee_mult
+        fills.append(fill)
+    return fills
+
+
+def triangle_amount_out(legs: Sequence[TriangleLeg], amount: float, fee_pct: float = 0.0) -> Optional[float]:
+    """Start currency back after sending amount round the legs; None if some book is too thin for it."""
+    return _amount_out(legs, amount, 1 - fee_pct / 100)
+
+
+def _amount_out(legs: Sequence[TriangleLeg], amount: float, fee_mult: float) -> Optional[float]:
+    fills = _run_legs(legs, amount, fee_mult)
+    if fills is None:
+        return None
+    last = fills[-1]
+    return (last.qty if legs[-1].side == "buy" else last.notional) * fee_mult
+
+
+def best_triangle_fill(legs: Sequence[TriangleLeg], fee_pct: float = 0.0, max_amount: Optional[float] = None,
+                       iterations: int = 40) -> Optional[TriangleFill]:
+    """
+    Most profitable amount to send round a cycle such as USDT -> SOL -> BTC -> USDT.
+    Each leg walks its book, so the profit is a concave function of the
+    amount (every extra unit gets a worse price); a golden-section search
+    finds its maximum between 0 and the most the thinnest book can take.
+    Args:
+        legs: The trades in order; each leg's output is the next one's input
+        fee_pct: Taker fee per leg in percent
+        max_amount: Cap on the start amount (e.g. the balance available)
+        iterations: Search steps (each one runs the legs once)
+    Returns:
+        TriangleFill, or None if no amount makes money
+    """
+    fee_mult = 1 - fee_pct / 100
+    # The most the books can take: find it by doubling, then bisecting
+    high = max_amount if max_amount is not None else 1.0
+    if max_amount is None:
+        while _amount_out(legs, high, fee_mult) is not None and high < 1e18:
+            high *= 2
+    low = 0.0
+    if _amount_out(legs, high, fee_mult) is None:
+        for _ in range(iterations):
+            middle = (low + high) / 2
+            if _amount_out(legs, middle, fee_mult) is None:
+                high = middle
+            else:
+                low = middle
+        high = low
+    if high <= 0:
+        return None
+
+    def profit(amount: float) -> float:
+        out = _amount_out(legs, amount, fee_mult)
+        return -math.inf if out is None else out - amount
+
+    ratio = (math.sqrt(5) - 1) / 2
+    a, b = 0.0, high
+    c, d = b - ratio * (b - a), a + ratio * (b - a)
+    profit_c, profit_d = profit(c), profit(d)
+    for _ in range(iterations):
+        if profit_c >= profit_d:
+            b, d, profit_d = d, c, profit_c
+            c = b - ratio * (b - a)
+            profit_c = profit(c)
+        else:
+            a, c, profit_c = c, d, profit_d
+            d = a + ratio * (b - a)
+            profit_d = profit(d)
+    amount = c if profit_c >= profit_d else d
+    if profit(high) > max(profit_c, profit_d):
+        amount = high  # Still profitable at the deepest fillable amount
+    best = profit(amount)
+    if best <= 0:
+        return None
+    fills = _run_legs(legs, amount, fee_mult)
+    described = tuple((leg.book.symbol, leg.side, fill.qty, fill.vwap) for leg, fill in zip(legs, fills))
+    return TriangleFill(amount, amount + best, best, best / amount * 100, described)
+
+
+def sol_triangle_legs(btc_usdt: L2Book, sol_usdt: L2Book, sol_btc: L2Book, forward: bool) -> List[TriangleLeg]:
+    """
+    Legs of the SOL/BTC/USDT triangle, starting and ending in USDT.
+    forward: USDT -> SOL -> BTC -> USDT; otherwise USDT -> BTC -> SOL -> USDT
+    """
+    if forward:
+        return [TriangleLeg(sol_usdt, "buy"), TriangleLeg(sol_btc, "sell"), TriangleLeg(btc_usdt, "sell")]
+    return [TriangleLeg(btc_usdt, "buy"), TriangleLeg(sol_btc, "buy"), TriangleLeg(sol_usdt, "sell")]
+
+
+def parse_binance_depth(data: Dict[str, Any], symbol: str, received_ts: Optional[float] = None) -> L2Book:
+    """Book from a Binance /api/v3/depth reply."""
+    book = L2Book("binance", symbol)
+    book.replace(((float(p), float(q)) for p, q in data["bids"]),
+                 ((float(p), float(q)) for p, q in data["asks"]), received_ts)
+    return book
+
+
+def parse_kraken_depth(data: Dict[str, Any], symbol: str, received_ts: Optional[float] = None) -> L2Book:
+    """Book from a Kraken /0/public/Depth reply (levels are [price, volume, timestamp])."""
+    result = next(iter(data["result"].values()))  # Kraken answers under its own pair name
+    book = L2Book("kraken", symbol)
+    book.replace(((float(level[0]), float(level[1])) for level in result["bids"]),
+                 ((float(level[0]), float(level[1])) for level in result["asks"]), received_ts)
+    return book
+
+
+class SimulatedDepthFeed:
+    """
+    Offline depth feed for one symbol: a snapshot of `levels` price levels a
+    tick apart on each side around a random-walk mid, then diffs like an
+    exchange's depth stream (levels changed or removed, new levels added as
+    the mid moves). Lets the evaluator be tested and timed without a network.
+    """
+
+    def __init__(self, exchange: str, symbol: str, mid: float = 100.0, tick: float = 0.01, levels: int = 20,
+                 qty: float = 1.0, seed: int = 0):
+        self.exchange = exchange
+        self.symbol = symbol
+        self.mid = mid
+        self.tick = tick
+        self.levels = levels
+        self.qty = qty
+        self._rng = random.Random(seed)
+        self._bids: Dict[float, float] = {}
+        self._asks: Dict[float, float] = {}
+
+    def _price(self, steps: int) -> float:
+        return round(round(self.mid / self.tick) * self.tick + steps * self.tick, 10)
+
+    def _target(self) -> Tuple[Dict[float, float], Dict[float, float]]:
+        rng = self._rng
+        bids = {self._price(-k): round(self.qty * rng.uniform(0.2, 2.0), 6) for k in range(1, self.levels + 1)}
+        asks = {self._price(k): round(self.qty * rng.uniform(0.2, 2.0), 6) for k in range(1, self.levels + 1)}
+        return bids, asks
+
+    def snapshot(self) -> Tuple[List[Level], List[Level]]:
+        """Whole book: (bids, asks)."""
+        self._bids, self._asks = self._target()
+        return sorted(self._bids.items(), reverse=True), sorted(self._asks.items())
+
+    def step(self, changes: int = 3) -> Tuple[List[Level], List[Level]]:
+        """
+        Move the mid by up to a tick and change a few levels.
+        Returns:
+            (bid changes, ask changes), quantity 0 for removed levels
+        """
+        self.mid += self._rng.choice((-1, 0, 1)) * self.tick
+        target_bids, target_asks = self._target()
+        # Keep most existing quantities; only `changes` levels per side get new ones
+        diffs = []
+        for current, target in ((self._bids, target_bids), (self._asks, target_asks)):
+            changed = {price: 0.0 for price in current if price not in target}
+            for price in target:
+                if price not in current or self._rng.random() < changes / self.levels:
+                    changed[price] = target[price]
+            for price, qty in changed.items():
+                if qty:
+                    current[price] = qty
+                else:
+                    del current[price]
+            diffs.append(sorted(changed.items()))
+        return diffs[0], diffs[1]
+
+    def book(self) -> Tuple[List[Level], List[Level]]:
+        """The feed's own current book, to check a book kept from its diffs."""
+        return sorted(self._bids.items(), reverse=True), sorted(self._asks.items())
@@ -0,0 +1,310 @@
+import heapq  # For the event queue
+import random  # For latency jitter
+import time  # For measuring throughput
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union  # For type hints
+
+import numpy as np  # For merging the quote streams
+import pandas as pd  # For the fills table
+
+from .ledger import column_to_ns  # For timestamp columns
+from .scanner import split_symbol  # For base/quote assets of a symbol
+
+# Kinds of scheduled events (quotes come from the merged streams, not the heap)
+FILL = 0
+TIMER = 1
+
+FILL_COLUMNS = ["timestamp", "order_id", "venue", "symbol", "side", "qty", "price", "fee"]
+
+
+class Leg(NamedTuple):
+    """One part of an order: trade qty of symbol on a venue."""
+    venue: str  # e.g. "binance"
+    symbol: str  # Venue symbol, e.g. "BTCUSDT" or "XBTUSDT"
+    side: str  # "buy" or "sell"
+    qty: float  # Amount of the base asset
+
+
+class EventEngine:
+    """
+    Event-driven backtest over several venues and assets.
+    Quotes are given as per-(venue, symbol) arrays, merged once by time and
+    walked in order; orders and timers are scheduled on a heap and run
+    between quotes when their time comes. Balances are kept per (venue,
+    asset). An order is a list of legs that fills after the venue latency at
+    the prices current at that moment, all legs or none: if any leg cannot
+    be paid for (fees included) the whole order is rejected.
+    """
+
+    def __init__(self, balances: Dict[Tuple[str, str], float], fees: Optional[Dict[str, float]] = None,
+                 default_fee: float = 0.001, latency_ms: Union[float, Dict[str, float]] = 0.0,
+                 jitter_ms: float = 0.0, seed: int = 0,
+                 symbols: Optional[Dict[str, Tuple[str, str]]] = None):
+        """
+        Args:
+            balances: Starting (venue, asset) -> amount, e.g. {("binance", "USDT"): 10000}
+            fees: Taker fee rate per venue, e.g. {"binance": 0.001, "kraken": 0.0026}
+            default_fee: Fee rate of venues not in fees
+            latency_ms: Time from submitting an order to its fill, one value or per venue
+            jitter_ms: Extra random delay added to each order, uniform in [0, jitter_ms)
+            seed: Seed of the jitter
+            symbols: (base, quote) of symbols whose names can't be split automatically
+        """
+        self.initial_balances = dict(balances)
+        self.fees = dict(fees or {})
+        self.default_fee = default_fee
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._random = random.Random(seed)
+        self.symbols = dict(symbols or {})
+        self._streams: List[Tuple[str, str]] = []  # (venue, symbol) per stream id
+        self._stream_ids: Dict[Tuple[str, str], int] = {}
+        self._quote_times: List[np.ndarray] = []  # One array per add_quotes call
+        self._quote_streams: List[np.ndarray] = []
+        self._quote_prices: List[np.ndarray] = []
+        self._timers: List[Tuple[int, Callable[["EventEngine"], Any]]] = []  # Scheduled before run
+        self._running = False
+        self.reset()
+
+    def reset(self):
+        """Back to the starting balances with an empty event queue (quotes and timers stay)."""
+        self.balances: Dict[Tuple[str, str], float] = dict(self.initial_balances)
+        self.now = 0  # Current time in ns
+        self.last_prices: List[Optional[float]] = [None] * len(self._streams)
+        self._heap: List[Tuple[int, int, int, Any]] = []
+        self._sequence = 0  # Keeps heap order stable for events at the same time
+        self.in_flight = 0  # Orders submitted but not filled yet
+        self.orders = 0
+        self.rejected = 0
+        self.fee_totals: Dict[Tuple[str, str], float] = {}
+        self._fills: List[Tuple[int, int, str, str, str, float, float, float]] = []
+
+    def add_quotes(self, venue: str, symbol: str, times, prices):
+        """
+        Add a price stream.
+        Args:
+            times: Timestamps (datetime64 / pandas column, or int64 ns)
+            prices: Price at each timestamp
+        """
+        if symbol not in self.symbols:
+            assets = split_symbol(symbol)
+            if assets is None:
+                raise ValueError(f"Cannot tell the base/quote assets of {symbol!r}; pass them in symbols")
+            self.symbols[symbol] = assets
+        times = np.asarray(times)
+        if times.dtype.kind != "i":
+            times = column_to_ns(pd.Series(times))
+        key = (venue, symbol)
+        if key not in self._stream_ids:
+            self._stream_ids[key] = len(self._streams)
+            self._streams.append(key)
+            self.last_prices.append(None)
+        self._quote_times.append(times.astype(np.int64))
+        self._quote_streams.append(np.full(len(times), self._stream_ids[key], dtype=np.int64))
+        self._quote_prices.append(np.asarray(prices, dtype=np.float64))
+
+    def price(self, venue: str, symbol: str) -> Optional[float]:
+        """Latest price of a symbol on a venue (None before its first quote)."""
+        stream = self._stream_ids.get((venue, symbol))
+        return None if stream is None else self.last_prices[stream]
+
+    def stream_id(self, venue: str, symbol: str) -> int:
+        """Index of a stream in last_prices, for strategies that read prices on every quote."""
+        return self._stream_ids[(venue, symbol)]
+
+    def schedule(self, time_ns: int, callback: Callable[["EventEngine"], Any]):
+        """
+        Call callback(engine) at time_ns (e.g. for periodic rebalancing).
+        Timers set before run() are kept for every run; a callback can
+        schedule the next one from inside the run.
+        """
+        if self._running:
+            self._push(time_ns, TIMER, callback)
+        else:
+            self._timers.append((time_ns, callback))
+
+    def _push(self, time_ns: int, kind: int, payload: Any):
+        self._sequence += 1
+        heapq.heappush(self._heap, (time_ns, self._sequence, kind, payload))
+
+    def _latency_ns(self, legs: Sequence[Leg]) -> int:
+        if isinstance(self.latency_ms, dict):
+            latency = max(self.latency_ms.get(leg.venue, 0.0) for leg in legs)
+        else:
+            latency = self.latency_ms
+        if self.jitter_ms:
+            latency += self._random.random() * self.jitter_ms
+        return int(latency * 1_000_000)
+
+    def submit(self, legs: Sequence[Leg]) -> int:
+        """
+        Send an order of one or more legs; it fills after the latency, atomically.
+        Returns:
+            The order id
+        """
+        legs = [leg if isinstance(leg, Leg) else Leg(*leg) for leg in legs]
+        self.orders += 1
+        self.in_flight += 1
+        self._push(self.now + self._latency_ns(legs), FILL, (self.orders, legs))
+        return self.orders
+
+    def _fill(self, order_id: int, legs: List[Leg]):
+        self.in_flight -= 1
+        changes: Dict[Tuple[str, str], float] = {}
+        fills = []
+        for leg in legs:
+            price = self.price(leg.venue, leg.symbol)
+            if price is None:
+                self.rejected += 1  # Nothing to trade against yet
+                return
+            base, quote = self.symbols[leg.symbol]
+            notional = price * leg.qty
+            fee = notional * self.fees.get(leg.venue, self.default_fee)  # Paid in the quote asset
+            sign = 1 if leg.side == "buy" else -1
+            changes[(leg.venue, base)] = changes.get((leg.venue, base), 0.0) + sign * leg.qty
+            changes[(leg.venue, quote)] = changes.get((leg.venue, quote), 0.0) - sign * notional - fee
+            fills.append((self.now, order_id, leg.venue, leg.symbol, leg.side, leg.qty, price, fee))
+        # All legs or none
+        if any(self.balances.get(key, 0.0) + change < -1e-12 for key, change in changes.items()):
+            self.rejected += 1
+            return
+        for key, change in changes.items():
+            self.balances[key] = self.balances.get(key, 0.0) + change
+        for fill in fills:
+            fee_key = (fill[2], self.symbols[fill[3]][1])
+            self.fee_totals[fee_key] = self.fee_totals.get(fee_key, 0.0) + fill[7]
+        self._fills.extend(fills)
+
+    def run(self, strategy) -> Dict[str, Any]:
+        """
+        Play every quote through strategy.on_quote(engine, venue, symbol, price),
+        which may return a list of legs to submit (or None). Scheduled fills
+        and timers run as their time comes, before quotes at the same time.
+        Returns:
+            Dictionary with balances, fills, fees, order counts and events per second
+        """
+        self.reset()
+        for time_ns, callback in self._timers:
+            self._push(time_ns, TIMER, callback)
+        self._running = True
+        started = time.perf_counter()
+        if self._quote_times:
+            all_times = np.concatenate(self._quote_times)
+            order = np.argsort(all_times, kind="stable")
+            times = all_times[order].tolist()
+            streams = np.concatenate(self._quote_streams)[order].tolist()
+            prices = np.concatenate(self._quote_prices)[order].tolist()
+        else:
+            times, streams, prices = [], [], []
+
+        heap = self._heap
+        last_prices = self.last_prices
+        names = self._streams
+        on_quote = strategy.on_quote
+        count = len(times)
+        i = 0
+        events = 0
+        try:
+            # Plain lists and local names: this loop runs once per event
+            while i < count or heap:
+                if heap and (i >= count or heap[0][0] <= times[i]):
+                    time_ns, _, kind, payload = heapq.heappop(heap)
+                    self.now = time_ns
+                    if kind == FILL:
+                        self._fill(*payload)
+                    else:
+                        payload(self)
+                else:
+                    self.now = times[i]
+                    stream = streams[i]
+                    price = prices[i]
+                    last_prices[stream] = price
+                    venue, symbol = names[stream]
+                    i += 1
+                    legs = on_quote(self, venue, symbol, price)
+                    if legs:
+                        self.submit(legs)
+                events += 1
+        finally:
+            self._running = False
+        elapsed = time.perf_counter() - started
+        return self._results(events, elapsed)
+
+    def value(self, balances: Dict[Tuple[str, str], float], currency: str = "USDT") -> float:
+        """
+        Worth of balances in one currency at the latest prices, using each
+        venue's own ASSET/currency symbol. Assets without such a symbol count as 0.
+        """
+        total = 0.0
+        for (venue, asset), amount in balances.items():
+            if asset == currency:
+                total += amount
+                continue
+            for symbol, (base, quote) in self.symbols.items():
+                price = self.price(venue, symbol)
+                if base == asset and quote == currency and price is not None:
+                    total += amount * price
+                    break
+        return total
+
+    def _results(self, events: int, elapsed: float) -> Dict[str, Any]:
+        fills = pd.DataFrame(self._fills, columns=FILL_COLUMNS)
+        fills["timestamp"] = pd.to_datetime(fills["timestamp"], unit="ns")
+        initial_value = self.value(self.initial_balances)
+        final_value = self.value(self.balances)
+        return {
+            "events": events,
+            "events_per_sec": events / elapsed if elapsed > 0 else float("inf"),
+            "orders": self.orders,
+            "rejected": self.rejected,
+            "fills": fills,
+            "fees": dict(self.fee_totals),
+            "balances": dict(self.balances),
+            # Both valued at the final prices, so pnl is trading gains net of fees,
+            # not the drift of the inventory held
+            "initial_value": initial_value,
+            "final_value": final_value,
+            "pnl": final_value - initial_value,
+        }
+
+
+class CrossVenueArbitrage:
+    """
+    Runs ArbitrageStrategy inside the EventEngine: every quote re-checks the
+    latest Binance and Kraken prices, and an "arbitrage" signal becomes a
+    two-leg order (buy on the cheap venue, sell on the dear one). No new
+    order is sent while one is still in flight.
+    """
+
+    def __init__(self, strategy, venue_symbols: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            strategy: An ArbitrageStrategy (only its check_prices is used)
+            venue_symbols: Venue -> symbol traded there (default BTCUSDT / XBTUSDT)
+        """
+        self.strategy = strategy
+        self.venue_symbols = venue_symbols or {"binance": "BTCUSDT", "kraken": "XBTUSDT"}
+        self._engine = None  # Engine the stream ids below belong to
+        self._streams = (0, 0)
+
+    def on_quote(self, engine: EventEngine, venue: str, symbol: str, price: float) -> Optional[List[Leg]]:
+        if engine.in_flight:
+            return None
+        if engine is not self._engine:
+            self._engine = engine
+            self._streams = (engine.stream_id("binance", self.venue_symbols["binance"]),
+                             engine.stream_id("kraken", self.venue_symbols["kraken"]))
+        binance_price = engine.last_prices[self._streams[0]]
+        kraken_price = engine.last_prices[self._streams[1]]
+        if binance_price is None or kraken_price is None:
+            return None
+        # Same test as check_prices, done inline so quiet quotes skip the call
+        if abs(binance_price - kraken_price) / min(binance_price, kraken_price) * 100 < self.strategy.min_spread_pct:
+            return None
+        signal = self.strategy.check_prices(binance_price, kraken_price)
+        if not signal:
+            return None
+        qty = signal.get("qty", 1)
+        return [
+            Leg(signal["buy_exchange"], self.venue_symbols[signal["buy_exchange"]], "buy", qty),
+            Leg(signal["sell_exchange"], self.venue_symbols[signal["sell_exchange"]], "sell", qty),
+        ]
@@ -0,0 +1,202 @@
+import logging  # For reporting failed venues
+import time  # For receive timestamps
+from typing import Any, Dict, Iterable, List, Optional, Tuple  # For type hints
+
+from .scanner import KNOWN_QUOTES, split_symbol  # For splitting symbols without separators
+from .stream import BookTop  # Best bid/ask of one symbol on one exchange
+
+logger = logging.getLogger(__name__)
+
+# Venue-specific asset codes -> the common name used everywhere else
+# (Kraken's 4-letter "XXBT"/"ZUSD" forms lose their X/Z in split_kraken_pair)
+ASSET_ALIASES = {
+    "XBT": "BTC",
+    "XDG": "DOGE",
+}
+
+
+def normalize_asset(asset: str) -> str:
+    """Common name of an asset code, e.g. Kraken's "XBT" -> "BTC"."""
+    return ASSET_ALIASES.get(asset.upper(), asset.upper())
+
+
+def normalize_symbol(base: str, quote: str) -> str:
+    """Symbol used by the monitor for every venue: BASE+QUOTE, e.g. "BTCUSDT"."""
+    return normalize_asset(base) + normalize_asset(quote)
+
+
+class ExchangeAdapter:
+    """
+    Fetches the best bid/ask of every symbol of one exchange with a single
+    public request and turns the reply into BookTops with normalized
+    symbols. Subclasses set name, url, params and weight and implement
+    parse(); fetching goes through the DataFetcher, so its scheduler keeps
+    each exchange within its rate limit.
+    """
+
+    name = ""
+    url = ""
+    params: Optional[Dict[str, str]] = None
+    weight = 1.0  # Request weight of the bulk ticker call
+
+    def fetch(self, fetcher) -> List[BookTop]:
+        """One bulk ticker request; errors are raised after the scheduler's retries."""
+        data, _, response_ts = fetcher._get_json(self.url, self.params, exchange=self.name, weight=self.weight)
+        return self.parse(data, response_ts)
+
+    def parse(self, data: Any, received_ts: Optional[float] = None) -> List[BookTop]:
+        raise NotImplementedError
+
+    @staticmethod
+    def _top(exchange: str, symbol: str, bid: Any, bid_qty: Any, ask: Any, ask_qty: Any,
+             received_ts: float) -> Optional[BookTop]:
+        # Venues report an empty book as "" or 0; those are skipped
+        try:
+            bid, ask = float(bid), float(ask)
+        except (TypeError, ValueError):
+            return None
+        if bid <= 0 or ask <= 0:
+            return None
+        return BookTop(exchange, symbol, bid, float(bid_qty or 0), ask, float(ask_qty or 0), received_ts)
+
+
+class BinanceAdapter(ExchangeAdapter):
+    name = "binance"
+    url = "https://api.binance.com/api/v3/ticker/bookTicker"
+    weight = 4.0
+
+    def parse(self, data, received_ts=None):
+        received_ts = time.time() if received_ts is None else received_ts
+        tops = []
+        for item in data:
+            assets = split_symbol(item["symbol"])
+            if assets is None:
+                continue
+            top = self._top(self.name, normalize_symbol(*assets), item["bidPrice"], item["bidQty"],
+                            item["askPrice"], item["askQty"], received_ts)
+            if top is not None:
+                tops.append(top)
+        return tops
+
+
+def split_kraken_pair(pair: str) -> Optional[Tuple[str, str]]:
+    """
+    Base/quote of a Kraken REST pair name. Older pairs use 4-letter codes
+    with an X (crypto) or Z (fiat) prefix, which is dropped ("XXBTZUSD" ->
+    XBT, USD; "XXRPZUSD" -> XRP, USD); newer ones plain names ("SOLUSD", "XBTUSDT").
+    """
+    if len(pair) == 8 and pair[0] in "XZ" and pair[4] in "XZ":
+        return pair[1:4], pair[5:]
+    return split_symbol(pair, KNOWN_QUOTES + ("XBT",))
+
+
+class KrakenAdapter(ExchangeAdapter):
+    name = "kraken"
+    url = "https://api.kraken.com/0/public/Ticker"  # All pairs when no pair is given
+
+    def parse(self, data, received_ts=None):
+        received_ts = time.time() if received_ts is None else received_ts
+        tops = []
+        for pair, item in data.get("result", {}).items():
+            assets = split_kraken_pair(pair)
+            if assets is None or pair.endswith(".d"):
+                continue  # Unknown quote currency or a dark-pool pair
+            # "b"/"a" are [price, whole lot volume, lot volume]
+            top = self._top(self.name, normalize_symbol(*assets), item["b"][0], item["b"][2],
+                            item["a"][0], item["a"][2], received_ts)
+            if top is not None:
+                tops.append(top)
+        return tops
+
+
+class OkxAdapter(ExchangeAdapter):
+    name = "okx"
+    url = "https://www.okx.com/api/v5/market/tickers"
+    params = {"instType": "SPOT"}
+
+    def parse(self, data, received_ts=None):
+        received_ts = time.time() if received_ts is None else received_ts
+        tops = []
+        for item in data.get("data", []):
+            base, _, quote = item["instId"].partition("-")
+            top = self._top(self.name, normalize_symbol(base, quote), item["bidPx"], item["bidSz"],
+                            item["askPx"], item["askSz"], received_ts)
+            if top is not None:
+                tops.append(top)
+        return tops
+
+
+class BybitAdapter(ExchangeAdapter):
+    name = "bybit"
+    url = "https://api.bybit.com/v5/market/tickers"
+    params = {"category": "spot"}
+
+    def parse(self, data, received_ts=None):
+        received_ts = time.time() if received_ts is None else received_ts
+        tops = []
+        for item in data.get("result", {}).get("list", []):
+            assets = split_symbol(item["symbol"])
+            if assets is None:
+                continue
+            top = self._top(self.name, normalize_symbol(*assets), item["bid1Price"], item["bid1Size"],
+                            item["ask1Price"], item["ask1Size"], received_ts)
+            if top is not None:
+                tops.append(top)
+        return tops
+
+
+class KucoinAdapter(ExchangeAdapter):
+    name = "kucoin"
+    url = "https://api.kucoin.com/api/v1/market/allTickers"
+
+    def parse(self, data, received_ts=None):
+        received_ts = time.time() if received_ts is None else received_ts
+        tops = []
+        for item in data.get("data", {}).get("ticker", []):
+            base, _, quote = item["symbol"].partition("-")
+            top = self._top(self.name, normalize_symbol(base, quote), item.get("buy"), 0,
+                            item.get("sell"), 0, received_ts)
+            if top is not None:
+                tops.append(top)
+        return tops
+
+
+# Exchange name -> adapter class
+ADAPTERS = {adapter.name: adapter for adapter in
+            (BinanceAdapter, KrakenAdapter, OkxAdapter, BybitAdapter, KucoinAdapter)}
+
+
+def make_adapters(names: Iterable[str]) -> List[ExchangeAdapter]:
+    """Adapters for the given exchange names, e.g. ["binance", "kraken"]."""
+    adapters = []
+    for name in names:
+        if name not in ADAPTERS:
+            raise ValueError(f"Unknown exchange: {name!r} (known: {', '.join(sorted(ADAPTERS))})")
+        adapters.append(ADAPTERS[name]())
+    return adapters
+
+
+def poll_venues(fetcher, adapters: List[ExchangeAdapter], wait: bool = False) -> Dict[str, List[BookTop]]:
+    """
+    Fetch every venue at the same time. With wait=False a venue whose
+    request budget is used up right now is skipped this round (its last
+    quotes stay in use) instead of holding the others back.
+    Returns:
+        Exchange name -> BookTops (missing for skipped or failed venues)
+    """
+    due = []
+    for adapter in adapters:
+        bucket = fetcher.scheduler.buckets.get(adapter.name)
+        if wait or bucket is None or bucket.wait_time(adapter.weight) == 0:
+            due.append(adapter)
+
+    def fetch(adapter):
+        try:
+            return adapter.fetch(fetcher)
+        except Exception as e:
+            fetcher.metrics.inc("monitor_venue_errors_total", exchange=adapter.name)
+            logger.warning(f"Error fetching {adapter.name} tickers: {e}")
+            return None
+
+    results = fetcher.fetch_concurrently(*[lambda adapter=adapter: fetch(adapter) for adapter in due])
+    return {adapter.name: tops for adapter, tops in zip(due, results) if tops is not None}
@@ -0,0 +1,300 @@
+import hashlib  # For dataset fingerprints and cache keys
+import json  # For stable keys of feature parameters
+import os  # For the spill directory
+import threading  # For the cache lock
+from collections import OrderedDict  # For least-recently-used order
+from typing import Any, Callable, Dict, Optional  # For type hints
+
+import numpy as np  # For the feature arrays
+import pandas as pd  # For the rolling-window math
+
+from .metrics import NULL_METRICS  # Default no-op instrumentation
+
+
+def dataset_fingerprint(data: pd.DataFrame) -> str:
+    """
+    Short hash of a dataset's column names, types and values. Two frames
+    with the same rows get the same fingerprint, whichever process loaded
+    them, so their features can be shared.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for name in data.columns:
+        values = np.ascontiguousarray(data[name].to_numpy())
+        if values.dtype == object:
+            values = np.array([str(value) for value in values])  # Hash the text, not the object pointers
+        digest.update(f"{name}:{values.dtype.str}:{len(values)};".encode())
+        digest.update(values.tobytes())
+    return digest.hexdigest()
+
+
+# Built-in features. Each takes the dataset plus keyword parameters and
+# returns one float64 value per row (NaN while the window fills up).
+
+def sma(data: pd.DataFrame, window: int, column: str = "price") -> np.ndarray:
+    """Simple moving average over the last `window` rows."""
+    return data[column].rolling(window).mean().to_numpy(dtype=np.float64)
+
+
+def ema(data: pd.DataFrame, window: int, column: str = "price") -> np.ndarray:
+    """Exponential moving average with span `window`."""
+    return data[column].ewm(span=window, adjust=False).mean().to_numpy(dtype=np.float64)
+
+
+def volatility(data: pd.DataFrame, window: int, column: str = "price") -> np.ndarray:
+    """Standard deviation of the row-to-row returns over the last `window` rows."""
+    return data[column].pct_change().rolling(window).std().to_numpy(dtype=np.float64)
+
+
+def zscore(data: pd.DataFrame, window: int, column: str = "price") -> np.ndarray:
+    """How many rolling standard deviations a value is from its rolling mean."""
+    rolling = data[column].rolling(window)
+    return ((data[column] - rolling.mean()) / rolling.std()).to_numpy(dtype=np.float64)
+
+
+def spread_pct(data: pd.DataFrame, left: str = "binance_price", right: str = "kraken_price") -> np.ndarray:
+    """Spread between two price columns in percent of the lower one, as DataFetcher.calculate_spread."""
+    a = data[left].to_numpy(dtype=np.float64)
+    b = data[right].to_numpy(dtype=np.float64)
+    return np.abs(a - b) / np.minimum(a, b) * 100
+
+
+def spread_zscore(data: pd.DataFrame, window: int, left: str = "binance_price",
+                  right: str = "kraken_price") -> np.ndarray:
+    """Rolling z-score of the signed spread (left - right) in percent."""
+    a, b = data[left], data[right]
+    return zscore(pd.DataFrame({"spread": (a - b) / np.minimum(a, b) * 100}), window, column="spread")
+
+
+# Feature name -> function, extended with register_feature
+FEATURES: Dict[str, Callable[..., np.ndarray]] = {
+    "sma": sma,
+    "ema": ema,
+    "volatility": volatility,
+    "zscore": zscore,
+    "spread_pct": spread_pct,
+    "spread_zscore": spread_zscore,
+}
+
+
+# Feature name -> version given to register_feature (part of the cache key)
+FEATURE_VERSIONS: Dict[str, str] = {}
+
+
+def register_feature(name: str, func: Callable[..., np.ndarray], version: str = ""):
+    """
+    Make func(data, **params) available as a feature. It must be a pure
+    function of the data and parameters (results are cached on that key)
+    and return one value per row.
+    Args:
+        version: Change it when what func computes changes without a change
+                 to its own code (e.g. a helper it calls was edited), so results
+                 spilled by the old code are not served
+    """
+    FEATURES[name] = func
+    FEATURE_VERSIONS[name] = version
+
+
+# Function -> hash of its code, see code_hash
+_CODE_HASHES: Dict[Callable, str] = {}
+
+
+def _hash_code(code, digest):
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            _hash_code(const, digest)  # Nested function or comprehension
+        else:
+            digest.update(repr(const).encode())
+
+
+def code_hash(func: Callable) -> str:
+    """
+    Hash of a function's bytecode, names and constants, so editing a
+    feature's body changes its cache key even when its name stays the same.
+    Callables without bytecode (e.g. functools.partial) hash their repr.
+    """
+    if func not in _CODE_HASHES:
+        digest = hashlib.blake2b(digest_size=8)
+        code = getattr(func, "__code__", None)
+        if code is None:
+            digest.update(repr(func).encode())
+        else:
+            _hash_code(code, digest)
+            digest.update(repr(getattr(func, "__defaults__", None)).encode())
+        _CODE_HASHES[func] = digest.hexdigest()
+    return _CODE_HASHES[func]
+
+
+def feature_key(fingerprint: str, name: str, params: Dict[str, Any]) -> str:
+    """
+    Stable key of one feature of one dataset, also used as its spill file
+    name. It names the function behind the feature, hashes its code and
+    adds its registered version, so a name re-registered with other code,
+    or a function edited in place, computes anew.
+    """
+    func = FEATURES[name]
+    code = f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', repr(func))}"
+    payload = json.dumps({"data": fingerprint, "feature": name, "code": code, "code_hash": code_hash(func),
+                          "version": FEATURE_VERSIONS.get(name, ""), "params": params},
+                         sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:24]
+
+
+class FeatureStore:
+    """
+    Rolling-window features computed once per dataset and parameters and
+    shared by every strategy that asks for them. Results are kept in memory
+    up to max_bytes, dropping the least recently used first; with a
+    spill_dir each computed array is also written there as .npy, so
+    dropped entries, other processes (e.g. sweep workers) and later runs
+    load it instead of computing it again.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, spill_dir: Optional[str] = None, metrics=None):
+        """
+        Args:
+            max_bytes: Memory budget of the cached arrays
+            spill_dir: Directory for the on-disk copies (None = memory only)
+            metrics: Metrics registry for cache hits/misses (default: no-op)
+        """
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.metrics = metrics or NULL_METRICS
+        self.nbytes = 0  # Bytes of the arrays held in memory
+        self.hits = 0  # Found in memory
+        self.disk_hits = 0  # Loaded from spill_dir
+        self.misses = 0  # Computed
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def get(self, data: pd.DataFrame, name: str, fingerprint: Optional[str] = None, **params) -> np.ndarray:
+        """
+        One feature of a dataset, e.g. store.get(data, "sma", window=20).
+        Args:
+            data: Dataset the feature is computed from
+            name: Feature name (see FEATURES)
+            fingerprint: dataset_fingerprint(data), if already known
+            params: Feature parameters
+        Returns:
+            Read-only float64 array with one value per row, shared between callers
+        """
+        if name not in FEATURES:
+            raise ValueError(f"Unknown feature: {name!r} (known: {', '.join(sorted(FEATURES))})")
+        if fingerprint is None:
+            fingerprint = dataset_fingerprint(data)
+        key = feature_key(fingerprint, name, params)
+        with self._lock:
+            values = self._cache.get(key)
+            if values is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                self.metrics.inc("feature_cache_hits_total", source="memory")
+                return values
+
+        path = os.path.join(self.spill_dir, f"{key}.npy") if self.spill_dir else None
+        if path and os.path.exists(path):
+            values = np.load(path)
+            self.disk_hits += 1
+            self.metrics.inc("feature_cache_hits_total", source="disk")
+        else:
+            with self.metrics.timer("feature_compute_seconds", feature=name):
+                values = np.ascontiguousarray(FEATURES[name](data, **params), dtype=np.float64)
+            if len(values) != len(data):
+                raise ValueError(f"Feature {name!r} returned {len(values)} values for {len(data)} rows")
+            self.misses += 1
+            self.metrics.inc("feature_cache_misses_total")
+            if path:
+                # Write atomically so a concurrent reader never sees half a file
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    np.save(f, values)
+                os.replace(tmp_path, path)
+        values.flags.writeable = False
+        self._store(key, values)
+        return values
+
+    def _store(self, key: str, values: np.ndarray):
+        with self._lock:
+            if key in self._cache:
+                return  # Another thread got there first
+            self._cache[key] = values
+            self.nbytes += values.nbytes
+            # Evict least recently used entries; they stay on disk when spilling
+            while self.nbytes > self.max_bytes and len(self._cache) > 1:
+                _, evicted = self._cache.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+
+    def view(self, data: pd.DataFrame) -> "FeatureView":
+        """Features of one dataset, fingerprinted once (see FeatureView)."""
+        return FeatureView(self, data)
+
+    def clear(self):
+        """Drop everything held in memory (spilled files are kept)."""
+        with self._lock:
+            self._cache.clear()
+            self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+class FeatureView:
+    """
+    A FeatureStore bound to one dataset, so its fingerprint is computed
+    only once. Strategies read features by name and row index:
+
+        features = store.view(data)
+        fast = features.get("sma", window=10)
+        if features.value("zscore", i, window=50) < -2: ...
+
+    The view remembers every array it has handed out, so reading a row
+    from on_tick is a dict lookup and an index, not a store lookup; those
+    arrays stay alive as long as the view does.
+    """
+
+    def __init__(self, store: FeatureStore, data: pd.DataFrame):
+        self.store = store
+        self.data = data
+        self.fingerprint = dataset_fingerprint(data)
+        self._arrays: Dict[Any, np.ndarray] = {}  # (name, sorted params) -> array
+
+    def get(self, name: str, **params) -> np.ndarray:
+        """The whole feature array."""
+        key = (name, tuple(sorted(params.items())))
+        try:
+            return self._arrays[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # Unhashable parameters (e.g. a list): ask the store every time
+            return self.store.get(self.data, name, fingerprint=self.fingerprint, **params)
+        values = self.store.get(self.data, name, fingerprint=self.fingerprint, **params)
+        self._arrays[key] = values
+        return values
+
+    def value(self, name: str, index: int, **params) -> float:
+        """The feature at one row."""
+        return float(self.get(name, **params)[index])
+
+
+# Store shared by every strategy in this process (see shared_store)
+_SHARED: Optional[FeatureStore] = None
+
+
+def shared_store() -> FeatureStore:
+    """The process-wide FeatureStore, created memory-only on first use."""
+    global _SHARED
+    if _SHARED is None:
+        _SHARED = FeatureStore()
+    return _SHARED
+
+
+def configure_shared_store(max_bytes: int = 256 * 1024 * 1024, spill_dir: Optional[str] = None,
+                           metrics=None) -> FeatureStore:
+    """Replace the process-wide store, e.g. to give it a spill directory."""
+    global _SHARED
+    _SHARED = FeatureStore(max_bytes, spill_dir, metrics)
+    return _SHARED
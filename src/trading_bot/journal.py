@@ -0,0 +1,226 @@
+import glob  # For finding journal files
+import json  # For the JSON-lines records
+import logging  # For routing console output through a queue
+import logging.handlers  # For QueueHandler / QueueListener
+import os  # For fsync and file sizes
+import queue  # For handing records to the writer thread
+import re  # For numbering journal files
+import sys  # For the console stream
+import threading  # For the writer thread
+import time  # For timestamps and the fsync interval
+from typing import Any, Dict, Iterator, List, Optional, Sequence  # For type hints
+
+_STOP = object()  # Tells the writer thread to finish
+
+
+class TradeJournal:
+    """
+    Append-only journal of quotes, signals and trades, one compact JSON
+    object per line. Callers only put records on a queue; a background
+    thread writes them in batches, fsyncs every fsync_every records or
+    fsync_interval seconds, and starts a new numbered file when the current
+    one passes max_bytes. A crash loses at most the records not yet fsynced.
+    Files are named <prefix>-000001.jsonl, <prefix>-000002.jsonl, ...
+    """
+
+    def __init__(self, directory: str, prefix: str = "journal", max_bytes: int = 64 * 1024 * 1024,
+                 fsync_every: int = 256, fsync_interval: float = 1.0, queue_size: int = 100000):
+        """
+        Args:
+            directory: Where the journal files go (created if missing)
+            prefix: File name prefix
+            max_bytes: Rotate to a new file once the current one is this big
+            fsync_every: Flush to disk after this many records...
+            fsync_interval: ...or after this many seconds, whichever comes first
+            queue_size: Records that may wait for the writer; beyond that new records are dropped
+        """
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.written = 0  # Records written to disk
+        self.dropped = 0  # Records lost because the queue was full
+        os.makedirs(directory, exist_ok=True)
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        # Never append to an old file: a restart continues with the next number
+        self._number = max((_file_number(path) for path in journal_files(directory, prefix)), default=0)
+        self._file = self._open_next()
+        self._thread = threading.Thread(target=self._run, name="journal-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def path(self) -> str:
+        """File currently being written."""
+        return self._file.name
+
+    def _open_next(self):
+        self._number += 1
+        return open(os.path.join(self.directory, f"{self.prefix}-{self._number:06d}.jsonl"), "a", encoding="utf-8")
+
+    def record(self, kind: str, **fields: Any):
+        """
+        Queue one record without blocking, e.g. journal.record("quote", exchange="kraken", price=60100.0).
+        Every record gets its kind and the time it was queued ("ts", time.time()).
+        """
+        fields["kind"] = kind
+        fields.setdefault("ts", time.time())
+        try:
+            self._queue.put_nowait(fields)
+        except queue.Full:
+            self.dropped += 1
+
+    def quote(self, quote):
+        """Queue a Quote from the data fetcher."""
+        self.record("quote", exchange=quote.exchange.label, symbol=quote.symbol, price=quote.price,
+                    request_ts=quote.request_ts, response_ts=quote.response_ts, ts=quote.response_ts)
+
+    def trade(self, trade: Dict[str, Any]):
+        """Queue a trade or opportunity dictionary as the runners build them."""
+        self.record("trade", **trade)
+
+    def _run(self):
+        unsynced = 0
+        last_sync = time.monotonic()
+        while True:
+            try:
+                item = self._queue.get(timeout=self.fsync_interval)
+            except queue.Empty:
+                item = None
+            batch = [] if item is None else [item]
+            # Take everything already waiting so it goes out in one write
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(record is _STOP for record in batch)
+            lines = [json.dumps(record, separators=(",", ":"), default=str)
+                     for record in batch if record is not _STOP]
+            if lines:
+                self._file.write("\n".join(lines) + "\n")
+                self.written += len(lines)
+                unsynced += len(lines)
+            if unsynced and (stop or unsynced >= self.fsync_every or
+                             time.monotonic() - last_sync >= self.fsync_interval):
+                self._sync()
+                unsynced = 0
+                last_sync = time.monotonic()
+            if self._file.tell() >= self.max_bytes:
+                self._sync()
+                self._file.close()
+                self._file = self._open_next()
+            if stop:
+                return
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        """Write and fsync everything queued so far, then close the file."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _file_number(path: str) -> int:
+    match = re.search(r"-(\d+)\.jsonl$", path)
+    return int(match.group(1)) if match else 0
+
+
+def journal_files(path: str, prefix: str = "journal") -> List[str]:
+    """A single journal file, or every journal file in a directory in write order."""
+    if os.path.isfile(path):
+        return [path]
+    return sorted(glob.glob(os.path.join(path, f"{prefix}-*.jsonl")), key=_file_number)
+
+
+def read_journal(path: str, kinds: Optional[Sequence[str]] = None, prefix: str = "journal") -> Iterator[Dict[str, Any]]:
+    """
+    Yield the records of a journal file or directory, oldest first.
+    Args:
+        path: A journal file or the journal directory
+        kinds: Only yield these kinds, e.g. ["trade"] (default: all)
+    A line cut short by a crash is skipped.
+    """
+    for file_path in journal_files(path, prefix):
+        with open(file_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Partial last line of a crashed run
+                if kinds is None or record.get("kind") in kinds:
+                    yield record
+
+
+def load_journal_frame(path: str, kind: str = "trade"):
+    """
+    Records of one kind as a DataFrame with a datetime 'timestamp' column
+    (from each record's "ts"), sorted by time.
+    """
+    import pandas as pd  # Only analysis needs pandas, not the live runners
+
+    frame = pd.DataFrame(list(read_journal(path, [kind])))
+    if frame.empty:
+        return pd.DataFrame({"timestamp": pd.to_datetime([], unit="s")})
+    frame.insert(0, "timestamp", pd.to_datetime(frame.pop("ts"), unit="s"))
+    return frame.sort_values("timestamp", kind="stable").reset_index(drop=True)
+
+
+def load_backtest_data(path: str, exchange: str = "binance", symbol: str = "BTCUSDT"):
+    """
+    Journaled quotes of one exchange and symbol in the shape Backtest.run
+    expects: a DataFrame with 'timestamp' and 'price' columns.
+    """
+    import pandas as pd
+
+    quotes = load_journal_frame(path, "quote")
+    if quotes.empty:
+        return quotes.assign(price=pd.Series(dtype="float64"))
+    quotes = quotes[(quotes["exchange"] == exchange) & (quotes["symbol"] == symbol)]
+    return quotes[["timestamp", "price"]].reset_index(drop=True)
+
+
+class JournalHandler(logging.Handler):
+    """Logging handler that copies log records into a TradeJournal as kind "log"."""
+
+    def __init__(self, journal: TradeJournal, level: int = logging.INFO):
+        super().__init__(level)
+        self.journal = journal
+
+    def emit(self, record: logging.LogRecord):
+        self.journal.record("log", ts=record.created, level=record.levelname,
+                            logger=record.name, message=record.getMessage())
+
+
+def setup_console_logging(journal: Optional[TradeJournal] = None,
+                          level: int = logging.INFO) -> logging.handlers.QueueListener:
+    """
+    Send log output through a queue so the hot path never waits on the
+    terminal: records are printed (and journaled, if a journal is given) by
+    a listener thread. Messages are printed as-is, like print() did.
+    Returns:
+        The started QueueListener; stop() it on exit to flush the last lines,
+        before closing the journal so they are journaled too
+    """
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter("%(message)s"))
+    handlers: List[logging.Handler] = [console]
+    if journal is not None:
+        handlers.append(JournalHandler(journal, level))
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue()
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(level)
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -0,0 +1,153 @@
+import numpy as np  # For the contiguous input/output arrays
+import pandas as pd  # For reading the columns of a backtest frame
+from typing import Any, Callable, Dict, Optional, Tuple  # For type hints
+
+try:
+    import numba  # Optional dependency: pip install numba
+except ImportError:
+    numba = None
+
+HAS_NUMBA = numba is not None
+
+# Compiled kernels, so each function is compiled once per process
+_COMPILED: Dict[Callable, Callable] = {}
+
+
+def jit(func: Callable) -> Callable:
+    """
+    Compile a kernel with numba.njit when numba is installed; otherwise
+    return it unchanged (it then runs as plain Python).
+    """
+    if numba is None:
+        return func
+    if func not in _COMPILED:
+        _COMPILED[func] = numba.njit(cache=True, nogil=True)(func)
+    return _COMPILED[func]
+
+
+def kernel_function(strategy) -> Callable:
+    """
+    The kernel a backtest should call for this strategy: the compiled
+    strategy.kernel with numba, else strategy.numpy_kernel if it has one,
+    else strategy.kernel as plain Python.
+    """
+    if not HAS_NUMBA and getattr(strategy, "numpy_kernel", None) is not None:
+        return strategy.numpy_kernel
+    return jit(strategy.kernel)
+
+
+def initial_state(strategy) -> np.ndarray:
+    """A fresh state array for the strategy's kernel (empty if it keeps no state)."""
+    if hasattr(strategy, "initial_state"):
+        return np.ascontiguousarray(strategy.initial_state(), dtype=np.float64)
+    return np.zeros(0, dtype=np.float64)
+
+
+def run_kernel(strategy, data: pd.DataFrame, state: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute one signed quantity per row (positive = buy, negative = sell,
+    0 = nothing) with the strategy's kernel.
+    The kernel is called as kernel(price, volume, state, out) on contiguous
+    float64 arrays and fills `out`; it may update `state` in place, so
+    passing the returned state to the next call continues where this one
+    stopped (used by chunked backtests).
+    Args:
+        strategy: Object with a kernel (and optionally numpy_kernel / initial_state)
+        data: DataFrame with a 'price' column and optionally 'volume'
+        state: State left by the previous call (default: a fresh one)
+    Returns:
+        (signals, state)
+    """
+    price = np.ascontiguousarray(data["price"].to_numpy(), dtype=np.float64)
+    if "volume" in data:
+        volume = np.ascontiguousarray(data["volume"].to_numpy(), dtype=np.float64)
+    else:
+        volume = np.zeros(len(price), dtype=np.float64)
+    if state is None:
+        state = initial_state(strategy)
+    return call_kernel(strategy, price, volume, state), state
+
+
+def call_kernel(strategy, price: np.ndarray, volume: np.ndarray, state: np.ndarray) -> np.ndarray:
+    """Run the kernel on ready-made contiguous float64 arrays and return the signals."""
+    out = np.zeros(len(price), dtype=np.float64)
+    kernel_function(strategy)(price, volume, state, out)
+    return out
+
+
+class KernelStrategy:
+    """
+    Base class for strategies written as array kernels. A subclass defines
+
+        @staticmethod
+        def kernel(price, volume, state, out):
+            for i in range(price.shape[0]):
+                out[i] = ...  # signed quantity for row i
+
+    in plain loops over the arrays (numba compiles it when installed), and
+    may add a whole-array numpy_kernel with the same signature, used
+    instead when numba is missing, plus initial_state() for values the
+    kernel carries from row to row. Backtest runs the kernel directly;
+    on_tick and generate_signals adapt it to the other interfaces.
+    """
+
+    numpy_kernel: Optional[Callable] = None
+
+    @staticmethod
+    def kernel(price, volume, state, out):
+        raise NotImplementedError
+
+    def initial_state(self) -> np.ndarray:
+        return np.zeros(0, dtype=np.float64)
+
+    def generate_signals(self, data: pd.DataFrame) -> np.ndarray:
+        """All signals of a frame, from a fresh state (Backtest "vectorized" mode)."""
+        return run_kernel(self, data)[0]
+
+    def on_tick(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Dict interface for live runners and Backtest "tick" mode: runs the
+        kernel on a single row, keeping its state between calls.
+        """
+        if getattr(self, "_tick_state", None) is None:
+            self._tick_state = initial_state(self)
+        price = np.array([data["price"]], dtype=np.float64)
+        volume = np.array([data.get("volume", 0.0)], dtype=np.float64)
+        qty = call_kernel(self, price, volume, self._tick_state)[0]
+        if qty > 0:
+            return {"side": "buy", "qty": float(qty)}
+        if qty < 0:
+            return {"side": "sell", "qty": float(-qty)}
+        return None
+
+
+class TickAdapter:
+    """
+    Runs a dict-interface strategy (on_tick only) through Backtest's
+    signal-array path: on_tick is still called once per row, but the fills,
+    equity and statistics are then done for the whole array at once instead
+    of row by row as in "tick" mode; buy/sell signals become signed
+    quantities. Only strategies that do not
+    depend on the backtest's fills can be adapted this way (on_tick never
+    sees them anyway), and only "buy"/"sell" signals.
+    """
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+
+    def generate_signals(self, data: pd.DataFrame) -> np.ndarray:
+        columns = list(data.columns)
+        on_tick = self.strategy.on_tick
+        out = np.zeros(len(data), dtype=np.float64)
+        for i, row in enumerate(data.itertuples(index=False, name=None)):
+            signal = on_tick(dict(zip(columns, row)))
+            if not signal:
+                continue
+            side = signal.get("side")
+            if side == "buy":
+                out[i] = signal.get("qty", 1)
+            elif side == "sell":
+                out[i] = -signal.get("qty", 1)
+            else:
+                raise ValueError(f"TickAdapter only handles buy/sell signals, got {side!r}")
+        return out
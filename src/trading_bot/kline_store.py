@@ -0,0 +1,214 @@
+import json  # For the store index
+import os  # For file paths
+import re  # For parsing Binance kline file names
+from datetime import date, datetime, timedelta  # For date ranges
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union  # For type hints
+
+import numpy as np  # For typed, memory-mapped columns
+import pandas as pd  # For the one-time CSV parse
+
+# Columns of a Binance kline CSV, in file order
+KLINE_COLUMNS = [
+    "open_time", "open", "high", "low", "close", "volume",
+    "close_time", "quote_asset_volume", "num_trades",
+    "taker_buy_base", "taker_buy_quote", "ignore"
+]
+
+# Columns kept in the store and their types ("ignore" is dropped)
+STORED_DTYPES = {
+    "open_time": np.int64,  # Milliseconds since the epoch
+    "open": np.float64,
+    "high": np.float64,
+    "low": np.float64,
+    "close": np.float64,
+    "volume": np.float64,
+    "close_time": np.int64,  # Milliseconds since the epoch
+    "quote_asset_volume": np.float64,
+    "num_trades": np.int64,
+    "taker_buy_base": np.float64,
+    "taker_buy_quote": np.float64,
+}
+
+# Binance daily dump names look like BTCUSDT-1m-2025-07-13.csv
+FILENAME_PATTERN = re.compile(r"^(?P<symbol>[A-Z0-9]+)-(?P<interval>\w+)-(?P<date>\d{4}-\d{2}-\d{2})\.csv$")
+
+DateLike = Union[str, date, datetime]
+
+
+def parse_kline_filename(path: str) -> Tuple[str, str, str]:
+    """
+    Read (symbol, interval, date) from a Binance kline file name.
+    Example: "data/BTCUSDT-1m-2025-07-13.csv" -> ("BTCUSDT", "1m", "2025-07-13")
+    """
+    match = FILENAME_PATTERN.match(os.path.basename(path))
+    if match is None:
+        raise ValueError(f"Not a Binance kline file name: {path!r}")
+    return match["symbol"], match["interval"], match["date"]
+
+
+def to_milliseconds(values: np.ndarray) -> np.ndarray:
+    """Binance switched spot dumps to microseconds in 2025; bring both to milliseconds."""
+    if len(values) and values.max() > 10**14:
+        return values // 1000
+    return values
+
+
+def _as_date(value: DateLike) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value)
+
+
+class KlineStore:
+    """
+    On-disk store of Binance klines, one memory-mappable .npy file per column
+    per day: <root>/<SYMBOL>/<interval>/<YYYY-MM-DD>/<column>.npy. Each CSV is
+    parsed once by ingest_csv; after that, loads map just the requested
+    columns without parsing or copying.
+    """
+
+    def __init__(self, root: str = "data/klines"):
+        """
+        Args:
+            root: Directory that holds the converted columns and index.json
+        """
+        self.root = root
+        self.index_path = os.path.join(root, "index.json")
+        self._index = self._read_index()
+
+    def _read_index(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                return json.load(f)
+        return {}
+
+    def _write_index(self):
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.index_path + ".tmp", "w") as f:
+            json.dump(self._index, f, indent=1, sort_keys=True)
+        os.replace(self.index_path + ".tmp", self.index_path)
+
+    def _day_dir(self, symbol: str, interval: str, day: str) -> str:
+        return os.path.join(self.root, symbol, interval, day)
+
+    def has(self, symbol: str, interval: str, day: DateLike) -> bool:
+        return _as_date(day).isoformat() in self._index.get(f"{symbol}/{interval}", {})
+
+    def dates(self, symbol: str, interval: str) -> List[str]:
+        """Stored days of one symbol/interval, oldest first."""
+        return sorted(self._index.get(f"{symbol}/{interval}", {}))
+
+    def ingest_csv(self, path: str, symbol: Optional[str] = None, interval: Optional[str] = None,
+                   day: Optional[str] = None, force: bool = False) -> bool:
+        """
+        Convert one kline CSV into typed column files.
+        Args:
+            path: CSV file; symbol/interval/day are read from its name when not given
+            force: Convert again even if the day is already stored
+        Returns:
+            True if the file was converted, False if it was already in the store
+        """
+        if symbol is None or interval is None or day is None:
+            symbol, interval, day = parse_kline_filename(path)
+        if not force and self.has(symbol, interval, day):
+            return False
+
+        data = pd.read_csv(path, header=None, names=KLINE_COLUMNS, usecols=list(STORED_DTYPES))
+        if len(data) and not str(data.iloc[0, 0]).lstrip("-").isdigit():
+            data = data.iloc[1:]  # Some dumps start with a header row
+        day_dir = self._day_dir(symbol, interval, day)
+        os.makedirs(day_dir, exist_ok=True)
+        for column, dtype in STORED_DTYPES.items():
+            values = data[column].to_numpy().astype(dtype)
+            if column in ("open_time", "close_time"):
+                values = to_milliseconds(values)
+            np.save(os.path.join(day_dir, f"{column}.npy"), values)
+
+        close_time = np.load(os.path.join(day_dir, "close_time.npy"), mmap_mode="r")
+        self._index.setdefault(f"{symbol}/{interval}", {})[day] = {
+            "rows": int(len(close_time)),
+            "start_ms": int(close_time[0]) if len(close_time) else 0,
+            "end_ms": int(close_time[-1]) if len(close_time) else 0,
+        }
+        self._write_index()
+        return True
+
+    def ingest_directory(self, directory: str, force: bool = False) -> int:
+        """
+        Convert every Binance kline CSV in a directory.
+        Returns:
+            Number of files converted
+        """
+        converted = 0
+        for name in sorted(os.listdir(directory)):
+            if FILENAME_PATTERN.match(name):
+                converted += self.ingest_csv(os.path.join(directory, name), force=force)
+        return converted
+
+    def load_day(self, symbol: str, interval: str, day: DateLike,
+                 columns: Sequence[str] = ("close_time", "close")) -> Dict[str, np.ndarray]:
+        """
+        Memory-map the requested columns of one stored day (no copy).
+        """
+        day = _as_date(day).isoformat()
+        if not self.has(symbol, interval, day):
+            raise KeyError(f"{symbol} {interval} {day} is not in the store")
+        day_dir = self._day_dir(symbol, interval, day)
+        return {column: np.load(os.path.join(day_dir, f"{column}.npy"), mmap_mode="r") for column in columns}
+
+    def iter_days(self, symbol: str, interval: str, start: Optional[DateLike] = None,
+                  end: Optional[DateLike] = None,
+                  columns: Sequence[str] = ("close_time", "close")) -> Iterable[Tuple[str, Dict[str, np.ndarray]]]:
+        """
+        Yield (day, columns) for every stored day between start and end (inclusive),
+        one memory-mapped day at a time.
+        """
+        first = _as_date(start) if start is not None else None
+        last = _as_date(end) if end is not None else None
+        for day in self.dates(symbol, interval):
+            current = date.fromisoformat(day)
+            if (first is None or current >= first) and (last is None or current <= last):
+                yield day, self.load_day(symbol, interval, day, columns)
+
+    def load(self, symbol: str, interval: str, start: Optional[DateLike] = None,
+             end: Optional[DateLike] = None, columns: Sequence[str] = ("close_time", "close"),
+             start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Load columns for a date range, optionally cut to [start_ms, end_ms) by close time.
+        A range inside a single day comes back as zero-copy views of the mapped
+        files; longer ranges are concatenated.
+        """
+        columns = list(columns)
+        wanted = columns if "close_time" in columns else columns + ["close_time"]
+        parts = []
+        for _, day in self.iter_days(symbol, interval, start, end, wanted):
+            close_time = day["close_time"]
+            lo = 0 if start_ms is None else int(np.searchsorted(close_time, start_ms, side="left"))
+            hi = len(close_time) if end_ms is None else int(np.searchsorted(close_time, end_ms, side="left"))
+            if hi > lo:
+                parts.append({column: day[column][lo:hi] for column in columns})
+        if not parts:
+            return {column: np.empty(0, dtype=STORED_DTYPES[column]) for column in columns}
+        if len(parts) == 1:
+            return parts[0]
+        return {column: np.concatenate([part[column] for part in parts]) for column in columns}
+
+    def load_frame(self, symbol: str, interval: str, start: Optional[DateLike] = None,
+                   end: Optional[DateLike] = None, price_column: Optional[str] = None) -> pd.DataFrame:
+        """
+        Close time and close price as a DataFrame with a datetime 'timestamp'
+        column and the price named price_column (default: the symbol).
+        """
+        data = self.load(symbol, interval, start, end, ("close_time", "close"))
+        return pd.DataFrame({
+            "timestamp": pd.to_datetime(data["close_time"], unit="ms"),
+            price_column or symbol: data["close"]
+        })
+
+
+def date_range(start: DateLike, end: DateLike) -> List[str]:
+    """Every day from start to end inclusive, as YYYY-MM-DD strings."""
+    first, last = _as_date(start), _as_date(end)
+    return [(first + timedelta(days=i)).isoformat() for i in range((last - first).days + 1)]
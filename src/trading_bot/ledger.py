@@ -0,0 +1,183 @@
+import numpy as np  # Import numpy for the typed column buffers
+import pandas as pd  # Import pandas for timestamp conversion and DataFrame export
+from typing import Any, Dict, Iterator, List, Union  # Import typing for type hints
+from .models import Side, Trade  # Side codes and the typed trade record
+
+# Side codes stored in the trade ledger instead of "buy"/"sell" strings
+SIDE_BUY = Side.BUY
+SIDE_SELL = Side.SELL
+SIDE_NAMES = {SIDE_BUY: "buy", SIDE_SELL: "sell"}
+SIDE_CODES = {name: code for code, name in SIDE_NAMES.items()}
+
+
+def to_ns(timestamp: Any) -> int:
+    """
+    Convert one timestamp (pd.Timestamp, datetime, string, ...) to int64 nanoseconds.
+    """
+    return pd.Timestamp(timestamp).value
+
+
+def column_to_ns(timestamps: pd.Series) -> np.ndarray:
+    """
+    Convert a timestamp column to an int64 array of nanoseconds since the epoch.
+    """
+    return pd.to_datetime(timestamps).to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+class ColumnBuffer:
+    """
+    Preallocated, growable set of typed NumPy columns with a shared length.
+    Rows are appended in place; the backing arrays double in size when full,
+    so appending stays amortized O(1) without a Python object per row.
+    """
+
+    # Column name -> dtype, filled in by subclasses
+    COLUMNS: Dict[str, Any] = {}
+
+    def __init__(self, capacity: int = 1024):
+        """
+        Args:
+            capacity: Number of rows to preallocate
+        """
+        capacity = max(int(capacity), 1)
+        self._columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in self.COLUMNS.items()}
+        self._size = 0  # Number of rows in use
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _reserve(self, extra: int):
+        """Grow the backing arrays so that `extra` more rows fit."""
+        needed = self._size + extra
+        capacity = len(next(iter(self._columns.values())))
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        for name, array in self._columns.items():
+            grown = np.empty(new_capacity, dtype=array.dtype)
+            grown[:self._size] = array[:self._size]
+            self._columns[name] = grown
+
+    def append_row(self, *values):
+        """Append one row, values given in COLUMNS order."""
+        self._reserve(1)
+        for array, value in zip(self._columns.values(), values):
+            array[self._size] = value
+        self._size += 1
+
+    def extend(self, **arrays):
+        """Append many rows at once from equal-length arrays, one per column."""
+        count = len(next(iter(arrays.values())))
+        self._reserve(count)
+        for name, array in self._columns.items():
+            array[self._size:self._size + count] = arrays[name]
+        self._size += count
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only view of one column (no copy)."""
+        view = self._columns[name][:self._size]
+        view.flags.writeable = False
+        return view
+
+    def _row(self, index: int) -> Dict[str, Any]:
+        """Build the dict form of one row (overridden by subclasses)."""
+        return {name: array[index].item() for name, array in self._columns.items()}
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        # Dict interop so code written for the old list-of-dicts keeps working
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("row index out of range")
+        return self._row(index)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(self._size):
+            yield self._row(i)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ColumnBuffer):
+            return NotImplemented
+        if type(other) is not type(self) or len(other) != len(self):
+            return False
+        return all(np.array_equal(self.column(name), other.column(name)) for name in self.COLUMNS)
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Export all rows as a list of dicts."""
+        return [dict(row) for row in self]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Export all rows as a DataFrame (columns are copied)."""
+        frame = pd.DataFrame({name: self.column(name).copy() for name in self.COLUMNS})
+        if "timestamp" in frame:
+            frame["timestamp"] = pd.to_datetime(frame["timestamp"], unit="ns")
+        return frame
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Only pickle the rows in use, not the spare capacity
+        return {"columns": {name: self._columns[name][:self._size].copy() for name in self.COLUMNS}}
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self._columns = state["columns"]
+        self._size = len(next(iter(self._columns.values())))
+        if self._size == 0:
+            self._columns = {name: np.empty(1, dtype=array.dtype) for name, array in self._columns.items()}
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(rows={self._size})"
+
+
+class EquityCurve(ColumnBuffer):
+    """
+    Equity, price and positions at every tick of a backtest.
+    """
+
+    COLUMNS = {
+        "timestamp": np.int64,  # Nanoseconds since the epoch
+        "equity": np.float64,
+        "price": np.float64,
+        "positions": np.float64,
+    }
+
+    def append(self, timestamp_ns: int, equity: float, price: float, positions: float):
+        """Record the account state at one tick."""
+        self.append_row(timestamp_ns, equity, price, positions)
+
+    def _row(self, index: int) -> Dict[str, Any]:
+        return {
+            "timestamp": pd.Timestamp(int(self._columns["timestamp"][index])),
+            "equity": float(self._columns["equity"][index]),
+            "price": float(self._columns["price"][index]),
+            "positions": float(self._columns["positions"][index]),
+        }
+
+
+class TradeLedger(ColumnBuffer):
+    """
+    Executed trades stored as compact columns (side is an int8 code).
+    Rows read back as Trade records, which also work as the old trade dicts.
+    """
+
+    COLUMNS = {
+        "timestamp": np.int64,  # Nanoseconds since the epoch
+        "side": np.int8,  # SIDE_BUY or SIDE_SELL
+        "qty": np.float64,
+        "price": np.float64,
+    }
+
+    def append(self, timestamp_ns: int, side: Union[Side, str], qty: float, price: float):
+        """Record one executed trade (side as a Side or "buy"/"sell")."""
+        self.append_row(timestamp_ns, side if isinstance(side, Side) else SIDE_CODES[side], qty, price)
+
+    def _row(self, index: int) -> Trade:
+        # Same keys as the old list-of-dicts ledger, including cost/revenue
+        return Trade(int(self._columns["timestamp"][index]), Side(int(self._columns["side"][index])),
+                     float(self._columns["qty"][index]), float(self._columns["price"][index]))
+
+    def to_frame(self) -> pd.DataFrame:
+        """Export all trades as a DataFrame with readable side names."""
+        frame = super().to_frame()
+        frame["side"] = frame["side"].map(SIDE_NAMES)
+        return frame
@@ -0,0 +1,327 @@
+import bisect  # For finding a histogram bucket
+import json  # For the periodic JSON dump
+import logging  # For the startup messages
+import os  # For atomic dump writes
+import threading  # For the lock and the background exporters
+import time  # For timers and uptime
+from typing import Dict, List, Optional, Sequence, Tuple  # For type hints
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency buckets: 100 µs up to 10 s
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]  # Sorted (name, value) pairs
+
+
+class Histogram:
+    """Counts observations into fixed buckets; O(log buckets) per observation."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile from the buckets (upper bound of the bucket that holds it).
+        Returns:
+            The estimate, inf if it falls past the last bucket, nan with no observations
+        """
+        if self.count == 0:
+            return float("nan")
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Counter:
+    """A monotonically increasing count, e.g. requests or errors."""
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self.value += amount
+
+
+class _Timer:
+    """Context manager that observes its elapsed time into a histogram."""
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """
+    Registry of labelled histograms and counters for the live loops.
+    Export with render_prometheus() / snapshot(), or run a MetricsServer
+    or JsonDumper over it.
+    """
+    enabled = True
+
+    def __init__(self):
+        self.started = time.time()
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._counters: Dict[Tuple[str, Labels], Counter] = {}
+        self._lock = threading.Lock()  # Guards creating new series
+
+    def histogram(self, name: str, buckets: Sequence[float] = LATENCY_BUCKETS, **labels: str) -> Histogram:
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram(buckets))
+        return histogram
+
+    def counter(self, name: str, **labels: str) -> Counter:
+        key = (name, tuple(sorted(labels.items())))
+        counter = self._counters.get(key)
+        if counter is None:
+            with self._lock:
+                counter = self._counters.setdefault(key, Counter())
+        return counter
+
+    def timer(self, name: str, **labels: str) -> _Timer:
+        """Time a block: with metrics.timer("fetch_call_seconds", call="get_kraken_quote"): ..."""
+        return _Timer(self.histogram(name, **labels))
+
+    def observe(self, name: str, value: float, **labels: str):
+        self.histogram(name, **labels).observe(value)
+
+    def inc(self, name: str, amount: int = 1, **labels: str):
+        self.counter(name, **labels).inc(amount)
+
+    def render_prometheus(self) -> str:
+        """All series in the Prometheus text exposition format."""
+        lines: List[str] = []
+        typed = set()
+        for (name, labels), counter in sorted(self._counters.items()):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{_format_labels(labels)} {counter.value}")
+        for (name, labels), histogram in sorted(self._histograms.items()):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum!r}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, object]:
+        """Counters and histogram summaries (count, mean, p50/p90/p99) as plain data."""
+        uptime = time.time() - self.started
+        counters = [
+            {"name": name, "labels": dict(labels), "value": counter.value,
+             "rate_per_sec": counter.value / uptime if uptime > 0 else 0.0}
+            for (name, labels), counter in sorted(self._counters.items())
+        ]
+        histograms = [
+            {"name": name, "labels": dict(labels), "count": histogram.count,
+             "mean": histogram.sum / histogram.count if histogram.count else None,
+             "p50": _finite(histogram.quantile(0.5)), "p90": _finite(histogram.quantile(0.9)),
+             "p99": _finite(histogram.quantile(0.99))}
+            for (name, labels), histogram in sorted(self._histograms.items())
+        ]
+        return {"timestamp": time.time(), "uptime": uptime, "counters": counters, "histograms": histograms}
+
+
+class NullMetrics:
+    """Drop-in Metrics that records nothing; the default when metrics are off."""
+    enabled = False
+
+    def timer(self, name: str, **labels: str) -> _NullTimer:
+        return _NULL_TIMER
+
+    def observe(self, name: str, value: float, **labels: str):
+        pass
+
+    def inc(self, name: str, amount: int = 1, **labels: str):
+        pass
+
+    def render_prometheus(self) -> str:
+        return ""
+
+    def snapshot(self) -> Dict[str, object]:
+        return {"timestamp": time.time(), "uptime": 0.0, "counters": [], "histograms": []}
+
+
+NULL_METRICS = NullMetrics()
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _finite(value: float) -> Optional[float]:
+    # JSON has no inf/nan
+    return value if value == value and value != float("inf") else None
+
+
+class MetricsServer:
+    """
+    Serves metrics on a local HTTP port: /metrics in Prometheus text format
+    and /metrics.json as a snapshot. Runs in a daemon thread.
+    """
+
+    def __init__(self, metrics: Metrics, host: str = "127.0.0.1", port: int = 9108):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._server = None
+
+    def start(self) -> "MetricsServer":
+        # Imported here so runs without an endpoint never load the HTTP server
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body, content_type = metrics.render_prometheus().encode(), "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body, content_type = json.dumps(metrics.snapshot()).encode(), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep scrapes out of the bot's console output
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]  # The real port when 0 was asked for
+        threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True).start()
+        return self
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class JsonDumper:
+    """
+    Writes a metrics snapshot to a JSON file every `interval` seconds, with
+    counter rates over the last interval. Runs in a daemon thread.
+    """
+
+    def __init__(self, metrics: Metrics, path: str, interval: float = 10.0):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last: Optional[Dict[str, object]] = None
+
+    def dump(self):
+        """Write one snapshot now (atomically, so readers never see half a file)."""
+        snapshot = self.metrics.snapshot()
+        if self._last is not None:
+            elapsed = snapshot["timestamp"] - self._last["timestamp"]
+            before = {(c["name"], tuple(sorted(c["labels"].items()))): c["value"] for c in self._last["counters"]}
+            for counter in snapshot["counters"]:
+                previous = before.get((counter["name"], tuple(sorted(counter["labels"].items()))), 0)
+                counter["interval_rate_per_sec"] = (counter["value"] - previous) / elapsed if elapsed > 0 else 0.0
+        self._last = snapshot
+        with open(self.path + ".tmp", "w") as f:
+            json.dump(snapshot, f, indent=1)
+        os.replace(self.path + ".tmp", self.path)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.dump()
+
+    def start(self) -> "JsonDumper":
+        self._thread = threading.Thread(target=self._run, name="metrics-dumper", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.dump()  # Final numbers on shutdown
+
+
+def start_metrics(port: Optional[int] = None, json_path: Optional[str] = None,
+                  interval: float = 10.0) -> Tuple[object, list]:
+    """
+    Set up metrics for a runner from its command line options.
+    Args:
+        port: Serve /metrics on this local port (None = no endpoint)
+        json_path: Dump a JSON snapshot to this file every interval seconds (None = no dump)
+    Returns:
+        (Metrics, or NULL_METRICS when both are None; exporters to stop() on exit)
+    """
+    if port is None and json_path is None:
+        return NULL_METRICS, []
+    metrics = Metrics()
+    exporters = []
+    if port is not None:
+        server = MetricsServer(metrics, port=port).start()
+        logger.info(f"📈 Metrics at {server.url}")
+        exporters.append(server)
+    if json_path is not None:
+        exporters.append(JsonDumper(metrics, json_path, interval).start())
+        logger.info(f"📈 Metrics written to {json_path} every {interval:g}s")
+    return metrics, exporters
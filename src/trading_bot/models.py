@@ -0,0 +1,261 @@
+from collections.abc import Mapping  # For read-only dict interop
+from enum import IntEnum  # For small integer side/exchange codes
+from typing import Any, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple, Union  # For type hints
+
+# Typed records passed around on every tick instead of fresh dicts. They keep
+# their fields in __slots__ and sides/exchanges as small integer enums, but
+# still read like the old dicts (signal["buy_price"], **signal, dict(trade)),
+# so code written for dicts keeps working. No numpy/pandas at import time:
+# the live runners use these too.
+
+
+class Side(IntEnum):
+    """Side of a signal or trade; BUY/SELL match the trade ledger's codes."""
+    BUY = 1
+    SELL = -1
+    ARBITRAGE = 2  # Buy on one exchange and sell on another at once
+
+    @property
+    def label(self) -> str:
+        """Name used in dicts and journals, e.g. "buy"."""
+        return self.name.lower()
+
+
+class Exchange(IntEnum):
+    """Exchanges the bot talks to."""
+    BINANCE = 1
+    KRAKEN = 2
+    OKX = 3
+    BYBIT = 4
+    KUCOIN = 5
+
+    @property
+    def label(self) -> str:
+        """Name used in dicts, journals and metric labels, e.g. "binance"."""
+        return self.name.lower()
+
+
+class Venue(int):
+    """
+    Code of an exchange missing from Exchange (e.g. one with a newly added
+    adapter). to_exchange registers one per new name, so such quotes still
+    carry a small integer code and a .label like the Exchange members.
+    """
+
+    def __new__(cls, code: int, label: str):
+        venue = super().__new__(cls, code)
+        venue.label = label
+        return venue
+
+    def __reduce__(self):
+        # Keep the label when quotes are pickled (e.g. sent between processes)
+        return Venue, (int(self), self.label)
+
+    def __repr__(self) -> str:
+        return f"Venue({int(self)}, {self.label!r})"
+
+
+SIDES_BY_NAME = {side.label: side for side in Side}
+EXCHANGES_BY_NAME: Dict[str, Union[Exchange, Venue]] = {exchange.label: exchange for exchange in Exchange}
+EXCHANGES_BY_CODE: Dict[int, Union[Exchange, Venue]] = {int(exchange): exchange for exchange in Exchange}
+FIRST_VENUE_CODE = 64  # Registered venues get codes from here up to 127 (batches store int8)
+
+
+def to_side(value: Any) -> Optional[Side]:
+    """Side of a Side, a code or a name such as "buy"; None if it is none of these."""
+    if isinstance(value, Side):
+        return value
+    if isinstance(value, str):
+        return SIDES_BY_NAME.get(value)
+    try:
+        return Side(value)
+    except ValueError:
+        return None
+
+
+def register_exchange(name: str) -> Union[Exchange, Venue]:
+    """The code of an exchange name, registering a new Venue the first time a name is seen."""
+    if name not in EXCHANGES_BY_NAME:
+        code = max(FIRST_VENUE_CODE - 1, *EXCHANGES_BY_CODE) + 1
+        if code > 127:
+            raise ValueError(f"Too many exchanges to register {name!r}")
+        EXCHANGES_BY_NAME[name] = EXCHANGES_BY_CODE[code] = Venue(code, name)
+    return EXCHANGES_BY_NAME[name]
+
+
+def to_exchange(value: Any) -> Union[Exchange, Venue]:
+    """
+    Exchange of an Exchange, a code or a name such as "kraken". A name that
+    is not an Exchange member is registered as a Venue instead of rejected.
+    """
+    if isinstance(value, (Exchange, Venue)):
+        return value
+    if isinstance(value, str):
+        return register_exchange(value)
+    try:
+        return EXCHANGES_BY_CODE[value]
+    except (KeyError, TypeError):
+        raise ValueError(f"Unknown exchange: {value!r}") from None
+
+
+class _QuoteFields(NamedTuple):
+    exchange: Union[Exchange, Venue]
+    symbol: str  # Exchange symbol, e.g. "BTCUSDT"
+    price: float
+    request_ts: float  # time.time() when the request was sent
+    response_ts: float  # time.time() when the response arrived
+
+
+class Quote(_QuoteFields):
+    """
+    A price from one exchange, stamped with when it was asked for and received.
+    The exchange is stored as an Exchange code (a Venue for other names); a
+    name such as "binance" is accepted too, and quote.exchange.label gives
+    the name back.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, exchange: Any, symbol: str, price: float, request_ts: float, response_ts: float):
+        return super().__new__(cls, to_exchange(exchange), symbol, price, request_ts, response_ts)
+
+
+class _Record(Mapping):
+    """
+    Base of the slotted records: subclasses list their dict keys in _keys()
+    and Mapping supplies get(), keys(), items(), ==, ** unpacking and dict().
+    Enum fields read as their names through the dict interface.
+    """
+
+    __slots__ = ()
+
+    def _keys(self) -> Tuple[str, ...]:
+        raise NotImplementedError
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._keys():
+            raise KeyError(key)
+        value = getattr(self, key)
+        return value.label if isinstance(value, (Side, Exchange, Venue)) else value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def to_dict(self) -> dict:
+        """A plain dict copy (e.g. for JSON)."""
+        return {key: self[key] for key in self._keys()}
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class SpreadInfo(_Record):
+    """Spread between two prices of the same asset (see DataFetcher.calculate_spread)."""
+
+    __slots__ = ("spread", "spread_pct", "lower_price", "higher_price", "lower_exchange", "higher_exchange")
+    _KEYS = __slots__
+
+    def __init__(self, spread: float, spread_pct: float, lower_price: float, higher_price: float,
+                 lower_exchange: Exchange, higher_exchange: Exchange):
+        self.spread = spread
+        self.spread_pct = spread_pct
+        self.lower_price = lower_price
+        self.higher_price = higher_price
+        self.lower_exchange = lower_exchange  # Where to buy
+        self.higher_exchange = higher_exchange  # Where to sell
+
+    def _keys(self) -> Tuple[str, ...]:
+        return self._KEYS
+
+
+class Signal(_Record):
+    """
+    What a strategy wants done: buy or sell qty units, or an arbitrage
+    (buy qty on buy_exchange at buy_price, sell on sell_exchange at
+    sell_price). Reads like the old {"side": "buy", "qty": 1} dicts.
+    """
+
+    __slots__ = ("side", "qty", "buy_exchange", "sell_exchange", "buy_price", "sell_price", "spread_pct")
+    _SIMPLE_KEYS = ("side", "qty")
+    _ARBITRAGE_KEYS = ("side", "buy_exchange", "sell_exchange", "buy_price", "sell_price", "spread_pct", "qty")
+
+    def __init__(self, side: Side, qty: float = 1, buy_exchange: Optional[Exchange] = None,
+                 sell_exchange: Optional[Exchange] = None, buy_price: float = 0.0, sell_price: float = 0.0,
+                 spread_pct: float = 0.0):
+        self.side = side if isinstance(side, Side) else to_side(side)
+        self.qty = qty
+        self.buy_exchange = buy_exchange
+        self.sell_exchange = sell_exchange
+        self.buy_price = buy_price
+        self.sell_price = sell_price
+        self.spread_pct = spread_pct
+
+    @classmethod
+    def arbitrage(cls, spread: SpreadInfo, qty: float = 1) -> "Signal":
+        """Buy at the lower price and sell at the higher one."""
+        return cls(Side.ARBITRAGE, qty, spread.lower_exchange, spread.higher_exchange,
+                   spread.lower_price, spread.higher_price, spread.spread_pct)
+
+    def _keys(self) -> Tuple[str, ...]:
+        return self._ARBITRAGE_KEYS if self.side == Side.ARBITRAGE else self._SIMPLE_KEYS
+
+
+class Trade(_Record):
+    """
+    One executed trade, as stored by the trade ledger. Reads like the old
+    trade dicts: "timestamp" (pd.Timestamp), "side", "price", "qty" and
+    "cost" (buys) or "revenue" (sells).
+    """
+
+    __slots__ = ("timestamp_ns", "side", "qty", "price")
+    _BUY_KEYS = ("timestamp", "side", "price", "qty", "cost")
+    _SELL_KEYS = ("timestamp", "side", "price", "qty", "revenue")
+
+    def __init__(self, timestamp_ns: int, side: Side, qty: float, price: float):
+        self.timestamp_ns = timestamp_ns
+        self.side = side
+        self.qty = qty
+        self.price = price
+
+    def _keys(self) -> Tuple[str, ...]:
+        return self._BUY_KEYS if self.side == Side.BUY else self._SELL_KEYS
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "timestamp":
+            import pandas as pd  # Only built when asked for
+
+            return pd.Timestamp(self.timestamp_ns)
+        if key == "side":
+            return self.side.label
+        if key in ("cost", "revenue") and key in self._keys():
+            return self.price * self.qty
+        if key in ("price", "qty"):
+            return getattr(self, key)
+        raise KeyError(key)
+
+
+# Batches as NumPy structured arrays: one fixed-size record per item, with
+# exchanges and sides as int8 codes
+QUOTE_RECORD = [("exchange", "i1"), ("symbol", "U16"), ("price", "f8"), ("request_ts", "f8"), ("response_ts", "f8")]
+SIGNAL_RECORD = [("side", "i1"), ("qty", "f8"), ("buy_exchange", "i1"), ("sell_exchange", "i1"),
+                 ("buy_price", "f8"), ("sell_price", "f8"), ("spread_pct", "f8")]
+
+
+def quote_batch(quotes: Iterable[Quote]):
+    """Many quotes as one structured array with QUOTE_RECORD fields."""
+    import numpy as np  # Only batches need numpy
+
+    return np.array([(q.exchange, q.symbol, q.price, q.request_ts, q.response_ts) for q in quotes],
+                    dtype=QUOTE_RECORD)
+
+
+def signal_batch(signals: Iterable[Signal]):
+    """Many signals as one structured array with SIGNAL_RECORD fields (exchange 0 = none)."""
+    import numpy as np  # Only batches need numpy
+
+    return np.array([(s.side, s.qty, s.buy_exchange or 0, s.sell_exchange or 0,
+                      s.buy_price, s.sell_price, s.spread_pct) for s in signals], dtype=SIGNAL_RECORD)
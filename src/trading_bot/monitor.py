@@ -0,0 +1,150 @@
+import json  # For the config file
+import time  # For quote ages
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence  # For type hints
+
+import numpy as np  # For the bid/ask matrices
+
+from .stream import BookTop  # Best bid/ask of one symbol on one exchange
+
+# Settings of run_monitor.py; a config file overrides any of them
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "venues": ["binance", "kraken", "okx", "bybit", "kucoin"],
+    "symbols": "auto",  # A list such as ["BTCUSDT", "ETHUSDT"], or "auto"
+    "quotes": ["USDT", "USDC", "USD"],  # With "auto": quote currencies to consider
+    "max_symbols": 300,  # With "auto": keep the symbols listed on the most venues
+    "threshold_pct": 0.3,  # Emit pairs whose spread after fees reaches this
+    "fees": {"binance": 0.1, "kraken": 0.26, "okx": 0.1, "bybit": 0.1, "kucoin": 0.1},  # Taker fee, percent
+    "max_age": 3.0,  # Ignore quotes older than this many seconds
+    "interval": 0.5,  # Seconds between snapshots
+}
+
+
+def load_config(path: Optional[str] = None) -> Dict[str, Any]:
+    """DEFAULT_CONFIG updated with the keys of a JSON config file (if given)."""
+    config = json.loads(json.dumps(DEFAULT_CONFIG))  # Deep copy
+    if path:
+        with open(path, encoding="utf-8") as f:
+            overrides = json.load(f)
+        unknown = set(overrides) - set(DEFAULT_CONFIG)
+        if unknown:
+            raise ValueError(f"Unknown monitor settings: {', '.join(sorted(unknown))}")
+        config.update(overrides)
+    return config
+
+
+def pick_symbols(tops_by_venue: Dict[str, List[BookTop]], quotes: Sequence[str] = ("USDT",),
+                 max_symbols: int = 300, min_venues: int = 2) -> List[str]:
+    """
+    Symbols worth watching from a first snapshot: quoted in one of `quotes`
+    and listed on at least min_venues venues, most widely listed first.
+    """
+    venues_per_symbol: Dict[str, int] = {}
+    for tops in tops_by_venue.values():
+        for symbol in {top.symbol for top in tops}:
+            if any(symbol.endswith(quote) for quote in quotes):
+                venues_per_symbol[symbol] = venues_per_symbol.get(symbol, 0) + 1
+    ranked = sorted((s for s, n in venues_per_symbol.items() if n >= min_venues),
+                    key=lambda s: (-venues_per_symbol[s], s))
+    return ranked[:max_symbols]
+
+
+class SpreadOpportunity(NamedTuple):
+    """Buy a symbol at the ask of one venue and sell it at the bid of another."""
+    symbol: str
+    buy_venue: str
+    sell_venue: str
+    buy_price: float  # Ask on the buy venue
+    sell_price: float  # Bid on the sell venue
+    spread_pct: float  # (sell - buy) / buy, in percent
+    net_pct: float  # spread_pct minus both taker fees
+
+
+class SpreadMonitor:
+    """
+    Best bid/ask of every watched symbol on every venue, kept in
+    (symbols x venues) matrices. Each scan compares every venue with every
+    other venue for all symbols at once: buying at one venue's ask and
+    selling at another's bid, minus both taker fees. Only pairs at or above
+    the threshold are returned, so the work per scan does not depend on
+    how many opportunities there are to print.
+    """
+
+    def __init__(self, symbols: Sequence[str], venues: Sequence[str], threshold_pct: float = 0.3,
+                 fees: Optional[Dict[str, float]] = None, max_age: float = 3.0):
+        """
+        Args:
+            symbols: Normalized symbols to watch, e.g. ["BTCUSDT", "ETHUSDT"]
+            venues: Exchange names
+            threshold_pct: Minimum spread after fees to report
+            fees: Taker fee per venue in percent (default 0)
+            max_age: Quotes older than this many seconds are left out
+        """
+        self.symbols = list(symbols)
+        self.venues = list(venues)
+        self.threshold_pct = threshold_pct
+        self.max_age = max_age
+        self._symbol_index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self._venue_index = {venue: j for j, venue in enumerate(self.venues)}
+        shape = (len(self.symbols), len(self.venues))
+        self.bids = np.full(shape, np.nan)
+        self.asks = np.full(shape, np.nan)
+        self.received = np.zeros(shape)  # time.time() of each quote
+        fees = fees or {}
+        fee_pct = np.array([fees.get(venue, 0.0) for venue in self.venues])
+        # Cost of buying on venue j and selling on venue k, and the j == k cells to skip
+        self._fee_pct = fee_pct[:, None] + fee_pct[None, :]
+        self._same_venue = np.eye(len(self.venues), dtype=bool)
+
+    def update(self, tops: Iterable[BookTop]) -> int:
+        """
+        Store new quotes; symbols and venues not being watched are ignored.
+        Returns:
+            Number of quotes stored
+        """
+        rows, columns, bids, asks, received = [], [], [], [], []
+        symbol_index, venue_index = self._symbol_index, self._venue_index
+        for top in tops:
+            i = symbol_index.get(top.symbol)
+            j = venue_index.get(top.exchange)
+            if i is None or j is None:
+                continue
+            rows.append(i)
+            columns.append(j)
+            bids.append(top.bid)
+            asks.append(top.ask)
+            received.append(top.received_ts)
+        # One fancy-index assignment per matrix instead of a write per quote
+        self.bids[rows, columns] = bids
+        self.asks[rows, columns] = asks
+        self.received[rows, columns] = received
+        return len(rows)
+
+    def spread_matrix(self, now: Optional[float] = None) -> np.ndarray:
+        """
+        Net spread in percent of buying on venue j and selling on venue k,
+        shape (symbols, venues, venues); NaN where a quote is missing or stale
+        and on the j == k diagonal.
+        """
+        now = time.time() if now is None else now
+        fresh = (now - self.received) <= self.max_age
+        bids = np.where(fresh, self.bids, np.nan)
+        asks = np.where(fresh, self.asks, np.nan)
+        spread = (bids[:, None, :] - asks[:, :, None]) / asks[:, :, None] * 100
+        net = spread - self._fee_pct
+        net[:, self._same_venue] = np.nan
+        return net
+
+    def scan(self, now: Optional[float] = None) -> List[SpreadOpportunity]:
+        """Every (symbol, buy venue, sell venue) at or above the threshold, best first."""
+        net = self.spread_matrix(now)
+        with np.errstate(invalid="ignore"):
+            hits = np.argwhere(net >= self.threshold_pct)
+        opportunities = []
+        for i, j, k in hits:
+            buy_price = float(self.asks[i, j])
+            sell_price = float(self.bids[i, k])
+            opportunities.append(SpreadOpportunity(
+                self.symbols[i], self.venues[j], self.venues[k], buy_price, sell_price,
+                (sell_price - buy_price) / buy_price * 100, float(net[i, j, k])))
+        opportunities.sort(key=lambda o: o.net_pct, reverse=True)
+        return opportunities
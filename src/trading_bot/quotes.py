@@ -0,0 +1,191 @@
+import time  # For pacing replays
+from typing import Any, Dict, List, Optional, Sequence, Tuple  # For type hints
+
+from .models import Quote  # Quotes handed to strategies
+from .journal import TradeJournal, read_journal  # Recordings are journaled quotes
+
+QuotePair = Tuple[Optional[Quote], Optional[Quote]]  # (Binance quote, Kraken quote)
+
+
+class QuoteSource:
+    """
+    Where a strategy gets its Binance/Kraken quotes from. DataFetcher is the
+    live source (it has the same get_both_quotes method); QuoteRecorder
+    saves whatever a source returns and ReplayQuoteSource plays a recording
+    back without the network.
+    """
+
+    def get_both_quotes(self) -> QuotePair:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class QuoteRecorder(QuoteSource):
+    """Passes quotes through from another source and writes each one to a TradeJournal."""
+
+    def __init__(self, source, journal: TradeJournal):
+        """
+        Args:
+            source: The source to record, usually a DataFetcher
+            journal: Journal the quotes are written to (by its background thread)
+        """
+        self.source = source
+        self.journal = journal
+
+    def get_both_quotes(self) -> QuotePair:
+        quotes = self.source.get_both_quotes()
+        for quote in quotes:
+            if quote is not None:
+                self.journal.quote(quote)
+        return quotes
+
+    def close(self):
+        self.journal.close()
+
+
+class ReplayQuoteSource(QuoteSource):
+    """
+    Plays recorded quote pairs back, one pair per get_both_quotes call.
+    With speed=None pairs come back as fast as they are asked for; with
+    speed=1.0 each call waits until the recorded time gap has passed on the
+    wall clock (2.0 = twice as fast). Once the recording is used up every
+    call returns (None, None) and `exhausted` is True.
+    """
+
+    def __init__(self, timestamps: Sequence[float], binance: Sequence[float], kraken: Sequence[float],
+                 speed: Optional[float] = None, binance_symbol: str = "BTCUSDT", kraken_pair: str = "XBTUSDT"):
+        """
+        Args:
+            timestamps: Time of each pair in seconds since the epoch
+            binance, kraken: Price of each exchange at that time
+            speed: Replay speed relative to the recording (None = no waiting)
+        """
+        self.timestamps = timestamps
+        self.binance = binance
+        self.kraken = kraken
+        self.speed = speed
+        self.binance_symbol = binance_symbol
+        self.kraken_pair = kraken_pair
+        self.position = 0  # Next pair to hand out
+        self._wall_start: Optional[float] = None  # Wall-clock time of the first pair
+
+    @classmethod
+    def from_journal(cls, path: str, speed: Optional[float] = None, binance_symbol: str = "BTCUSDT",
+                     kraken_pair: str = "XBTUSDT") -> "ReplayQuoteSource":
+        """Replay the quotes of a journal file or directory (see load_quote_ticks)."""
+        ticks = load_quote_ticks(path, binance_symbol, kraken_pair)
+        return cls(ticks["timestamp"], ticks["binance"], ticks["kraken"], speed, binance_symbol, kraken_pair)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def exhausted(self) -> bool:
+        return self.position >= len(self.timestamps)
+
+    def get_both_quotes(self) -> QuotePair:
+        if self.exhausted:
+            return None, None
+        i = self.position
+        self.position += 1
+        ts = float(self.timestamps[i])
+        if self.speed:
+            if self._wall_start is None:
+                self._wall_start = time.time()
+            # Wait until this pair is due, measured from the first one
+            delay = self._wall_start + (ts - float(self.timestamps[0])) / self.speed - time.time()
+            if delay > 0:
+                time.sleep(delay)
+        return (Quote("binance", self.binance_symbol, float(self.binance[i]), ts, ts),
+                Quote("kraken", self.kraken_pair, float(self.kraken[i]), ts, ts))
+
+
+def load_quote_ticks(path: str, binance_symbol: str = "BTCUSDT", kraken_pair: str = "XBTUSDT") -> Dict[str, List[float]]:
+    """
+    Turn the quotes of a journal into one row per quote update that has both
+    prices: each row holds the latest Binance and Kraken price known at that
+    moment (rows before both exchanges have quoted are dropped).
+    Returns:
+        {"timestamp": [...], "binance": [...], "kraken": [...]}
+    """
+    timestamps: List[float] = []
+    binance_prices: List[float] = []
+    kraken_prices: List[float] = []
+    latest: Dict[str, Optional[float]] = {"binance": None, "kraken": None}
+    wanted = {("binance", binance_symbol), ("kraken", kraken_pair)}
+    quotes = (r for r in read_journal(path, ["quote"]) if (r.get("exchange"), r.get("symbol")) in wanted)
+    for record in sorted(quotes, key=lambda r: r["ts"]):
+        latest[record["exchange"]] = record["price"]
+        if latest["binance"] is not None and latest["kraken"] is not None:
+            timestamps.append(record["ts"])
+            binance_prices.append(latest["binance"])
+            kraken_prices.append(latest["kraken"])
+    return {"timestamp": timestamps, "binance": binance_prices, "kraken": kraken_prices}
+
+
+def quote_ticks_frame(path: str, binance_symbol: str = "BTCUSDT", kraken_pair: str = "XBTUSDT"):
+    """
+    Recorded quote pairs as a DataFrame for Backtest.run: 'timestamp',
+    'binance_price', 'kraken_price' and 'price' (the Binance price, used to
+    value the account). ArbitrageStrategy.on_tick reads the two prices from
+    each row instead of going to the network.
+    """
+    import pandas as pd  # Only backtests need pandas
+
+    ticks = load_quote_ticks(path, binance_symbol, kraken_pair)
+    return pd.DataFrame({
+        "timestamp": pd.to_datetime(ticks["timestamp"], unit="s"),
+        "price": pd.Series(ticks["binance"], dtype="float64"),
+        "binance_price": pd.Series(ticks["binance"], dtype="float64"),
+        "kraken_price": pd.Series(ticks["kraken"], dtype="float64"),
+    })
+
+
+def replay(strategy, source: QuoteSource, max_ticks: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Drive a strategy's on_tick from a quote source until it runs dry (or for max_ticks).
+    The strategy must take its quotes from `source` (e.g. ArbitrageStrategy(quote_source=source)).
+    Returns:
+        Dictionary with ticks processed, the signals returned and ticks per second
+    """
+    signals = []
+    ticks = 0
+    started = time.perf_counter()
+    while max_ticks is None or ticks < max_ticks:
+        if getattr(source, "exhausted", False):
+            break
+        signal = strategy.on_tick({"timestamp": time.time()})
+        ticks += 1
+        if signal:
+            signals.append(signal)
+    elapsed = time.perf_counter() - started
+    return {"ticks": ticks, "signals": signals,
+            "ticks_per_sec": ticks / elapsed if elapsed > 0 else float("inf")}
+
+
+def replay_vectorized(strategy, binance, kraken, qty: float = 1.0) -> Dict[str, Any]:
+    """
+    Same decisions as calling strategy.on_tick once per recorded pair, made
+    for the whole recording at once with strategy.scan_spreads. Meant for
+    weeks of ticks.
+    Returns:
+        Dictionary with ticks, signal count, gross profit (before fees) and ticks per second
+    """
+    import numpy as np  # Only the array path needs numpy
+
+    started = time.perf_counter()
+    binance = np.asarray(binance, dtype=np.float64)
+    kraken = np.asarray(kraken, dtype=np.float64)
+    scan = strategy.scan_spreads(binance, kraken)
+    hits = scan["signal"]
+    gross_profit = float(scan["spread"][hits].sum() * qty)
+    elapsed = time.perf_counter() - started
+    return {
+        "ticks": len(binance),
+        "signal_count": int(hits.sum()),
+        "signal_rows": np.flatnonzero(hits),
+        "gross_profit": gross_profit,
+        "ticks_per_sec": len(binance) / elapsed if elapsed > 0 else float("inf"),
+    }
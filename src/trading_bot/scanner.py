@@ -0,0 +1,167 @@
+import numpy as np  # For vectorized log-price sums over all cycles
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple  # For type hints
+
+# Quote currencies tried (longest first) when a symbol has to be split by name
+KNOWN_QUOTES = (
+    "FDUSD", "USDT", "USDC", "TUSD", "BUSD", "DAI", "BTC", "ETH", "BNB",
+    "EUR", "GBP", "TRY", "BRL", "JPY", "USD", "XRP", "SOL", "DOGE",
+)
+
+
+def split_symbol(symbol: str, quotes: Iterable[str] = KNOWN_QUOTES) -> Optional[Tuple[str, str]]:
+    """
+    Split an exchange symbol like "SOLBTC" into ("SOL", "BTC") by its quote currency.
+    Returns:
+        (base, quote), or None if no known quote currency matches
+    """
+    for quote in sorted(quotes, key=len, reverse=True):
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            return symbol[:-len(quote)], quote
+    return None
+
+
+class CycleOpportunity(NamedTuple):
+    """A profitable cycle, in the direction that makes money."""
+    currencies: Tuple[str, ...]  # e.g. ("USDT", "SOL", "BTC"): USDT -> SOL -> BTC -> USDT
+    legs: Tuple[Tuple[str, str], ...]  # (symbol, "buy" or "sell") per leg
+    profit_pct: float  # Gross profit of one trip round the cycle, in percent
+
+
+class TriangleScanner:
+    """
+    Finds arbitrage cycles over the whole currency graph of an exchange.
+    Every 3-leg cycle (and 4-leg cycle if asked) is found once when the
+    scanner is built. A symbol BASEQUOTE with price p converts BASE to QUOTE
+    at p and QUOTE to BASE at 1/p, so a cycle is profitable when the signed
+    sum of its legs' log prices is above zero. Price updates only recompute
+    the cycles that use a changed symbol, as one NumPy expression.
+    """
+
+    def __init__(self, pairs: Dict[str, Tuple[str, str]], max_legs: int = 3, min_profit_pct: float = 0.0):
+        """
+        Args:
+            pairs: Symbol -> (base, quote), e.g. {"SOLBTC": ("SOL", "BTC")}
+            max_legs: Longest cycle to look for (3 or 4)
+            min_profit_pct: Only report cycles at least this profitable
+        """
+        if max_legs not in (3, 4):
+            raise ValueError("max_legs must be 3 or 4")
+        self.symbols = list(pairs)
+        self.pairs = dict(pairs)
+        self.symbol_index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.min_profit_pct = min_profit_pct
+
+        cycles = self._find_cycles(max_legs)
+        pad = len(self.symbols)  # Extra slot that always holds log price 0
+        self.cycle_currencies = [currencies for currencies, _ in cycles]
+        # legs[c, k] is the symbol of leg k of cycle c; signs[c, k] is +1 (sell base) or -1 (buy base)
+        self.legs = np.full((len(cycles), max_legs), pad, dtype=np.int64)
+        self.signs = np.zeros((len(cycles), max_legs), dtype=np.float64)
+        for c, (_, legs) in enumerate(cycles):
+            for k, (symbol_idx, sign) in enumerate(legs):
+                self.legs[c, k] = symbol_idx
+                self.signs[c, k] = sign
+
+        # For every symbol, the cycles that use it
+        owners = [[] for _ in range(len(self.symbols))]
+        for c, (_, legs) in enumerate(cycles):
+            for symbol_idx, _ in legs:
+                owners[symbol_idx].append(c)
+        self.symbol_cycles = [np.asarray(owner, dtype=np.int64) for owner in owners]
+
+        self.log_prices = np.full(len(self.symbols) + 1, np.nan)  # Unknown until the first update
+        self.log_prices[pad] = 0.0
+        self.cycle_values = np.full(len(cycles), np.nan)  # Signed log return of each cycle
+
+    @classmethod
+    def from_prices(cls, prices: Dict[str, float], quotes: Iterable[str] = KNOWN_QUOTES, **kwargs) -> "TriangleScanner":
+        """
+        Build a scanner from a symbol -> price snapshot, splitting symbols by name,
+        and load the snapshot's prices into it.
+        """
+        pairs = {}
+        for symbol in prices:
+            split = split_symbol(symbol, quotes)
+            if split is not None:
+                pairs[symbol] = split
+        scanner = cls(pairs, **kwargs)
+        scanner.update(prices)
+        return scanner
+
+    @property
+    def cycle_count(self) -> int:
+        return len(self.cycle_currencies)
+
+    def _find_cycles(self, max_legs: int) -> List[Tuple[Tuple[str, ...], List[Tuple[int, float]]]]:
+        """Enumerate each simple cycle of 3..max_legs currencies exactly once."""
+        currencies = sorted({currency for pair in self.pairs.values() for currency in pair})
+        order = {currency: i for i, currency in enumerate(currencies)}
+        # currency -> [(next currency, symbol index, sign)]
+        edges: Dict[str, List[Tuple[str, int, float]]] = {currency: [] for currency in currencies}
+        for symbol, (base, quote) in self.pairs.items():
+            edges[base].append((quote, self.symbol_index[symbol], 1.0))  # Sell base for quote
+            edges[quote].append((base, self.symbol_index[symbol], -1.0))  # Buy base with quote
+
+        cycles = []
+
+        def extend(path: List[str], legs: List[Tuple[int, float]]):
+            start = path[0]
+            for currency, symbol_idx, sign in edges[path[-1]]:
+                if currency == start and len(path) >= 3:
+                    # Each cycle is walked in both directions; keep one of them
+                    if order[path[1]] < order[path[-1]]:
+                        cycles.append((tuple(path), legs + [(symbol_idx, sign)]))
+                elif len(path) < max_legs and order[currency] > order[start] and currency not in path:
+                    extend(path + [currency], legs + [(symbol_idx, sign)])
+
+        # Starting from the lowest-ordered currency of a cycle avoids listing its rotations
+        for start in currencies:
+            extend([start], [])
+        return cycles
+
+    def update(self, prices: Dict[str, float]) -> List[CycleOpportunity]:
+        """
+        Apply new prices and re-evaluate the cycles they touch.
+        Args:
+            prices: Symbol -> price; unknown symbols are ignored
+        Returns:
+            Opportunities among the re-evaluated cycles, best first
+        """
+        known = [(self.symbol_index[symbol], price) for symbol, price in prices.items()
+                 if symbol in self.symbol_index and price > 0]
+        if not known:
+            return []
+        indices = np.fromiter((i for i, _ in known), dtype=np.int64, count=len(known))
+        new_logs = np.log(np.fromiter((p for _, p in known), dtype=np.float64, count=len(known)))
+        changed = indices[new_logs != self.log_prices[indices]]  # Skip prices that did not move
+        if len(changed) == 0:
+            return []
+        self.log_prices[indices] = new_logs
+
+        affected = np.unique(np.concatenate([self.symbol_cycles[i] for i in changed]))
+        if len(affected) == 0:
+            return []
+        self.cycle_values[affected] = (self.signs[affected] * self.log_prices[self.legs[affected]]).sum(axis=1)
+        return self._opportunities(affected)
+
+    def opportunities(self) -> List[CycleOpportunity]:
+        """All cycles currently above min_profit_pct, best first."""
+        return self._opportunities(np.arange(self.cycle_count))
+
+    def _opportunities(self, cycles: np.ndarray) -> List[CycleOpportunity]:
+        values = self.cycle_values[cycles]
+        profit_pct = np.expm1(np.abs(values)) * 100  # Either direction can be the profitable one
+        hits = np.flatnonzero(profit_pct > self.min_profit_pct)  # NaN (missing prices) never passes
+        results = [self._describe(int(cycles[h]), values[h] < 0, float(profit_pct[h])) for h in hits]
+        results.sort(key=lambda opportunity: opportunity.profit_pct, reverse=True)
+        return results
+
+    def _describe(self, cycle: int, reverse: bool, profit_pct: float) -> CycleOpportunity:
+        currencies = self.cycle_currencies[cycle]
+        legs = [(self.symbols[s], "sell" if sign > 0 else "buy")
+                for s, sign in zip(self.legs[cycle], self.signs[cycle]) if sign != 0]
+        if reverse:
+            # Walk the cycle the other way: same start, reversed legs with buy/sell swapped
+            currencies = (currencies[0],) + tuple(reversed(currencies[1:]))
+            legs = [(symbol, "buy" if side == "sell" else "sell") for symbol, side in reversed(legs)]
+        return CycleOpportunity(currencies, tuple(legs), profit_pct)
@@ -0,0 +1,258 @@
+import random  # For backoff jitter
+import threading  # For the bucket lock and in-flight requests
+import time  # For refilling buckets and sleeping
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple  # For type hints
+
+from .metrics import NULL_METRICS  # Default no-op instrumentation
+
+# Request budget per exchange: (weight refilled per second, burst capacity).
+# Binance allows 6000 request weight a minute per IP, Kraken's public
+# endpoints about one call a second, OKX 20 ticker calls per 2 s, Bybit
+# 600 calls per 5 s and KuCoin 2000 weight per 30 s (allTickers costs 15);
+# we stay at about half of that.
+DEFAULT_LIMITS: Dict[str, Tuple[float, float]] = {
+    "binance": (50.0, 600.0),
+    "kraken": (0.5, 5.0),
+    "okx": (5.0, 10.0),
+    "bybit": (50.0, 100.0),
+    "kucoin": (30.0, 60.0),
+}
+
+# HTTP statuses worth retrying: rate limited (429, 418 = IP banned for
+# ignoring 429s) and server-side errors
+RATE_LIMIT_STATUSES = {418, 429}
+RETRY_STATUSES = RATE_LIMIT_STATUSES | {500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Request budget that refills continuously at `rate` weight per second up
+    to `capacity`. acquire() waits until enough weight is available, so
+    callers never send faster than the budget allows.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0  # No requests at all before this time (after a 429)
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        if now <= self._updated:
+            return  # Still paused
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, weight: float = 1.0) -> float:
+        """Seconds until `weight` could be spent (0 = right now)."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return max(self._paused_until - now, (weight - self._tokens) / self.rate, 0.0)
+
+    def try_acquire(self, weight: float = 1.0) -> bool:
+        """Spend `weight` if it is available now; never waits."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._paused_until or self._tokens < weight:
+                return False
+            self._tokens -= weight
+            return True
+
+    def acquire(self, weight: float = 1.0, timeout: Optional[float] = None) -> float:
+        """
+        Wait until `weight` is available and spend it.
+        Returns:
+            Seconds spent waiting
+        Raises:
+            TimeoutError: If that would take longer than timeout
+        """
+        started = time.monotonic()
+        while not self.try_acquire(weight):
+            delay = self.wait_time(weight)
+            if timeout is not None and time.monotonic() - started + delay > timeout:
+                raise TimeoutError(f"Request budget not available within {timeout}s")
+            time.sleep(max(delay, 0.001))
+        return time.monotonic() - started
+
+    def pause(self, seconds: float):
+        """Send nothing for `seconds` and start again from an empty bucket (e.g. after a 429)."""
+        with self._lock:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = 0.0
+            self._updated = now + seconds
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 30.0) -> float:
+    """
+    "Full jitter" exponential backoff: a random delay in [0, base * 2**attempt],
+    capped, so clients that failed together do not retry together.
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """
+    Whether a failed request is worth retrying, and when.
+    Returns:
+        None for errors a retry cannot fix (e.g. 404, bad JSON); otherwise
+        the server's Retry-After in seconds, or 0 if it gave none
+    """
+    if isinstance(exc, ValueError):
+        # Bad JSON, including requests' JSONDecodeError, which is an OSError too
+        return None
+    response = getattr(exc, "response", None)
+    if response is not None:
+        if response.status_code not in RETRY_STATUSES:
+            return None
+        try:
+            return float(response.headers.get("Retry-After", 0))
+        except ValueError:
+            return 0.0
+    # Timeouts and dropped connections (requests' errors are OSErrors too)
+    return 0.0 if isinstance(exc, OSError) else None
+
+
+def _rate_limited(exc: BaseException) -> bool:
+    response = getattr(exc, "response", None)
+    return response is not None and response.status_code in RATE_LIMIT_STATUSES
+
+
+class _InFlight:
+    """Result of a request that other callers are waiting on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class RequestScheduler:
+    """
+    One place that all HTTP requests of a DataFetcher go through:
+      - a token bucket per exchange keeps each venue within its request budget
+      - a rate-limit or server error pauses that exchange's bucket (honouring
+        Retry-After) and the request is retried with jittered backoff
+      - identical requests made while one is already in flight are coalesced:
+        the later callers wait for the first one's result instead of sending
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None, max_retries: int = 3,
+                 backoff_base: float = 0.5, backoff_cap: float = 30.0, metrics=None):
+        """
+        Args:
+            limits: Exchange -> (weight per second, burst); merged over DEFAULT_LIMITS.
+                    Exchanges not listed are not throttled
+            max_retries: Retries of a failed request before giving up
+            backoff_base, backoff_cap: Backoff before retry n is random in
+                                       [0, min(cap, base * 2**n)] seconds
+            metrics: Metrics registry for waits, retries and coalesced calls
+        """
+        limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.buckets = {exchange: TokenBucket(rate, burst) for exchange, (rate, burst) in limits.items()}
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.metrics = metrics or NULL_METRICS
+        self._in_flight: Dict[Hashable, _InFlight] = {}
+        self._lock = threading.Lock()
+
+    def call(self, exchange: str, key: Optional[Hashable], request: Callable[[], Any], weight: float = 1.0) -> Any:
+        """
+        Run request() within the exchange's budget, retrying what is retryable.
+        Args:
+            exchange: Whose budget to spend
+            key: Identifies the request for coalescing (e.g. URL + params); None = never coalesce
+            request: Zero-argument callable sending the request
+            weight: Budget the request costs (Binance weights some endpoints higher)
+        Returns:
+            What request() returned; the last error is raised if every attempt failed
+        """
+        if key is None:
+            return self._call(exchange, request, weight)
+        with self._lock:
+            pending = self._in_flight.get(key)
+            leader = pending is None
+            if leader:
+                pending = self._in_flight[key] = _InFlight()
+        if not leader:
+            self.metrics.inc("fetch_coalesced_total", exchange=exchange)
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.result
+        try:
+            pending.result = self._call(exchange, request, weight)
+            return pending.result
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            pending.done.set()
+
+    def _call(self, exchange: str, request: Callable[[], Any], weight: float) -> Any:
+        bucket = self.buckets.get(exchange)
+        attempt = 0
+        while True:
+            if bucket is not None:
+                waited = bucket.acquire(weight)
+                if waited > 0:
+                    self.metrics.observe("fetch_throttle_seconds", waited, exchange=exchange)
+            try:
+                return request()
+            except Exception as e:
+                hint = retry_after(e)
+                if hint is None or attempt >= self.max_retries:
+                    raise
+                delay = max(hint, backoff_delay(attempt, self.backoff_base, self.backoff_cap))
+                if bucket is not None and _rate_limited(e):
+                    bucket.pause(delay)  # Everyone else backs off this exchange too
+                else:
+                    time.sleep(delay)  # Only this request waits
+                attempt += 1
+                self.metrics.inc("fetch_retries_total", exchange=exchange)
+
+    def min_interval(self, exchange: str, weight: float = 1.0) -> float:
+        """Shortest sustainable time between requests of this weight (0 if unthrottled)."""
+        bucket = self.buckets.get(exchange)
+        return weight / bucket.rate if bucket is not None else 0.0
+
+
+class AdaptivePoller:
+    """
+    Picks the pause between polls from the last spread: the closer the
+    spread is to the trading threshold, the faster we poll (down to
+    min_interval); far from it we slow down to max_interval.
+    """
+
+    def __init__(self, threshold_pct: float, min_interval: float = 1.0, max_interval: float = 10.0,
+                 near_pct: float = 0.5):
+        """
+        Args:
+            threshold_pct: Spread that triggers a trade
+            min_interval: Pause once the spread reaches the threshold
+            max_interval: Pause while the spread is below near_pct * threshold
+            near_pct: Between near_pct * threshold and the threshold the pause
+                      shrinks linearly from max_interval to min_interval
+        """
+        self.threshold_pct = threshold_pct
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.near_pct = near_pct
+
+    def next_interval(self, spread_pct: Optional[float]) -> float:
+        """Seconds to wait before the next poll (max_interval if no spread is known)."""
+        if spread_pct is None or self.threshold_pct <= 0:
+            return self.max_interval
+        start = self.threshold_pct * self.near_pct
+        if start >= self.threshold_pct:
+            closeness = 1.0 if abs(spread_pct) >= self.threshold_pct else 0.0
+        else:
+            closeness = min(max((abs(spread_pct) - start) / (self.threshold_pct - start), 0.0), 1.0)
+        return self.max_interval - (self.max_interval - self.min_interval) * closeness
@@ -0,0 +1,361 @@
+import logging  # For reporting failed polls
+import multiprocessing as mp  # For the feed and scanner processes
+import queue  # For draining the results queue
+import random  # For the simulated feed
+import time  # For receive timestamps and pacing
+from multiprocessing import shared_memory  # For the quote board
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple  # For type hints
+
+import numpy as np  # For the board arrays
+
+from .monitor import SpreadMonitor  # Cross-venue spreads of one shard
+from .scanner import TriangleScanner, split_symbol  # Triangles of one venue
+from .stream import BookTop  # Best bid/ask of one symbol on one exchange
+
+logger = logging.getLogger(__name__)
+
+# Values kept per (symbol, venue) cell of the board
+BID, ASK, TS = range(3)
+
+
+class BoardSpec(NamedTuple):
+    """What a process needs to attach to a QuoteBoard (small and picklable)."""
+    name: str  # Shared memory block name
+    symbols: Tuple[str, ...]
+    venues: Tuple[str, ...]
+
+
+class ScanResult(NamedTuple):
+    """What one scanner worker found in one pass over its shard."""
+    worker: int
+    spreads: List[Any]  # SpreadOpportunity, best first
+    triangles: List[Tuple[str, Any]]  # (venue, CycleOpportunity)
+    scan_seconds: float
+    torn_reads: int  # Cells this worker has caught mid-write so far
+
+
+class QuoteBoard:
+    """
+    Latest best bid/ask/receive time of every (symbol, venue), in one shared
+    memory block that processes map without copying:
+
+        seq     int64   (symbols, venues)      version of each cell
+        values  float64 (symbols, venues, 3)   bid, ask, time.time() received
+
+    Each venue column has a single writer (its feed process). Writes use a
+    seqlock per cell: the version is made odd, the values written, then the
+    version made even again. Readers copy the values between two reads of
+    the versions and re-read any cell that was odd or changed meanwhile, so
+    they never see a bid from one update with the ask of another and never
+    block the writer. Like any seqlock this relies on stores becoming
+    visible in program order, which holds on x86.
+    """
+
+    def __init__(self, spec: BoardSpec, shm: shared_memory.SharedMemory, owner: bool):
+        self.spec = spec
+        self.symbols = list(spec.symbols)
+        self.venues = list(spec.venues)
+        self.symbol_index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.venue_index = {venue: j for j, venue in enumerate(self.venues)}
+        self._shm = shm
+        self._owner = owner
+        shape = (len(self.symbols), len(self.venues))
+        seq_bytes = shape[0] * shape[1] * 8
+        self.seq = np.ndarray(shape, dtype=np.int64, buffer=shm.buf)
+        self.values = np.ndarray(shape + (3,), dtype=np.float64, buffer=shm.buf, offset=seq_bytes)
+        self.torn_reads = 0  # Cells caught mid-write (and read again)
+
+    @classmethod
+    def create(cls, symbols: Sequence[str], venues: Sequence[str]) -> "QuoteBoard":
+        """Allocate a new board with every quote missing (NaN)."""
+        cells = len(symbols) * len(venues)
+        shm = shared_memory.SharedMemory(create=True, size=max(cells * 8 * 4, 1))
+        board = cls(BoardSpec(shm.name, tuple(symbols), tuple(venues)), shm, owner=True)
+        board.seq[:] = 0
+        board.values[:] = np.nan
+        return board
+
+    @classmethod
+    def attach(cls, spec: BoardSpec) -> "QuoteBoard":
+        """Map a board created by another process."""
+        return cls(spec, shared_memory.SharedMemory(name=spec.name), owner=False)
+
+    def write(self, venue: str, rows: np.ndarray, bids: np.ndarray, asks: np.ndarray, received: np.ndarray):
+        """
+        Store quotes of one venue (only its feed may call this).
+        Args:
+            venue: Venue column to write
+            rows: Symbol rows, each at most once
+            bids, asks, received: One value per row
+        """
+        j = self.venue_index[venue]
+        self.seq[rows, j] += 1  # Odd: write in progress
+        self.values[rows, j, BID] = bids
+        self.values[rows, j, ASK] = asks
+        self.values[rows, j, TS] = received
+        self.seq[rows, j] += 1  # Even: cells consistent again
+
+    def write_tops(self, tops: Sequence[BookTop]) -> int:
+        """
+        Store BookTops of a single venue; symbols not on the board are skipped.
+        Returns:
+            Number of quotes stored
+        """
+        latest: Dict[int, BookTop] = {}  # One write per row, the last quote wins
+        venue = None
+        for top in tops:
+            i = self.symbol_index.get(top.symbol)
+            if i is not None:
+                latest[i] = top
+                venue = top.exchange
+        if not latest:
+            return 0
+        rows = np.fromiter(latest, dtype=np.int64, count=len(latest))
+        quotes = list(latest.values())
+        self.write(venue, rows,
+                   np.fromiter((top.bid for top in quotes), dtype=np.float64, count=len(quotes)),
+                   np.fromiter((top.ask for top in quotes), dtype=np.float64, count=len(quotes)),
+                   np.fromiter((top.received_ts for top in quotes), dtype=np.float64, count=len(quotes)))
+        return len(quotes)
+
+    def read(self, start: int = 0, stop: Optional[int] = None, retries: int = 100) -> np.ndarray:
+        """
+        Consistent copy of the rows start:stop (a shard).
+        Args:
+            retries: Re-reads of cells caught mid-write before giving up on them
+        Returns:
+            float64 array (rows, venues, 3) of bid/ask/received; cells still
+            being written after all retries are NaN
+        """
+        seq = self.seq[start:stop]  # Views of the shared block
+        values = self.values[start:stop]
+        before = seq.copy()
+        snapshot = values.copy()
+        torn = (before != seq) | (before & 1 == 1)
+        self.torn_reads += int(torn.sum())
+        for _ in range(retries):
+            if not torn.any():
+                return snapshot
+            time.sleep(0)  # Let a writer that was interrupted mid-write finish
+            i, j = np.nonzero(torn)
+            before = seq[i, j]
+            snapshot[i, j] = values[i, j]
+            still = (before != seq[i, j]) | (before & 1 == 1)
+            torn[:] = False
+            torn[i[still], j[still]] = True
+        snapshot[torn] = np.nan
+        return snapshot
+
+    def close(self):
+        """Unmap the board; the creating process also frees it."""
+        # The arrays point into the mapping, so they must go first
+        self.seq = self.values = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+class SimulatedFeed:
+    """
+    Offline stand-in for an exchange: random-walk bid/asks for every symbol,
+    the same walk on every venue (same seed), shifted by skew_pct on this
+    one. Lets the sharded scanner run and be tested without a network.
+    """
+
+    def __init__(self, venue: str, symbols: Sequence[str], skew_pct: float = 0.0, spread_pct: float = 0.02,
+                 volatility_pct: float = 0.05, seed: int = 0, prices: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            venue: Exchange name written on the quotes
+            symbols: Symbols to quote
+            skew_pct: Shift of this venue's prices against the others
+            spread_pct: Ask minus bid, in percent of the mid
+            volatility_pct: Standard deviation of each step of the walk
+            seed: Same seed on every venue = the same walk
+            prices: Starting mid per symbol (default: 100-700)
+        """
+        self.venue = venue
+        self.symbols = list(symbols)
+        self.skew = 1 + skew_pct / 100
+        self.half_spread = spread_pct / 200
+        self.volatility = volatility_pct / 100
+        self._rng = random.Random(seed)
+        prices = prices or {}
+        self.mids = [prices.get(symbol, 100.0 * (1 + i % 7)) for i, symbol in enumerate(self.symbols)]
+
+    def poll(self) -> List[BookTop]:
+        now = time.time()
+        tops = []
+        for i, symbol in enumerate(self.symbols):
+            self.mids[i] *= 1 + self._rng.gauss(0, self.volatility)
+            mid = self.mids[i] * self.skew
+            tops.append(BookTop(self.venue, symbol, mid * (1 - self.half_spread), 1.0,
+                                mid * (1 + self.half_spread), 1.0, now))
+        return tops
+
+
+class AdapterFeed:
+    """Live quotes of one venue through its ExchangeAdapter (see exchanges.py)."""
+
+    def __init__(self, venue: str):
+        from .data_fetcher import DataFetcher
+        from .exchanges import make_adapters
+
+        self.adapter = make_adapters([venue])[0]
+        self.fetcher = DataFetcher()  # Made inside the feed process, with its own rate limits
+
+    def poll(self) -> List[BookTop]:
+        return self.adapter.fetch(self.fetcher)
+
+
+def _feed_main(spec: BoardSpec, venue: str, make_feed: Callable[[], Any], stop, interval: float):
+    """Feed process: poll one venue and write it to the board until stopped."""
+    board = QuoteBoard.attach(spec)
+    feed = make_feed()
+    try:
+        while not stop.is_set():
+            started = time.monotonic()
+            try:
+                board.write_tops(feed.poll())
+            except Exception as e:
+                # The venue's last quotes stay on the board; they go stale and are ignored
+                logger.warning(f"Error polling {venue}: {e}")
+            stop.wait(max(0.0, interval - (time.monotonic() - started)))
+    finally:
+        board.close()
+
+
+def _scanner_main(spec: BoardSpec, worker: int, shard: Tuple[int, int], triangle_venues: Sequence[str],
+                  settings: Dict[str, Any], results, stop):
+    """Scanner process: evaluate the spreads of one shard (and triangles of some venues) each interval."""
+    board = QuoteBoard.attach(spec)
+    start, end = shard
+    monitor = SpreadMonitor(board.symbols[start:end], board.venues, settings["threshold_pct"],
+                            settings["fees"], settings["max_age"])
+    triangles = {}
+    if settings["triangle_min_profit_pct"] is not None:
+        pairs = {symbol: split_symbol(symbol) for symbol in board.symbols}
+        pairs = {symbol: pair for symbol, pair in pairs.items() if pair is not None}
+        triangles = {venue: TriangleScanner(pairs, min_profit_pct=settings["triangle_min_profit_pct"])
+                     for venue in triangle_venues}
+    try:
+        while not stop.is_set():
+            started = time.perf_counter()
+            now = time.time()
+            shard_values = board.read(start, end)
+            monitor.bids[:] = shard_values[:, :, BID]
+            monitor.asks[:] = shard_values[:, :, ASK]
+            monitor.received[:] = np.nan_to_num(shard_values[:, :, TS], nan=0.0)
+            spreads = monitor.scan(now)
+
+            cycles = []
+            if triangles:
+                everything = board.read()
+                fresh = (now - everything[:, :, TS]) <= settings["max_age"]
+                mids = np.where(fresh, (everything[:, :, BID] + everything[:, :, ASK]) / 2, np.nan)
+                for venue, scanner in triangles.items():
+                    column = mids[:, board.venue_index[venue]]
+                    scanner.update({board.symbols[i]: float(column[i]) for i in np.flatnonzero(column > 0)})
+                    cycles.extend((venue, cycle) for cycle in scanner.opportunities())
+            results.put(ScanResult(worker, spreads, cycles, time.perf_counter() - started, board.torn_reads))
+            stop.wait(max(0.0, settings["interval"] - (time.perf_counter() - started)))
+    finally:
+        board.close()
+
+
+def shard_bounds(count: int, shards: int) -> List[Tuple[int, int]]:
+    """Split rows 0..count into `shards` contiguous, near-equal (start, stop) ranges."""
+    shards = max(1, min(shards, count)) if count else 1
+    edges = np.linspace(0, count, shards + 1).round().astype(int)
+    return [(int(edges[k]), int(edges[k + 1])) for k in range(shards)]
+
+
+class ShardedScanner:
+    """
+    Live cross-venue scanner spread over processes:
+      - one feed process per venue writes its quotes to a shared QuoteBoard
+      - `workers` scanner processes each evaluate a contiguous shard of the
+        symbols against every venue (and the triangles of some venues),
+        reading the board in place, and send ScanResults back on a queue
+    Use as a context manager, or call start() and stop().
+    """
+
+    def __init__(self, symbols: Sequence[str], feeds: Dict[str, Callable[[], Any]], workers: int = 2,
+                 threshold_pct: float = 0.3, fees: Optional[Dict[str, float]] = None, max_age: float = 3.0,
+                 feed_interval: float = 0.5, scan_interval: float = 0.5,
+                 triangle_min_profit_pct: Optional[float] = None):
+        """
+        Args:
+            symbols: Normalized symbols to watch
+            feeds: Venue -> picklable zero-argument factory of an object with
+                   poll() -> List[BookTop], called inside the feed process, e.g.
+                   functools.partial(SimulatedFeed, "binance", symbols) or
+                   functools.partial(AdapterFeed, "binance")
+            workers: Scanner processes
+            threshold_pct, fees, max_age: As for SpreadMonitor
+            feed_interval, scan_interval: Seconds between polls / scans
+            triangle_min_profit_pct: Also scan each venue's triangles above this profit (None = off)
+        """
+        self.symbols = list(symbols)
+        self.feeds = dict(feeds)
+        self.workers = workers
+        self.settings = {
+            "threshold_pct": threshold_pct,
+            "fees": fees or {},
+            "max_age": max_age,
+            "interval": scan_interval,
+            "triangle_min_profit_pct": triangle_min_profit_pct,
+        }
+        self.feed_interval = feed_interval
+        self.board: Optional[QuoteBoard] = None
+        self._processes: List[Any] = []
+
+    def start(self) -> "ShardedScanner":
+        ctx = mp.get_context()
+        venues = list(self.feeds)
+        self.board = QuoteBoard.create(self.symbols, venues)
+        self._stop = ctx.Event()
+        self.results = ctx.Queue()
+        for venue, make_feed in self.feeds.items():
+            self._processes.append(ctx.Process(target=_feed_main, name=f"feed-{venue}", daemon=True,
+                                               args=(self.board.spec, venue, make_feed, self._stop, self.feed_interval)))
+        shards = shard_bounds(len(self.symbols), self.workers)
+        for worker, shard in enumerate(shards):
+            triangle_venues = venues[worker::len(shards)]  # Each venue's triangles go to one worker
+            self._processes.append(ctx.Process(target=_scanner_main, name=f"scanner-{worker}", daemon=True,
+                                               args=(self.board.spec, worker, shard, triangle_venues,
+                                                     self.settings, self.results, self._stop)))
+        for process in self._processes:
+            process.start()
+        return self
+
+    def poll_results(self, timeout: float = 1.0) -> Iterator[ScanResult]:
+        """Results sent since the last call, waiting up to timeout for the first one."""
+        try:
+            yield self.results.get(timeout=timeout)
+            while True:
+                yield self.results.get_nowait()
+        except queue.Empty:
+            return
+
+    def stop(self):
+        self._stop.set()
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        # Drop results nobody read, so the queue's feeder thread can exit
+        while True:
+            try:
+                self.results.get_nowait()
+            except queue.Empty:
+                break
+        self.board.close()
+        self.board = None
+
+    def __enter__(self) -> "ShardedScanner":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
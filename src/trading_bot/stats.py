@@ -0,0 +1,187 @@
+import math  # For square roots
+from typing import Any, Dict, Optional  # For type hints
+
+# Imports only the standard library so the live runners can keep stats
+# without loading numpy; extend() loads it for whole arrays.
+
+
+class OnlineStats:
+    """
+    Performance statistics kept up to date one tick at a time, without
+    storing the equity curve. Each update is O(1):
+      - running peak, max drawdown and the longest time spent below a peak
+      - mean and variance of per-tick returns (Welford), for Sharpe, and the
+        downside deviation for Sortino
+      - exposure (share of ticks holding a position)
+    and record_trade adds turnover and the win rate of closing trades
+    (a sell is a win when it beats the average buy price).
+    snapshot() can be called at any time, mid-run included.
+    """
+
+    def __init__(self, initial_equity: float, periods_per_year: Optional[float] = None):
+        """
+        Args:
+            initial_equity: Starting equity; also the first peak
+            periods_per_year: Ticks per year, to annualize Sharpe/Sortino
+                              (e.g. 365 for daily ticks); None = per tick
+        """
+        self.initial_equity = initial_equity
+        self.periods_per_year = periods_per_year
+        self.ticks = 0
+        self.equity = initial_equity  # Latest equity
+        self.peak = initial_equity
+        self.max_drawdown_pct = 0.0
+        self._since_peak = 0  # Ticks since equity was last at its peak
+        self.max_drawdown_ticks = 0
+        self._peak_ts: Optional[int] = None  # Time of the last peak (ns)
+        self.max_drawdown_ns = 0
+        # Welford accumulators of the per-tick returns
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._downside_sq = 0.0  # Sum of squared negative returns
+        self._exposed_ticks = 0
+        # Trades
+        self.trades = 0
+        self.traded_notional = 0.0
+        self.wins = 0
+        self.closed_trades = 0
+        self._held = 0.0  # Units bought and not sold yet
+        self._held_cost = 0.0  # What they cost
+
+    def update(self, equity: float, positions: float = 0.0, timestamp_ns: Optional[int] = None):
+        """
+        Add one tick.
+        Args:
+            equity: Account value at this tick
+            positions: Units held (for exposure)
+            timestamp_ns: Tick time, to measure drawdown duration in time too
+        """
+        previous = self.equity
+        ret = equity / previous - 1 if previous > 0 else 0.0
+        self.ticks += 1
+        delta = ret - self._mean
+        self._mean += delta / self.ticks
+        self._m2 += delta * (ret - self._mean)
+        if ret < 0:
+            self._downside_sq += ret * ret
+        if positions:
+            self._exposed_ticks += 1
+        self.equity = equity
+
+        if self._peak_ts is None:
+            self._peak_ts = timestamp_ns  # Starting equity counts as a peak at the first tick
+        if equity >= self.peak:
+            self.peak = equity
+            self._since_peak = 0
+            self._peak_ts = timestamp_ns
+        else:
+            self._since_peak += 1
+            if self._since_peak > self.max_drawdown_ticks:
+                self.max_drawdown_ticks = self._since_peak
+            if timestamp_ns is not None and self._peak_ts is not None:
+                self.max_drawdown_ns = max(self.max_drawdown_ns, timestamp_ns - self._peak_ts)
+            drawdown = (self.peak - equity) / self.peak * 100  # Same formula as max_drawdown_pct
+            if drawdown > self.max_drawdown_pct:
+                self.max_drawdown_pct = drawdown
+
+    def extend(self, equity, positions=None, timestamps_ns=None):
+        """
+        Add many ticks at once from arrays; gives the same statistics as
+        calling update() for each of them.
+        """
+        import numpy as np  # Only backtests pass whole arrays
+
+        equity = np.asarray(equity, dtype=np.float64)
+        count = len(equity)
+        if count == 0:
+            return
+        index = np.arange(count)
+
+        # Returns, merged into the running mean/variance (Chan et al.)
+        previous = np.concatenate(([self.equity], equity[:-1]))
+        returns = np.divide(equity, previous, out=np.ones(count), where=previous > 0) - 1
+        batch_mean = float(returns.mean())
+        batch_m2 = float(((returns - batch_mean) ** 2).sum())
+        total = self.ticks + count
+        delta = batch_mean - self._mean
+        self._mean += delta * count / total
+        self._m2 += batch_m2 + delta * delta * self.ticks * count / total
+        self._downside_sq += float((np.minimum(returns, 0) ** 2).sum())
+        if positions is not None:
+            self._exposed_ticks += int(np.count_nonzero(positions))
+
+        # Drawdown against the peak carried in from earlier ticks
+        peaks = np.maximum.accumulate(np.maximum(equity, self.peak))
+        drawdown = (peaks - equity) / peaks * 100
+        self.max_drawdown_pct = max(self.max_drawdown_pct, float(drawdown.max()))
+        at_peak = equity >= peaks
+        last_peak = np.maximum.accumulate(np.where(at_peak, index, -1))  # -1: no peak yet in this batch
+        since_peak = np.where(last_peak >= 0, index - last_peak, self._since_peak + index + 1)
+        self.max_drawdown_ticks = max(self.max_drawdown_ticks, int(since_peak.max()))
+        if timestamps_ns is not None:
+            timestamps_ns = np.asarray(timestamps_ns, dtype=np.int64)
+            carried = timestamps_ns[0] if self._peak_ts is None else self._peak_ts
+            peak_ts = np.where(last_peak >= 0, timestamps_ns[np.maximum(last_peak, 0)], carried)
+            self.max_drawdown_ns = max(self.max_drawdown_ns, int((timestamps_ns - peak_ts).max()))
+            self._peak_ts = int(peak_ts[-1])
+
+        self.ticks = total
+        self.equity = float(equity[-1])
+        self.peak = float(peaks[-1])
+        self._since_peak = int(since_peak[-1])
+
+    def record_trade(self, side: str, qty: float, price: float):
+        """Add one executed buy or sell (for turnover and the win rate)."""
+        self.trades += 1
+        self.traded_notional += qty * price
+        if side == "buy":
+            self._held += qty
+            self._held_cost += qty * price
+        elif side == "sell" and self._held > 0:
+            closed = min(qty, self._held)
+            average_cost = self._held_cost / self._held
+            self.closed_trades += 1
+            if price > average_cost:
+                self.wins += 1
+            self._held -= closed
+            self._held_cost -= closed * average_cost
+
+    @property
+    def volatility(self) -> float:
+        """Standard deviation of the per-tick returns."""
+        return math.sqrt(self._m2 / (self.ticks - 1)) if self.ticks > 1 else 0.0
+
+    @property
+    def sharpe(self) -> float:
+        volatility = self.volatility
+        if volatility == 0:
+            return 0.0
+        return self._mean / volatility * self._annualize()
+
+    @property
+    def sortino(self) -> float:
+        downside = math.sqrt(self._downside_sq / self.ticks) if self.ticks else 0.0
+        if downside == 0:
+            return 0.0
+        return self._mean / downside * self._annualize()
+
+    def _annualize(self) -> float:
+        return math.sqrt(self.periods_per_year) if self.periods_per_year else 1.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current statistics as a dictionary (cheap; fine to call every tick)."""
+        return {
+            "ticks": self.ticks,
+            "equity": self.equity,
+            "total_return_pct": (self.equity - self.initial_equity) / self.initial_equity * 100,
+            "peak_equity": self.peak,
+            "max_drawdown_pct": self.max_drawdown_pct,
+            "max_drawdown_ticks": self.max_drawdown_ticks,
+            "max_drawdown_seconds": self.max_drawdown_ns / 1e9,
+            "sharpe": self.sharpe,
+            "sortino": self.sortino,
+            "volatility": self.volatility,
+            "exposure_pct": self._exposed_ticks / self.ticks * 100 if self.ticks else 0.0,
+            "turnover": self.traded_notional / self.initial_equity,
+            "win_rate_pct": self.wins / self.closed_trades * 100 if self.closed_trades else 0.0,
+        }
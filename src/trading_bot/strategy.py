@@ -1,60 +1,156 @@
+import logging  # For console output that can go through a background queue
+import time  # For quote ages
 from datetime import datetime, timezone  # Import datetime for timestamps
+from typing import Optional  # Import typing for type hints
 from .data_fetcher import DataFetcher  # Import our data fetcher
+from .metrics import NULL_METRICS  # Default no-op instrumentation
+from .models import Side, Signal  # Typed signals (still readable as dicts)
+
+logger = logging.getLogger(__name__)
 
 # Define the Strategy class, which will contain your trading logic
 class ArbitrageStrategy:
-    def __init__(self, min_spread_pct: float = 0.5):
+    def __init__(self, min_spread_pct: float = 0.5, data_fetcher: Optional[DataFetcher] = None, metrics=None,
+                 quote_source=None):
         """
         Initialize the arbitrage strategy.
         Args:
             min_spread_pct: Minimum spread percentage to trigger a trade (default 0.5%)
+            data_fetcher: Fetcher to reuse (and its open connections); a new one is made if None
+            metrics: Metrics registry for tick/spread timings and quote ages (default: no-op)
+            quote_source: Where on_tick gets quotes from, e.g. a ReplayQuoteSource
+                          (default: the data fetcher, i.e. live prices)
         """
-        self.data_fetcher = DataFetcher()  # Create data fetcher instance
+        self._data_fetcher = data_fetcher  # Created on first use when not given
+        self._quote_source = quote_source
         self.min_spread_pct = min_spread_pct  # Minimum spread to trade
         self.last_trade_time = None  # Track last trade to avoid spam
+        self.last_quotes = (None, None)  # Binance and Kraken quotes seen on the last tick
+        self.metrics = metrics or NULL_METRICS
         
+    @property
+    def data_fetcher(self) -> DataFetcher:
+        # Streaming and replay runs never poll, so they never open HTTP sessions
+        if self._data_fetcher is None:
+            self._data_fetcher = DataFetcher(metrics=self.metrics)
+        return self._data_fetcher
+
+    @property
+    def quote_source(self):
+        return self._quote_source if self._quote_source is not None else self.data_fetcher
+
+    def get_state(self):
+        """
+        What a checkpoint saves of this strategy (see checkpoint.py): the
+        settings and trade history, not the fetcher, quote source or metrics.
+        """
+        return {"min_spread_pct": self.min_spread_pct, "last_trade_time": self.last_trade_time}
+
+    def set_state(self, state):
+        """Restore what get_state returned."""
+        self.min_spread_pct = state["min_spread_pct"]
+        self.last_trade_time = state["last_trade_time"]
+
     def on_tick(self, data):
         """
         This method is called on every new tick (row of data).
-        For arbitrage, we'll fetch live prices and check for opportunities.
+        Ticks that carry 'binance_price' and 'kraken_price' (backtest rows) are
+        checked as they are; otherwise quotes come from the quote source.
         Args:
             data: Dictionary with tick data (e.g., price, timestamp, etc.)
         Returns:
             A signal dictionary (e.g., {"side": "buy", "qty": 1}) or None for no action
         """
-        # Get current prices from both exchanges
-        binance_price, kraken_price = self.data_fetcher.get_both_prices()
-        
-        # If we can't get prices from both exchanges, skip this tick
-        if not binance_price or not kraken_price:
-            print("⚠️  Could not fetch prices from both exchanges")
+        if "binance_price" in data and "kraken_price" in data:
+            return self.check_prices(data["binance_price"], data["kraken_price"])
+        with self.metrics.timer("strategy_on_tick_seconds"):
+            # Get current prices from both exchanges (requested at the same time)
+            self.last_quotes = self.quote_source.get_both_quotes()
+            binance_quote, kraken_quote = self.last_quotes
+            binance_price = binance_quote.price if binance_quote else None
+            kraken_price = kraken_quote.price if kraken_quote else None
+
+            # If we can't get prices from both exchanges, skip this tick
+            if not binance_price or not kraken_price:
+                logger.warning("⚠️  Could not fetch prices from both exchanges")
+                return None
+
+            if self.metrics.enabled:
+                # How old each price is at the moment the decision is made
+                now = time.time()
+                for quote in self.last_quotes:
+                    self.metrics.observe("quote_age_seconds", now - quote.response_ts, exchange=quote.exchange.label)
+            return self.check_prices(binance_price, kraken_price)
+
+    def on_book_update(self, top, cache):
+        """
+        Callback for a streaming feed: called whenever a best bid/ask changes.
+        Args:
+            top: The BookTop that just changed
+            cache: BookTopCache holding the latest top of every exchange
+        Returns:
+            An arbitrage signal or None, like on_tick
+        """
+        binance_top = cache.get("binance", top.symbol)
+        kraken_top = cache.get("kraken", top.symbol)
+        # Wait until both exchanges have quoted this symbol
+        if binance_top is None or kraken_top is None:
             return None
-        
+        if self.metrics.enabled:
+            now = time.time()
+            for book_top in (binance_top, kraken_top):
+                self.metrics.observe("quote_age_seconds", now - book_top.received_ts, exchange=book_top.exchange)
+        return self.check_prices(binance_top.mid, kraken_top.mid)
+
+    def check_prices(self, binance_price: float, kraken_price: float):
+        """
+        Check one pair of Binance/Kraken prices for an arbitrage opportunity.
+        Args:
+            binance_price: BTC/USDT price on Binance
+            kraken_price: BTC/USDT price on Kraken
+        Returns:
+            An arbitrage Signal (reads like the old signal dict) or None for no action
+        """
         # Calculate the spread between exchanges
-        spread_info = self.data_fetcher.calculate_spread(binance_price, kraken_price)
+        with self.metrics.timer("spread_calc_seconds"):
+            spread_info = DataFetcher.calculate_spread(binance_price, kraken_price)
         
         # Check if spread is large enough to be profitable (after fees)
-        spread_pct = spread_info["spread_pct"]
-        if isinstance(spread_pct, float) and spread_pct >= self.min_spread_pct:
-            print(f"🎯 Arbitrage opportunity found!")
-            print(f"   Spread: {spread_info['spread_pct']:.3f}%")
-            print(f"   Buy on: {spread_info['lower_exchange']} at ${spread_info['lower_price']:,.2f}")
-            print(f"   Sell on: {spread_info['higher_exchange']} at ${spread_info['higher_price']:,.2f}")
+        if spread_info.spread_pct >= self.min_spread_pct:
+            # Skip the formatting entirely when nobody is listening (fast replays)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"🎯 Arbitrage opportunity found!")
+                logger.info(f"   Spread: {spread_info.spread_pct:.3f}%")
+                logger.info(f"   Buy on: {spread_info.lower_exchange.label} at ${spread_info.lower_price:,.2f}")
+                logger.info(f"   Sell on: {spread_info.higher_exchange.label} at ${spread_info.higher_price:,.2f}")
             
             # Return arbitrage signal
-            return {
-                "side": "arbitrage",
-                "buy_exchange": spread_info["lower_exchange"],
-                "sell_exchange": spread_info["higher_exchange"],
-                "buy_price": spread_info["lower_price"],
-                "sell_price": spread_info["higher_price"],
-                "spread_pct": spread_info["spread_pct"],
-                "qty": 1  # Trade 1 BTC
-            }
+            return Signal.arbitrage(spread_info, qty=1)  # Trade 1 BTC
         
         # No profitable opportunity found
         return None
 
+    def scan_spreads(self, binance_prices, kraken_prices):
+        """
+        check_prices for whole arrays of price pairs at once (used for replays).
+        Args:
+            binance_prices, kraken_prices: numpy arrays of the same length
+        Returns:
+            Dictionary of arrays: spread, spread_pct, signal (True where
+            check_prices would return a signal) and buy_binance (True where
+            Binance is the cheaper exchange)
+        """
+        import numpy as np  # Only replays need numpy
+
+        spread = np.abs(binance_prices - kraken_prices)
+        spread_pct = spread / np.minimum(binance_prices, kraken_prices) * 100
+        return {
+            "spread": spread,
+            "spread_pct": spread_pct,
+            "signal": spread_pct >= self.min_spread_pct,
+            "buy_binance": binance_prices < kraken_prices,
+        }
+
 # Keep the old Strategy class for backward compatibility
 class Strategy:
     def on_tick(self, data):
@@ -67,10 +163,39 @@ class Strategy:
         """
         # Example logic: if the price is even, return a buy signal
         if data["price"] % 2 == 0:
-            return {"side": "buy", "qty": 1}  # Buy 1 unit
+            return Signal(Side.BUY, 1)  # Buy 1 unit (equal to {"side": "buy", "qty": 1})
         # Otherwise, do nothing (no trade)
         return None
 
+    def generate_signals(self, data):
+        """
+        Vectorized version of on_tick used by Backtest's "vectorized" mode.
+        Args:
+            data: DataFrame with a 'price' column
+        Returns:
+            Array with one signed quantity per row (1 = buy 1 unit, 0 = no action)
+        """
+        # Same rule as on_tick, applied to the whole price column at once
+        return (data["price"].to_numpy() % 2 == 0).astype("int64")
+
+    @staticmethod
+    def kernel(price, volume, state, out):
+        """
+        Same rule as a loop over float64 arrays, for Backtest's "kernel" mode
+        (compiled with numba when installed, see kernels.py).
+        Args:
+            price, volume: Column arrays
+            state: Values carried between chunks (unused here)
+            out: Filled with one signed quantity per row
+        """
+        for i in range(price.shape[0]):
+            out[i] = 1.0 if price[i] % 2 == 0 else 0.0
+
+    @staticmethod
+    def numpy_kernel(price, volume, state, out):
+        # Whole-array version of kernel, used when numba is not installed
+        out[:] = price % 2 == 0
+
 # If you run this file directly, it will run an example tick
 if __name__ == "__main__":
     strat = Strategy()  # Create a strategy instance
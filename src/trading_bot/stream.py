@@ -0,0 +1,412 @@
+import json  # For parsing stream frames
+import logging  # For stream errors, through the queued console handler
+import socket  # For the local replay server transport
+import socketserver  # For the local replay server
+import threading  # For the background feed and server threads
+import time  # For receive timestamps and replay pacing
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple  # For type hints
+
+logger = logging.getLogger(__name__)
+
+# Public WebSocket endpoints of the book-ticker streams
+BINANCE_STREAM_URL = "wss://stream.binance.com:9443/stream"
+KRAKEN_STREAM_URL = "wss://ws.kraken.com/v2"
+
+
+class BookTop(NamedTuple):
+    """Best bid and ask of one symbol on one exchange."""
+    exchange: str  # e.g. "binance" or "kraken"
+    symbol: str  # Normalized symbol without separators, e.g. "BTCUSDT"
+    bid: float
+    bid_qty: float
+    ask: float
+    ask_qty: float
+    received_ts: float  # time.time() when the frame arrived
+
+    @property
+    def mid(self) -> float:
+        return (self.bid + self.ask) / 2
+
+
+class BookTopCache:
+    """
+    Latest BookTop per (exchange, symbol), shared between feed threads and strategies.
+    Each entry is an immutable tuple that is replaced in a single dict
+    assignment, so readers always see a complete bid/ask pair without taking
+    a lock. Each (exchange, symbol) must have a single writer (its feed).
+    """
+
+    def __init__(self):
+        self._tops: Dict[Tuple[str, str], BookTop] = {}
+
+    def update(self, top: BookTop) -> bool:
+        """
+        Store a new top of book.
+        Returns:
+            True if the bid or ask price/size changed
+        """
+        key = (top.exchange, top.symbol)
+        previous = self._tops.get(key)
+        self._tops[key] = top
+        return previous is None or previous[2:6] != top[2:6]
+
+    def get(self, exchange: str, symbol: str) -> Optional[BookTop]:
+        return self._tops.get((exchange, symbol))
+
+    def snapshot(self) -> Dict[Tuple[str, str], BookTop]:
+        """Copy of every entry, for callers that want a consistent view."""
+        return dict(self._tops)
+
+    def __len__(self) -> int:
+        return len(self._tops)
+
+
+def parse_binance_book_ticker(frame: str, received_ts: Optional[float] = None) -> List[BookTop]:
+    """
+    Parse a Binance bookTicker frame (raw or wrapped by a combined stream).
+    Example: {"stream": "btcusdt@bookTicker", "data": {"s": "BTCUSDT", "b": "1", "B": "2", "a": "3", "A": "4"}}
+    """
+    message = json.loads(frame)
+    data = message.get("data", message)
+    if "s" not in data or "b" not in data:
+        return []  # Subscription replies and other control frames
+    received_ts = time.time() if received_ts is None else received_ts
+    return [BookTop("binance", data["s"], float(data["b"]), float(data["B"]),
+                    float(data["a"]), float(data["A"]), received_ts)]
+
+
+def parse_kraken_ticker(frame: str, received_ts: Optional[float] = None) -> List[BookTop]:
+    """
+    Parse a Kraken v2 ticker frame.
+    Example: {"channel": "ticker", "type": "update", "data": [{"symbol": "BTC/USDT", "bid": 1, "bid_qty": 2, "ask": 3, "ask_qty": 4}]}
+    """
+    message = json.loads(frame)
+    if message.get("channel") != "ticker":
+        return []  # Heartbeats, status and subscription replies
+    received_ts = time.time() if received_ts is None else received_ts
+    return [
+        BookTop("kraken", item["symbol"].replace("/", ""), float(item["bid"]), float(item["bid_qty"]),
+                float(item["ask"]), float(item["ask_qty"]), received_ts)
+        for item in message.get("data", [])
+    ]
+
+
+# Exchange name -> frame parser
+PARSERS: Dict[str, Callable[[str, Optional[float]], List[BookTop]]] = {
+    "binance": parse_binance_book_ticker,
+    "kraken": parse_kraken_ticker,
+}
+
+
+def stream_url(exchange: str, symbols: Iterable[str]) -> str:
+    """URL of the book-ticker stream for the given symbols (e.g. "BTCUSDT")."""
+    if exchange == "binance":
+        streams = "/".join(f"{symbol.lower()}@bookTicker" for symbol in symbols)
+        return f"{BINANCE_STREAM_URL}?streams={streams}"
+    if exchange == "kraken":
+        return KRAKEN_STREAM_URL
+    raise ValueError(f"Unknown exchange: {exchange!r}")
+
+
+def subscribe_messages(exchange: str, symbols: Iterable[str]) -> List[str]:
+    """Messages to send after connecting (Binance subscribes through the URL)."""
+    if exchange == "kraken":
+        # Kraken wants "BTC/USDT"; split off the common quote currencies
+        pairs = []
+        for symbol in symbols:
+            for quote in ("USDT", "USDC", "USD", "EUR", "BTC"):
+                if symbol.endswith(quote) and len(symbol) > len(quote):
+                    pairs.append(f"{symbol[:-len(quote)]}/{quote}")
+                    break
+        return [json.dumps({"method": "subscribe",
+                            "params": {"channel": "ticker", "symbol": pairs, "event_trigger": "bbo"}})]
+    return []
+
+
+class Transport:
+    """
+    Where stream frames come from. Swap in ReplayTransport or
+    LineSocketTransport to run a feed without network access.
+    """
+
+    def connect(self, url: str):
+        raise NotImplementedError
+
+    def send(self, message: str):
+        raise NotImplementedError
+
+    def recv(self) -> Optional[str]:
+        """
+        Next frame, or None once a recording has ended. Live connections
+        raise instead when the server goes away, so the feed reconnects.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class WebSocketTransport(Transport):
+    """
+    Real WebSocket connection (needs the optional websocket-client package).
+    """
+
+    def __init__(self, timeout: float = 10):
+        self.timeout = timeout
+        self._ws = None
+
+    def connect(self, url: str):
+        try:
+            import websocket  # Optional dependency: pip install websocket-client
+        except ImportError as e:
+            raise ImportError("WebSocketTransport needs the websocket-client package") from e
+        self._ws = websocket.create_connection(url, timeout=self.timeout)
+
+    def send(self, message: str):
+        self._ws.send(message)
+
+    def recv(self) -> Optional[str]:
+        frame = self._ws.recv()
+        if not frame:
+            # An empty read means the server closed the socket: a live stream never ends
+            raise ConnectionError("connection closed by the server")
+        return frame
+
+    def close(self):
+        if self._ws is not None:
+            self._ws.close()
+            self._ws = None
+
+
+class ReplayTransport(Transport):
+    """
+    Plays back recorded frames in-process.
+    """
+
+    def __init__(self, frames: Iterable[Tuple[float, str]], speed: float = 0):
+        """
+        Args:
+            frames: (seconds since start of recording, frame) pairs
+            speed: 1 replays at recorded pace, 10 ten times faster, 0 as fast as possible
+        """
+        self.frames = frames
+        self.speed = speed
+        self._iterator = None
+        self._start = 0.0
+
+    def connect(self, url: str):
+        self._iterator = iter(self.frames)
+        self._start = time.monotonic()
+
+    def send(self, message: str):
+        pass  # Subscriptions are meaningless for a recording
+
+    def recv(self) -> Optional[str]:
+        for offset, frame in self._iterator:
+            if self.speed > 0:
+                delay = self._start + offset / self.speed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            return frame
+        return None
+
+
+class LineSocketTransport(Transport):
+    """
+    Reads newline-delimited frames from a TCP socket, e.g. a ReplayServer.
+    The URL looks like "tcp://127.0.0.1:9000".
+    """
+
+    def __init__(self, timeout: float = 10):
+        self.timeout = timeout
+        self._socket = None
+        self._reader = None
+
+    def connect(self, url: str):
+        host, port = url.replace("tcp://", "").rsplit(":", 1)
+        self._socket = socket.create_connection((host, int(port)), timeout=self.timeout)
+        self._reader = self._socket.makefile("r", encoding="utf-8")
+
+    def send(self, message: str):
+        self._socket.sendall(message.encode() + b"\n")
+
+    def recv(self) -> Optional[str]:
+        line = self._reader.readline()
+        return line.rstrip("\n") if line else None
+
+    def close(self):
+        if self._socket is not None:
+            self._reader.close()
+            self._socket.close()
+            self._socket = None
+
+
+class RecordingTransport(Transport):
+    """
+    Wraps another transport and appends every frame it receives to a file,
+    in the format read by load_recording.
+    """
+
+    def __init__(self, inner: Transport, path: str):
+        self.inner = inner
+        self.path = path
+        self._file = None
+        self._start = 0.0
+
+    def connect(self, url: str):
+        self.inner.connect(url)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._start = time.monotonic()
+
+    def send(self, message: str):
+        self.inner.send(message)
+
+    def recv(self) -> Optional[str]:
+        frame = self.inner.recv()
+        if frame is not None:
+            self._file.write(json.dumps({"t": time.monotonic() - self._start, "frame": frame}) + "\n")
+        return frame
+
+    def close(self):
+        self.inner.close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def load_recording(path: str) -> List[Tuple[float, str]]:
+    """Read frames written by RecordingTransport as (offset seconds, frame) pairs."""
+    frames = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                frames.append((record["t"], record["frame"]))
+    return frames
+
+
+class ReplayServer:
+    """
+    Local TCP server that plays recorded frames to every client that connects,
+    one frame per line. Pair it with LineSocketTransport to test feeds and
+    strategies end to end without touching an exchange.
+    """
+
+    def __init__(self, frames: List[Tuple[float, str]], speed: float = 0, host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            frames: (seconds since start of recording, frame) pairs
+            speed: 1 replays at recorded pace, 0 as fast as possible
+            host, port: Where to listen (port 0 picks a free port)
+        """
+        replay_frames, replay_speed = frames, speed
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                transport = ReplayTransport(replay_frames, replay_speed)
+                transport.connect("")
+                while (frame := transport.recv()) is not None:
+                    self.wfile.write(frame.encode() + b"\n")
+
+        self._server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"tcp://{host}:{port}"
+
+    def start(self) -> "ReplayServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class MarketDataFeed:
+    """
+    Background thread that reads one exchange's book-ticker stream into a
+    BookTopCache and calls back on every change.
+    """
+
+    def __init__(self, exchange: str, symbols: Iterable[str], cache: BookTopCache,
+                 on_change: Optional[Callable[[BookTop], None]] = None,
+                 transport: Optional[Transport] = None, url: Optional[str] = None,
+                 reconnect_delay: float = 1.0):
+        """
+        Args:
+            exchange: "binance" or "kraken"
+            symbols: Normalized symbols to follow, e.g. ["BTCUSDT"]
+            cache: Cache that receives every update
+            on_change: Called with the new BookTop whenever bid/ask changes
+            transport: Frame source (default: a real WebSocket connection)
+            url: Override the stream URL (e.g. a ReplayServer url)
+            reconnect_delay: Seconds to wait before reconnecting after an error
+        """
+        self.exchange = exchange
+        self.symbols = list(symbols)
+        self.cache = cache
+        self.on_change = on_change
+        self.transport = transport or WebSocketTransport()
+        self.url = url or stream_url(exchange, self.symbols)
+        self.reconnect_delay = reconnect_delay
+        self.updates = 0  # Number of changed tops received
+        self._parse = PARSERS[exchange]
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"feed-{exchange}", daemon=True)
+
+    def start(self) -> "MarketDataFeed":
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = 5):
+        self._stop.set()
+        self.transport.close()
+        self._thread.join(timeout)
+
+    def wait(self, timeout: Optional[float] = None):
+        """Block until the stream ends (e.g. a replay runs out of frames)."""
+        self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.transport.connect(self.url)
+                for message in subscribe_messages(self.exchange, self.symbols):
+                    self.transport.send(message)
+                while not self._stop.is_set():
+                    frame = self.transport.recv()
+                    if frame is None:
+                        return  # Recording ended (live transports raise and reconnect instead)
+                    self._handle(frame)
+            except Exception as e:
+                if self._stop.is_set():
+                    return
+                logger.warning(f"Stream error from {self.exchange}: {e}; reconnecting")
+                self.transport.close()
+                self._stop.wait(self.reconnect_delay)
+
+    def _handle(self, frame: str):
+        try:
+            tops = self._parse(frame, time.time())
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Skipping bad frame from {self.exchange}: {e}")
+            return
+        for top in tops:
+            if self.cache.update(top):
+                self.updates += 1
+                if self.on_change is not None:
+                    try:
+                        self.on_change(top)
+                    except Exception as e:
+                        # A failing strategy must not tear down the connection
+                        logger.exception(f"Error in {self.exchange} stream callback: {e}")
@@ -0,0 +1,189 @@
+import hashlib  # For stable keys of parameter grid cells
+import itertools  # For expanding the parameter grid
+import json  # For storing finished cells on disk
+import os  # For file paths
+import shutil  # For removing the temporary column directory
+import tempfile  # For the directory that holds memory-mapped columns
+from concurrent.futures import ProcessPoolExecutor, as_completed  # For running cells in parallel
+from typing import Any, Callable, Dict, Iterable, List, Optional  # For type hints
+
+import numpy as np  # For memory-mapped column arrays
+import pandas as pd  # For the input data and the ranked results table
+
+from .backtest import Backtest  # The backtester run in every grid cell
+from .features import dataset_fingerprint  # Ties saved cells to the data they were run on
+
+# Columns of the summary table, besides the parameters themselves
+RESULT_COLUMNS = ["total_return_pct", "max_drawdown_pct", "total_trades", "final_equity"]
+
+# Data attached once per worker process by _init_worker
+_WORKER_DATA: Optional[pd.DataFrame] = None
+
+
+def share_columns(data: pd.DataFrame, directory: str) -> Dict[str, Any]:
+    """
+    Write every column of data to a .npy file so workers can memory-map it.
+    Datetime columns are stored as int64 nanoseconds.
+    Args:
+        data: DataFrame to share
+        directory: Where to write the column files
+    Returns:
+        Small, picklable description of the shared columns
+    """
+    columns = []
+    for name in data.columns:
+        values = data[name].to_numpy()
+        is_datetime = np.issubdtype(values.dtype, np.datetime64)
+        if is_datetime:
+            values = values.astype("datetime64[ns]").view(np.int64)  # Store as plain int64
+        path = os.path.join(directory, f"column_{len(columns)}.npy")
+        np.save(path, np.ascontiguousarray(values))
+        columns.append({"name": name, "path": path, "datetime": is_datetime})
+    return {"columns": columns}
+
+
+def attach_columns(spec: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Memory-map the columns written by share_columns into a DataFrame.
+    The arrays are read-only maps of the files, so the data is not copied
+    into each worker.
+    """
+    frame = {}
+    for column in spec["columns"]:
+        values = np.load(column["path"], mmap_mode="r")
+        if column["datetime"]:
+            values = values.view("datetime64[ns]")
+        frame[column["name"]] = values
+    return pd.DataFrame(frame, copy=False)
+
+
+def _init_worker(spec: Dict[str, Any], feature_dir: Optional[str] = None):
+    """Attach the shared price data once when a worker process starts."""
+    global _WORKER_DATA
+    _WORKER_DATA = attach_columns(spec)
+    if feature_dir:
+        from .features import configure_shared_store
+
+        # Features computed by one worker are loaded from disk by the others
+        configure_shared_store(spill_dir=feature_dir)
+
+
+def _run_cell(factory: Callable[..., Any], params: Dict[str, Any], initial_capital: float, mode: str) -> Dict[str, Any]:
+    """Run one grid cell inside a worker and return its summary row."""
+    strategy = factory(**params)
+    results = Backtest(initial_capital=initial_capital).run(_WORKER_DATA, strategy, mode=mode)
+    if "error" in results:
+        raise ValueError(f"Backtest failed for {params}: {results['error']}")
+    return {**params, **{column: results[column] for column in RESULT_COLUMNS}}
+
+
+def expand_grid(grid: Dict[str, Iterable[Any]]) -> List[Dict[str, Any]]:
+    """
+    Expand {"a": [1, 2], "b": [3]} into [{"a": 1, "b": 3}, {"a": 2, "b": 3}].
+    """
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(list(grid[name]) for name in names))]
+
+
+def cell_key(factory: Callable[..., Any], params: Dict[str, Any], dataset: str = "",
+             initial_capital: Optional[float] = None, mode: str = "auto") -> str:
+    """
+    Stable key for one grid cell, used as its result file name.
+    Args:
+        factory, params: The strategy and its parameters
+        dataset: dataset_fingerprint of the data, so a sweep over other data
+                 never picks up these results
+        initial_capital, mode: The other Backtest settings the result depends on
+    """
+    factory_name = f"{getattr(factory, '__module__', '')}.{getattr(factory, '__qualname__', repr(factory))}"
+    payload = json.dumps({"factory": factory_name, "params": params, "dataset": dataset,
+                          "initial_capital": initial_capital, "mode": mode}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def rank_results(rows: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Sort sweep rows best-first: highest return, then lowest drawdown, then fewest trades.
+    Ties are broken by the parameter values so the order does not depend on
+    which worker finished first.
+    """
+    table = pd.DataFrame(rows)
+    if table.empty:
+        return table
+    param_columns = [column for column in table.columns if column not in RESULT_COLUMNS]
+    table = table.sort_values(
+        ["total_return_pct", "max_drawdown_pct", "total_trades"] + param_columns,
+        ascending=[False, True, True] + [True] * len(param_columns),
+        kind="mergesort"
+    ).reset_index(drop=True)
+    table.insert(0, "rank", range(1, len(table) + 1))
+    return table
+
+
+def run_sweep(
+    factory: Callable[..., Any],
+    grid: Dict[str, Iterable[Any]],
+    data: pd.DataFrame,
+    initial_capital: float = 10000,
+    max_workers: Optional[int] = None,
+    results_dir: Optional[str] = None,
+    mode: str = "auto",
+    feature_dir: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Run Backtest.run for every cell of a parameter grid over a process pool.
+    Args:
+        factory: Picklable callable (e.g. a strategy class) called as factory(**params)
+        grid: Parameter name -> list of values to try
+        data: DataFrame with columns ['timestamp', 'price', ...]
+        initial_capital: Starting capital for every backtest
+        max_workers: Number of worker processes (default: one per CPU)
+        results_dir: If set, each finished cell is saved here and skipped on
+                     rerun with the same data, capital and mode
+        mode: Backtest mode passed to Backtest.run
+        feature_dir: Spill directory of every worker's shared FeatureStore
+                     (see features.py), so cells share computed features
+    Returns:
+        Ranked DataFrame with one row per cell: rank, parameters, return,
+        drawdown, trade count and final equity
+    """
+    rows = []  # Summary rows of all finished cells
+    pending = []  # Cells that still need a backtest
+    if results_dir:
+        os.makedirs(results_dir, exist_ok=True)
+
+    # Reuse cells finished by an earlier run of the same sweep over the same data
+    fingerprint = dataset_fingerprint(data) if results_dir else ""
+    for params in expand_grid(grid):
+        key = cell_key(factory, params, fingerprint, initial_capital, mode)
+        path = os.path.join(results_dir, f"{key}.json") if results_dir else None
+        if path and os.path.exists(path):
+            with open(path) as f:
+                rows.append(json.load(f))
+        else:
+            pending.append((params, path))
+
+    if pending:
+        # Price data goes to disk once and is memory-mapped by every worker
+        shared_dir = tempfile.mkdtemp(prefix="trading_bot_sweep_")
+        try:
+            spec = share_columns(data, shared_dir)
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                     initargs=(spec, feature_dir)) as pool:
+                futures = {
+                    pool.submit(_run_cell, factory, params, initial_capital, mode): path
+                    for params, path in pending
+                }
+                for future in as_completed(futures):
+                    row = future.result()
+                    rows.append(row)
+                    path = futures[future]
+                    if path:
+                        # Write atomically so an interrupted sweep never leaves half a file
+                        with open(path + ".tmp", "w") as f:
+                            json.dump(row, f, default=str)
+                        os.replace(path + ".tmp", path)
+        finally:
+            shutil.rmtree(shared_dir, ignore_errors=True)
+
+    return rank_results(rows)
@@ -0,0 +1,184 @@
+import argparse  # For the command line interface
+import os  # For CSV paths
+import time  # For measuring throughput
+from typing import Any, Dict, List, Optional, Sequence, Tuple  # For type hints
+
+import numpy as np  # For whole-array spread math
+import pandas as pd  # For the trades table
+
+from .kline_store import DateLike, KlineStore, date_range
+
+# Columns of the trades table
+TRADE_COLUMNS = ["timestamp", "spread_pct", "spread", "direct_price", "implied_price", "direction"]
+
+
+def align_asof(target_times: np.ndarray, times: np.ndarray, values: np.ndarray,
+               tolerance_ms: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    For each target time, take the last value at or before it (a sorted merge-asof).
+    Args:
+        target_times: Sorted times to align to
+        times, values: Sorted times of another series and its values
+        tolerance_ms: How stale a matched value may be (0 = exact time match only)
+    Returns:
+        (aligned values, mask of targets that found a fresh enough value)
+    """
+    if len(times) == 0:
+        return np.full(len(target_times), np.nan), np.zeros(len(target_times), dtype=bool)
+    index = np.searchsorted(times, target_times, side="right") - 1
+    found = index >= 0
+    index = np.maximum(index, 0)
+    found &= (target_times - times[index]) <= tolerance_ms
+    return values[index], found
+
+
+def scan_triangle(times: np.ndarray, direct: np.ndarray, cross: np.ndarray, bridge: np.ndarray,
+                  threshold_pct: float) -> Dict[str, np.ndarray]:
+    """
+    Compute the triangle spread for aligned price arrays and keep the rows above threshold.
+    The implied direct price is cross * bridge (e.g. SOL/BTC * BTC/USDT = implied SOL/USDT).
+    Returns:
+        Column arrays of the rows whose absolute spread exceeds threshold_pct
+    """
+    implied = cross * bridge
+    spread = implied - direct
+    spread_pct = spread / direct * 100
+    hits = np.abs(spread_pct) > threshold_pct
+    return {
+        "timestamp": times[hits],
+        "spread_pct": np.abs(spread_pct[hits]),
+        "spread": np.abs(spread[hits]),
+        "direct_price": direct[hits],
+        "implied_price": implied[hits],
+        "forward": spread[hits] > 0,  # Buy direct, sell cross, sell bridge
+    }
+
+
+def ensure_days(store: KlineStore, symbols: Sequence[str], interval: str, days: List[str],
+                csv_dir: Optional[str]):
+    """Convert any day CSVs found in csv_dir that are not in the store yet."""
+    if csv_dir is None:
+        return
+    for symbol in symbols:
+        for day in days:
+            path = os.path.join(csv_dir, f"{symbol}-{interval}-{day}.csv")
+            if not store.has(symbol, interval, day) and os.path.exists(path):
+                store.ingest_csv(path, symbol, interval, day)
+
+
+def run_triangular_backtest(store: KlineStore, triangle: Sequence[str], start: DateLike, end: DateLike,
+                            interval: str = "1m", threshold_pct: float = 0.05, tolerance_ms: int = 0,
+                            csv_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Backtest a triangular arbitrage over a date range, one day at a time.
+    Args:
+        store: KlineStore holding the klines
+        triangle: (direct, cross, bridge) symbols, e.g. ("SOLUSDT", "SOLBTC", "BTCUSDT")
+        start, end: First and last day (inclusive)
+        interval: Kline interval, e.g. "1m"
+        threshold_pct: Minimum absolute spread, in percent, to count as a trade
+        tolerance_ms: How stale a cross/bridge price may be when aligned to a
+                      direct close (0 keeps only exactly matching close times)
+        csv_dir: Directory of raw day CSVs to convert on first use
+    Returns:
+        Dictionary with periods checked, the trades DataFrame and throughput
+    """
+    direct_symbol, cross_symbol, bridge_symbol = triangle
+    days = date_range(start, end)
+    ensure_days(store, triangle, interval, days, csv_dir)
+
+    started = time.perf_counter()
+    periods = 0  # Rows where all three legs had a price
+    rows_read = 0
+    chunks = []  # Hit columns of every day
+    carry: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}  # Last row of the previous day per leg
+
+    for day in days:
+        if not all(store.has(symbol, interval, day) for symbol in triangle):
+            continue  # Skip days missing a leg
+        legs = {}
+        for symbol in triangle:
+            data = store.load_day(symbol, interval, day)
+            times, prices = data["close_time"], data["close"]
+            rows_read += len(times)
+            if symbol in carry and symbol != direct_symbol:
+                # Keep the previous day's last close so the first rows of today can match it
+                times = np.concatenate([carry[symbol][0], times])
+                prices = np.concatenate([carry[symbol][1], prices])
+            legs[symbol] = (times, prices)
+            if len(times):
+                carry[symbol] = (times[-1:], prices[-1:])
+
+        times, direct = legs[direct_symbol]
+        cross, cross_found = align_asof(times, *legs[cross_symbol], tolerance_ms)
+        bridge, bridge_found = align_asof(times, *legs[bridge_symbol], tolerance_ms)
+        found = cross_found & bridge_found
+        periods += int(found.sum())
+        chunks.append(scan_triangle(times[found], direct[found], cross[found], bridge[found], threshold_pct))
+
+    elapsed = time.perf_counter() - started
+    if chunks:
+        columns = {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+    else:
+        columns = scan_triangle(*(np.empty(0) for _ in range(4)), threshold_pct)
+    trades = pd.DataFrame({
+        "timestamp": pd.to_datetime(columns["timestamp"], unit="ms"),
+        "spread_pct": columns["spread_pct"],
+        "spread": columns["spread"],
+        "direct_price": columns["direct_price"],
+        "implied_price": columns["implied_price"],
+        "direction": np.where(columns["forward"], "forward", "reverse"),
+    }, columns=TRADE_COLUMNS)
+    return {
+        "triangle": tuple(triangle),
+        "threshold_pct": threshold_pct,
+        "periods": periods,
+        "total_trades": len(trades),
+        "trades": trades,
+        "rows_read": rows_read,
+        "rows_per_sec": rows_read / elapsed if elapsed > 0 else float("inf"),
+    }
+
+
+def print_summary(results: Dict[str, Any], show: int = 5):
+    direct_symbol = results["triangle"][0]
+    print(f"Triangular Arbitrage Backtest {'/'.join(results['triangle'])} (Threshold: {results['threshold_pct']:.2f}%)")
+    print(f"Total periods checked: {results['periods']}")
+    print(f"Number of arbitrage trades: {results['total_trades']}")
+    print(f"Throughput: {results['rows_per_sec']:,.0f} rows/sec")
+    if results["total_trades"]:
+        print(f"First {show} trades:")
+        for t in results["trades"].head(show).itertuples(index=False):
+            print(f"  {t.timestamp} | Spread: {t.spread_pct:.3f}% | Dir: {t.direction} | "
+                  f"{direct_symbol}: {t.direct_price:.2f} | Implied: {t.implied_price:.2f}")
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Vectorized historical triangular arbitrage backtest")
+    parser.add_argument("--triangle", nargs=3, default=["SOLUSDT", "SOLBTC", "BTCUSDT"],
+                        metavar=("DIRECT", "CROSS", "BRIDGE"),
+                        help="Direct pair and the two pairs whose product implies it")
+    parser.add_argument("--start", required=True, help="First day, YYYY-MM-DD")
+    parser.add_argument("--end", help="Last day, YYYY-MM-DD (default: same as --start)")
+    parser.add_argument("--interval", default="1m", help="Kline interval")
+    parser.add_argument("--threshold", type=float, default=0.05, help="Minimum spread in percent")
+    parser.add_argument("--tolerance-ms", type=int, default=0,
+                        help="Max staleness of cross/bridge prices when aligning (0 = exact match)")
+    parser.add_argument("--data-dir", default="data", help="Directory with Binance kline CSVs")
+    parser.add_argument("--store-dir", default="data/klines", help="Columnar store directory")
+    parser.add_argument("--output", help="Write all trades to this CSV")
+    args = parser.parse_args(argv)
+
+    results = run_triangular_backtest(
+        KlineStore(args.store_dir), args.triangle, args.start, args.end or args.start,
+        interval=args.interval, threshold_pct=args.threshold, tolerance_ms=args.tolerance_ms,
+        csv_dir=args.data_dir
+    )
+    print_summary(results)
+    if args.output:
+        results["trades"].to_csv(args.output, index=False)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import sys
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from trading_bot.backtest import Backtest, create_sample_data
+from trading_bot.chunks import frame_chunks, read_csv_chunks, read_equity_file
+from trading_bot.ledger import EquityCurve, TradeLedger
+from trading_bot.sweep import run_sweep
+from trading_bot.strategy import Strategy
+
+
+class ThresholdStrategy:
+    """Buys below one price and sells above another, in both tick and vectorized form."""
+
+    def __init__(self, buy_below=100, sell_above=105):
+        self.buy_below = buy_below
+        self.sell_above = sell_above
+
+    def on_tick(self, data):
+        if data["price"] < self.buy_below:
+            return {"side": "buy", "qty": 2}
+        if data["price"] > self.sell_above:
+            return {"side": "sell", "qty": 1}
+        return None
+
+    def generate_signals(self, data):
+        prices = data["price"].to_numpy()
+        return np.where(prices < self.buy_below, 2, np.where(prices > self.sell_above, -1, 0))
+
+
+def make_data(rows=500):
+    """Random-walk prices rounded to whole numbers so even-price signals fire."""
+    data = create_sample_data(days=rows)
+    rng = np.random.default_rng(7)
+    data["price"] = (100 + np.cumsum(rng.normal(0, 2, rows))).round()
+    return data
+
+
+class TestVectorizedBacktest:
+    def test_vectorized_matches_tick_path(self):
+        """Test that both execution modes give the same trades and statistics."""
+        data = make_data()
+        tick = Backtest(initial_capital=1000).run(data, ThresholdStrategy(), mode="tick")
+        vectorized = Backtest(initial_capital=1000).run(data, ThresholdStrategy(), mode="vectorized")
+        assert tick["total_trades"] > 0
+        assert vectorized["trades"] == tick["trades"]
+        assert vectorized["final_equity"] == tick["final_equity"]
+        assert vectorized["max_drawdown_pct"] == tick["max_drawdown_pct"]
+
+    def test_example_strategy_parity(self):
+        """Test that the example Strategy trades the same in both modes."""
+        data = make_data()
+        tick = Backtest().run(data, Strategy(), mode="tick")
+        vectorized = Backtest().run(data, Strategy(), mode="vectorized")
+        assert tick["total_trades"] > 0
+        assert vectorized["trades"] == tick["trades"]
+        assert vectorized["final_equity"] == tick["final_equity"]
+
+    def test_auto_mode_uses_vectorized_path(self):
+        """Test that auto mode works for strategies with generate_signals."""
+        data = make_data(50)
+        results = Backtest().run(data, ThresholdStrategy())
+        assert isinstance(results["equity_curve"], EquityCurve)
+        assert len(results["equity_curve"]) == len(data)
+
+    def test_nan_signals_are_no_action(self):
+        """Test that NaN signals (features warming up) neither trade nor poison the equity."""
+        class WarmingUp(ThresholdStrategy):
+            def generate_signals(self, data):
+                signals = np.zeros(len(data))
+                signals[[0, 3, 4]] = [5, np.nan, -np.inf]
+                return signals
+
+        results = Backtest().run(make_data(50), WarmingUp(), mode="vectorized")
+        assert results["total_trades"] == 1 and results["trades"][0]["qty"] == 5
+        assert np.isfinite(results["final_equity"])
+        assert np.isfinite(results["equity_curve"].to_frame()["equity"]).all()
+
+    def test_auto_mode_keeps_subclass_on_tick(self):
+        """Test that a Strategy subclass overriding only on_tick is not run with the example's array versions."""
+        class NeverTrades(Strategy):
+            def on_tick(self, data):
+                return None
+
+        class VectorOnly(NeverTrades):
+            def generate_signals(self, data):
+                return np.zeros(len(data))
+
+        data = make_data()
+        assert Backtest().run(data, Strategy())["total_trades"] > 0
+        assert Backtest().run(data, NeverTrades())["total_trades"] == 0
+        assert Backtest._pick_mode(NeverTrades(), "auto") == "tick"
+        assert Backtest._pick_mode(VectorOnly(), "auto") == "vectorized"
+
+
+class TestResultBuffers:
+    def test_trade_ledger_dict_interop(self):
+        """Test that trades still read like the old list of dicts."""
+        data = make_data()
+        results = Backtest(initial_capital=1000).run(data, ThresholdStrategy(), mode="tick")
+        trades = results["trades"]
+        first = trades[0]
+        assert first["side"] == "buy"
+        assert first["cost"] == first["price"] * first["qty"]
+        assert first["timestamp"] in set(data["timestamp"])
+        assert trades[-2:] == trades.to_dicts()[-2:]
+
+    def test_lazy_frame_export(self):
+        """Test that buffers export to DataFrames with readable columns."""
+        data = make_data(100)
+        results = Backtest().run(data, ThresholdStrategy())
+        curve = results["equity_curve"].to_frame()
+        assert list(curve.columns) == ["timestamp", "equity", "price", "positions"]
+        assert (curve["timestamp"] == data["timestamp"]).all()
+        trades = results["trades"].to_frame()
+        assert set(trades["side"]) <= {"buy", "sell"}
+
+    def test_buffers_grow_and_pickle(self):
+        """Test that buffers grow past their capacity and pickle only used rows."""
+        ledger = TradeLedger(capacity=2)
+        for i in range(5):
+            ledger.append(i, "buy" if i % 2 == 0 else "sell", 1.0, 100.0 + i)
+        restored = pickle.loads(pickle.dumps(ledger))
+        assert restored == ledger
+        assert len(restored) == 5
+        assert restored[4]["price"] == 104.0
+
+
+class TestSweep:
+    def test_sweep_ranks_and_resumes(self, tmp_path):
+        """Test that a sweep matches single runs, ranks rows and skips finished cells."""
+        data = make_data(200)
+        grid = {"buy_below": [95, 100], "sell_above": [105, 110]}
+        table = run_sweep(ThresholdStrategy, grid, data, initial_capital=1000,
+                          max_workers=2, results_dir=str(tmp_path))
+        assert len(table) == 4
+        assert list(table["rank"]) == [1, 2, 3, 4]
+        assert table["total_return_pct"].is_monotonic_decreasing
+
+        best = table.iloc[0]
+        single = Backtest(initial_capital=1000).run(
+            data, ThresholdStrategy(best["buy_below"], best["sell_above"]))
+        assert best["final_equity"] == single["final_equity"]
+
+        # A rerun finds every cell on disk and never starts a worker
+        rerun = run_sweep(ThresholdStrategy, grid, data, initial_capital=1000,
+                          max_workers=0, results_dir=str(tmp_path))
+        assert rerun.equals(table)
+
+        # Other capital or other data are new cells, not the saved results
+        richer = run_sweep(ThresholdStrategy, grid, data, initial_capital=2000,
+                           max_workers=2, results_dir=str(tmp_path))
+        assert set(richer["final_equity"]).isdisjoint(table["final_equity"])
+        shifted = data.assign(price=data["price"] + 1)
+        moved = run_sweep(ThresholdStrategy, grid, shifted, initial_capital=1000,
+                          max_workers=2, results_dir=str(tmp_path))
+        assert len(os.listdir(tmp_path)) == 12 and not moved.equals(table)
+
+
+class TestStreamingBacktest:
+    def test_chunks_match_single_run(self, tmp_path):
+        """Test that a chunked run carries cash/positions over and matches run() exactly."""
+        data = make_data()
+        for mode in ("tick", "vectorized"):
+            whole = Backtest(initial_capital=1000).run(data, ThresholdStrategy(), mode=mode)
+            path = str(tmp_path / f"{mode}.bin")
+            streamed = Backtest(initial_capital=1000).run_stream(
+                frame_chunks(data, 64), ThresholdStrategy(), mode=mode, equity_path=path, keep_every=10)
+            assert streamed["trades"] == whole["trades"]
+            assert streamed["final_equity"] == whole["final_equity"]
+            assert streamed["max_drawdown_pct"] == whole["max_drawdown_pct"]
+            # Every row on disk, every 10th in memory
+            on_disk = read_equity_file(path)
+            assert np.array_equal(on_disk["equity"], whole["equity_curve"].column("equity"))
+            assert np.array_equal(streamed["equity_curve"].column("equity"),
+                                  whole["equity_curve"].column("equity")[::10])
+
+    def test_csv_chunks(self, tmp_path):
+        """Test that a CSV read in chunks backtests like the loaded frame."""
+        data = make_data(200)
+        path = tmp_path / "prices.csv"
+        data.to_csv(path, index=False)
+        whole = Backtest(initial_capital=1000).run(data, ThresholdStrategy())
+        streamed = Backtest(initial_capital=1000).run_stream(read_csv_chunks(str(path), chunksize=30),
+                                                             ThresholdStrategy(), keep_every=0)
+        assert streamed["final_equity"] == whole["final_equity"]
+        assert len(streamed["equity_curve"]) == 0
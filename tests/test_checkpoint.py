@@ -0,0 +1,94 @@
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from trading_bot.backtest import Backtest
+from trading_bot.checkpoint import load_checkpoint, save_checkpoint
+from trading_bot.chunks import frame_chunks, read_equity_file
+from test_backtest import ThresholdStrategy, make_data
+from test_kernels import DipBuyer
+
+
+class Crash(Exception):
+    pass
+
+
+def crash_after(chunks, count):
+    """Yield `count` chunks, then fail like a killed process."""
+    for number, chunk in enumerate(chunks):
+        if number == count:
+            raise Crash()
+        yield chunk
+
+
+class TestCheckpoint:
+    def test_incremental_runs_match_whole_run(self, tmp_path):
+        """Test that a run resumed from a checkpoint on overlapping new data matches one whole run."""
+        data = make_data()
+        path = str(tmp_path / "state.ckpt")
+        for mode, make_strategy in (("kernel", DipBuyer), ("tick", DipBuyer), ("vectorized", ThresholdStrategy)):
+            whole = Backtest(initial_capital=1000).run(data, make_strategy(), mode=mode)
+
+            first = Backtest(initial_capital=1000)
+            strategy = make_strategy()
+            first.run(data.iloc[:300], strategy, mode=mode)
+            save_checkpoint(path, first, strategy)
+
+            # A fresh process: new objects, state from the file, the next "day" overlapping the last one
+            resumed = Backtest(initial_capital=1000)
+            strategy = make_strategy()
+            load_checkpoint(path, resumed, strategy)
+            result = resumed.run(data.iloc[250:], strategy, mode=mode, resume=True)
+
+            assert whole["total_trades"] > 0
+            assert result["trades"] == whole["trades"]
+            assert result["equity_curve"] == whole["equity_curve"]
+            assert result["final_equity"] == whole["final_equity"]
+            assert result["max_drawdown_pct"] == whole["max_drawdown_pct"]
+            assert result["sharpe"] == pytest.approx(whole["sharpe"])
+
+    def test_stream_resumes_after_crash(self, tmp_path):
+        """Test that run_stream checkpoints let a crashed run finish with the same equity file."""
+        data = make_data()
+        path = str(tmp_path / "state.ckpt")
+        whole_file = str(tmp_path / "whole.bin")
+        whole = Backtest(initial_capital=1000).run_stream(frame_chunks(data, 50), DipBuyer(), equity_path=whole_file)
+
+        equity_file = str(tmp_path / "equity.bin")
+        crashed = Backtest(initial_capital=1000)
+        with pytest.raises(Crash):
+            # Checkpoints after chunks 2 and 4; chunk 5 is written to the file but lost with the crash
+            crashed.run_stream(crash_after(frame_chunks(data, 50), 5), DipBuyer(), equity_path=equity_file,
+                               checkpoint_path=path, checkpoint_every=2)
+
+        resumed = Backtest(initial_capital=1000)
+        strategy = DipBuyer()
+        load_checkpoint(path, resumed, strategy)
+        assert resumed.stats.ticks == 200
+        result = resumed.run_stream(frame_chunks(data, 50), strategy, equity_path=equity_file, resume=True)
+        assert result["trades"] == whole["trades"]
+        assert result["equity_curve"] == whole["equity_curve"]
+        assert np.array_equal(read_equity_file(equity_file), read_equity_file(whole_file))
+
+    def test_rejects_damaged_files(self, tmp_path):
+        """Test that foreign, damaged and other-version files are refused."""
+        path = tmp_path / "state.ckpt"
+        backtest = Backtest()
+        backtest.run(make_data(50), DipBuyer())
+        save_checkpoint(str(path), backtest)
+        good = path.read_bytes()
+
+        path.write_bytes(good[:-1] + bytes([good[-1] ^ 1]))
+        with pytest.raises(ValueError, match="checksum"):
+            load_checkpoint(str(path))
+        path.write_bytes(good[:4] + b"\x02\x00" + good[6:])
+        with pytest.raises(ValueError, match="version 2"):
+            load_checkpoint(str(path))
+        path.write_bytes(b"not a checkpoint")
+        with pytest.raises(ValueError, match="not a backtest checkpoint"):
+            load_checkpoint(str(path))
@@ -0,0 +1,143 @@
+import sys
+import os
+import json
+import time
+import threading
+
+import requests
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from trading_bot.data_fetcher import DataFetcher
+from trading_bot.metrics import Metrics
+from trading_bot.models import Exchange
+from trading_bot.scheduler import RequestScheduler
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    """Stands in for requests.Session: answers from a price table after a delay."""
+
+    def __init__(self, prices, delay=0.0):
+        self.prices = prices
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        with self.lock:
+            self.calls.append((url, params))
+        time.sleep(self.delay)
+        if "kraken" in url:
+            pair = params["pair"]
+            return FakeResponse({"result": {pair: {"c": [str(self.prices[pair])]}}})
+        symbols = json.loads(params["symbols"]) if params else list(self.prices)
+        return FakeResponse([{"symbol": symbol, "price": str(self.prices[symbol])} for symbol in symbols])
+
+    def close(self):
+        pass
+
+
+PRICES = {"BTCUSDT": 60000.0, "SOLUSDT": 150.0, "SOLBTC": 0.0025, "XBTUSDT": 60100.0}
+
+
+def make_fetcher(delay=0.0, metrics=None):
+    fetcher = DataFetcher(metrics=metrics)
+    fetcher.session = FakeSession(PRICES, delay)
+    return fetcher
+
+
+class TestConcurrentFetching:
+    def test_quotes_carry_timestamps(self):
+        """Test that quotes are stamped with request and response times."""
+        with make_fetcher() as fetcher:
+            binance, kraken = fetcher.get_both_quotes()
+        assert binance.price == 60000.0 and binance.exchange is Exchange.BINANCE
+        assert kraken.price == 60100.0 and kraken.exchange.label == "kraken"
+        assert binance.request_ts <= binance.response_ts
+
+    def test_triangle_is_one_batch_reused_while_fresh(self):
+        """Test that the three legs cost one round trip, reused until the snapshot goes stale."""
+        with make_fetcher(delay=0.2) as fetcher:
+            fetcher.snapshot_ttl = 0.5
+            start = time.perf_counter()
+            assert fetcher.get_sol_triangular_prices() == (60000.0, 150.0, 0.0025)
+            assert time.perf_counter() - start < 0.4
+            assert len(fetcher.session.calls) == 1
+            # Inside the TTL the snapshot answers without a request
+            start = time.perf_counter()
+            assert fetcher.get_sol_triangular_prices() == (60000.0, 150.0, 0.0025)
+            assert time.perf_counter() - start < 0.1
+            assert len(fetcher.session.calls) == 1
+            # Once it is older than the TTL, the next check asks the exchange again
+            time.sleep(0.5)
+            fetcher.get_sol_triangular_prices()
+            assert len(fetcher.session.calls) == 2
+
+
+class TestBatchQuotes:
+    def test_triangle_uses_one_request(self):
+        """Test that all triangle legs come from a single batch request."""
+        with make_fetcher() as fetcher:
+            fetcher.get_sol_triangular_prices()
+            assert len(fetcher.session.calls) == 1
+            assert json.loads(fetcher.session.calls[0][1]["symbols"]) == ["BTCUSDT", "SOLBTC", "SOLUSDT"]
+
+    def test_snapshot_cache_serves_fresh_symbols(self):
+        """Test that repeated requests inside the staleness window reuse the snapshot."""
+        with make_fetcher() as fetcher:
+            fetcher.get_binance_prices(["BTCUSDT", "SOLUSDT", "SOLBTC"])
+            assert fetcher.get_binance_price("SOLUSDT") == 150.0
+            assert fetcher.get_sol_triangular_prices() == (60000.0, 150.0, 0.0025)
+            assert len(fetcher.session.calls) == 1
+            # max_age=0 always goes to the exchange
+            fetcher.get_binance_prices(["BTCUSDT"], max_age=0)
+            assert len(fetcher.session.calls) == 2
+
+    def test_all_symbols_snapshot(self):
+        """Test that symbols=None fetches and caches the whole market."""
+        with make_fetcher() as fetcher:
+            prices = fetcher.get_binance_prices()
+            assert prices["SOLBTC"] == 0.0025
+            assert fetcher.get_binance_prices() == prices
+            assert len(fetcher.session.calls) == 1
+
+
+class TestFetcherMetrics:
+    def test_requests_and_cache_hits_are_counted(self):
+        """Test that requests, network and parse time are recorded per exchange."""
+        metrics = Metrics()
+        with make_fetcher(metrics=metrics) as fetcher:
+            fetcher.get_both_quotes()
+            fetcher.get_binance_price("BTCUSDT")  # Served from the snapshot
+        assert metrics.counter("fetch_requests_total", exchange="binance").value == 1
+        assert metrics.counter("fetch_requests_total", exchange="kraken").value == 1
+        assert metrics.counter("snapshot_hits_total").value == 1
+        assert metrics.histogram("fetch_network_seconds", exchange="kraken").count == 1
+        assert metrics.histogram("fetch_parse_seconds", exchange="binance").count == 1
+        assert metrics.histogram("fetch_call_seconds", call="get_binance_quotes").count == 2
+
+    def test_timeouts_are_counted(self):
+        """Test that every timed-out attempt shows up as a timeout error."""
+        class TimeoutSession(FakeSession):
+            def get(self, url, params=None, timeout=None):
+                raise requests.Timeout("too slow")
+
+        metrics = Metrics()
+        scheduler = RequestScheduler(max_retries=2, backoff_base=0.001, metrics=metrics)
+        with DataFetcher(metrics=metrics, scheduler=scheduler) as fetcher:
+            fetcher.session = TimeoutSession(PRICES)
+            assert fetcher.get_kraken_quote() is None
+        assert metrics.counter("fetch_errors_total", exchange="kraken", kind="timeout").value == 3
+        assert metrics.counter("fetch_retries_total", exchange="kraken").value == 2
@@ -0,0 +1,106 @@
+import sys
+import os
+import time
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from trading_bot.data_fetcher import DataFetcher
+from trading_bot.depth import (DepthEvaluator, L2Book, SimulatedDepthFeed, best_triangle_fill, executable_spread,
+                               parse_kraken_depth, sol_triangle_legs, triangle_amount_out)
+
+
+def make_book(exchange, symbol, bids, asks):
+    book = L2Book(exchange, symbol)
+    book.replace(bids, asks, ts=0.0)
+    return book
+
+
+def sol_books():
+    """BTCUSDT, SOLUSDT and SOLBTC books where SOL bought for USDT sells for ~0.8% more via BTC."""
+    btc_usdt = make_book("binance", "BTCUSDT", [(60000.0, 1.0), (59900.0, 1.0)], [(60010.0, 1.0)])
+    sol_usdt = make_book("binance", "SOLUSDT", [(149.9, 10.0)], [(150.0, 10.0), (150.5, 10.0), (151.0, 100.0)])
+    sol_btc = make_book("binance", "SOLBTC", [(0.00252, 10.0), (0.00251, 10.0), (0.0025, 100.0)], [(0.00253, 10.0)])
+    return btc_usdt, sol_usdt, sol_btc
+
+
+class TestOrderBook:
+    def test_incremental_updates_match_feed(self):
+        """Test that a book kept from depth diffs matches the feed's own book, in well under 1 ms per update."""
+        feeds = [SimulatedDepthFeed("binance", "BTCUSDT", 60000.0, seed=1),
+                 SimulatedDepthFeed("kraken", "BTCUSDT", 60000.0, seed=2)]
+        evaluator = DepthEvaluator({"binance": 0.1, "kraken": 0.26})
+        for feed in feeds:
+            evaluator.update(feed.exchange, "BTCUSDT", *feed.snapshot(), ts=0.0, snapshot=True)
+        updates = [(feed.exchange, feed.step()) for _ in range(500) for feed in feeds]
+        started = time.perf_counter()
+        for venue, (bids, asks) in updates:
+            evaluator.update(venue, "BTCUSDT", bids, asks, ts=0.0)
+        per_update = (time.perf_counter() - started) / len(updates)
+        assert per_update < 1e-3
+        for feed in feeds:
+            book = evaluator.book(feed.exchange, "BTCUSDT")
+            bids, asks = feed.book()
+            assert list(book.bids.levels()) == bids and list(book.asks.levels()) == asks
+            assert book.top().bid == bids[0][0] and book.top().ask == asks[0][0]
+        # Removing a level and walking the book
+        book = make_book("binance", "BTCUSDT", [(99.0, 1.0)], [(100.0, 1.0), (101.0, 1.0), (102.0, 5.0)])
+        book.apply(asks=[(101.0, 0.0)])
+        fill = book.fill("buy", 3.0)
+        assert (fill.qty, fill.notional, fill.vwap) == (3.0, 304.0, 304.0 / 3)
+        assert book.fill("sell", 5.0).qty == 1.0
+
+    def test_executable_spread(self):
+        """Test that cross-venue sizing stops at the last level pair that still pays the fees."""
+        buy = make_book("binance", "BTCUSDT", [(99.0, 1.0)], [(100.0, 1.0), (101.0, 2.0), (102.0, 5.0)])
+        sell = make_book("kraken", "BTCUSDT", [(103.0, 1.5), (102.5, 1.0), (101.0, 10.0)], [(104.0, 1.0)])
+        spread = executable_spread(buy, sell)
+        assert spread.qty == 2.5 and abs(spread.profit - 5.5) < 1e-9
+        assert abs(spread.buy_vwap - 251.5 / 2.5) < 1e-9 and abs(spread.sell_vwap - 257.0 / 2.5) < 1e-9
+        # 1% fees: only the first level pair still makes money
+        spread = executable_spread(buy, sell, 1.0, 1.0)
+        assert spread.qty == 1.0 and abs(spread.profit - (103.0 * 0.99 - 101.0)) < 1e-9
+        assert executable_spread(buy, sell, max_qty=0.5).qty == 0.5
+        assert executable_spread(sell, buy) is None
+
+        evaluator = DepthEvaluator()
+        evaluator.update("binance", "BTCUSDT", [(99.0, 1.0)], [(100.0, 1.0)], ts=0.0)
+        (found,) = evaluator.update("kraken", "BTCUSDT", [(103.0, 1.5)], [(104.0, 1.0)], ts=0.0)
+        assert (found.buy_venue, found.sell_venue, found.qty) == ("binance", "kraken", 1.0)
+
+
+class TestTriangleDepth:
+    def test_best_triangle_fill(self):
+        """Test that the searched triangle size beats every size on a fine grid."""
+        legs = sol_triangle_legs(*sol_books(), forward=True)
+        fill = best_triangle_fill(legs, fee_pct=0.1)
+        assert fill is not None and fill.profit > 0
+        assert [(symbol, side) for symbol, side, _, _ in fill.legs] == [
+            ("SOLUSDT", "buy"), ("SOLBTC", "sell"), ("BTCUSDT", "sell")]
+
+        best_on_grid = 0.0
+        for k in range(1, 2000):
+            amount = k * 2.0
+            out = triangle_amount_out(legs, amount, fee_pct=0.1)
+            if out is not None:
+                best_on_grid = max(best_on_grid, out - amount)
+        assert fill.profit >= best_on_grid - 1e-6
+        assert best_triangle_fill(sol_triangle_legs(*sol_books(), forward=False), fee_pct=0.1) is None
+
+    def test_check_sol_triangular_with_books(self):
+        """Test that a detected triangle is sized from the books passed in."""
+        trades = []
+        fetcher = DataFetcher()
+        try:
+            fetcher.check_sol_triangular_arbitrage(min_spread_pct=0.2, trades=trades,
+                                                   prices=(60000.0, 150.0, 0.00252), books=sol_books())
+        finally:
+            fetcher.close()
+        (trade,) = trades
+        assert trade["direction"] == "forward" and trade["amount_usdt"] > 0 and trade["profit_usdt"] > 0
+        assert [leg["symbol"] for leg in trade["legs"]] == ["SOLUSDT", "SOLBTC", "BTCUSDT"]
+
+        reply = {"error": [], "result": {"XBTUSDT": {"bids": [["60000.0", "0.5", 1], ["59990.0", "1.0", 1]],
+                                                     "asks": [["60010.0", "0.2", 1]]}}}
+        book = parse_kraken_depth(reply, "XBTUSDT")
+        assert book.bids.best() == (60000.0, 0.5) and len(book.asks) == 1
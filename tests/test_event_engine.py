@@ -0,0 +1,78 @@
+import sys
+import os
+
+import pytest
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from trading_bot.event_engine import CrossVenueArbitrage, EventEngine, Leg
+from trading_bot.strategy import ArbitrageStrategy
+
+SECOND = 1_000_000_000  # Nanoseconds
+
+
+class Idle:
+    """Strategy that never trades."""
+    def on_quote(self, engine, venue, symbol, price):
+        return None
+
+
+class TestEventEngine:
+    def test_order_fills_at_price_after_latency(self):
+        """Test that an order fills at the quote current once the latency has passed, with fees."""
+        engine = EventEngine({("binance", "USDT"): 1000.0}, fees={"binance": 0.01}, latency_ms=1500)
+        engine.add_quotes("binance", "ETHUSDT", [0, SECOND, 2 * SECOND], [100.0, 110.0, 120.0])
+
+        class BuyOnce:
+            def on_quote(self, engine, venue, symbol, price):
+                if engine.orders == 0:
+                    return [Leg("binance", "ETHUSDT", "buy", 2)]
+
+        results = engine.run(BuyOnce())
+        fill = results["fills"].iloc[0]
+        assert fill["price"] == 110.0  # Submitted at t=0, filled at t=1.5s
+        assert fill["fee"] == pytest.approx(2.2)
+        assert results["balances"][("binance", "ETH")] == 2
+        assert results["balances"][("binance", "USDT")] == pytest.approx(1000 - 220 - 2.2)
+        assert results["fees"] == {("binance", "USDT"): pytest.approx(2.2)}
+
+    def test_unfunded_leg_rejects_whole_order(self):
+        """Test that an order is all or nothing when one leg cannot be paid for."""
+        balances = {("binance", "USDT"): 1000.0, ("kraken", "XBT"): 0.0}
+        engine = EventEngine(balances, default_fee=0.0)
+        engine.add_quotes("binance", "BTCUSDT", [0], [500.0])
+        engine.add_quotes("kraken", "XBTUSDT", [0], [510.0])
+
+        class Arbitrage:
+            def on_quote(self, engine, venue, symbol, price):
+                if venue == "kraken":
+                    return [Leg("binance", "BTCUSDT", "buy", 1), Leg("kraken", "XBTUSDT", "sell", 1)]
+
+        results = engine.run(Arbitrage())
+        assert results["rejected"] == 1
+        assert results["fills"].empty
+        assert results["balances"] == balances
+
+    def test_timers_run_in_time_order(self):
+        """Test that scheduled callbacks run between the quotes around them."""
+        engine = EventEngine({("binance", "USDT"): 0.0})
+        engine.add_quotes("binance", "BTCUSDT", [0, 2 * SECOND], [1.0, 2.0])
+        seen = []
+        engine.schedule(SECOND, lambda e: seen.append((e.now, e.price("binance", "BTCUSDT"))))
+        results = engine.run(Idle())
+        assert seen == [(SECOND, 1.0)]
+        assert results["events"] == 3
+
+    def test_cross_venue_arbitrage(self):
+        """Test that an ArbitrageStrategy signal becomes a two-leg order that earns the spread."""
+        balances = {("binance", "USDT"): 100000.0, ("binance", "BTC"): 1.0,
+                    ("kraken", "USDT"): 100000.0, ("kraken", "XBT"): 1.0}
+        engine = EventEngine(balances, default_fee=0.0, latency_ms=10)
+        engine.add_quotes("binance", "BTCUSDT", [0], [60000.0])
+        engine.add_quotes("kraken", "XBTUSDT", [0, SECOND, 2 * SECOND], [60000.0, 61000.0, 60000.0])
+        results = engine.run(CrossVenueArbitrage(ArbitrageStrategy(min_spread_pct=0.5)))
+        assert results["orders"] == 1
+        assert list(results["fills"]["side"]) == ["buy", "sell"]
+        assert results["balances"][("kraken", "USDT")] == 161000.0
+        assert results["pnl"] == pytest.approx(1000.0)
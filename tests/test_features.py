@@ -0,0 +1,91 @@
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from trading_bot.backtest import Backtest
+from trading_bot.features import FEATURES, FeatureStore, dataset_fingerprint, register_feature
+from test_backtest import make_data
+
+
+class CrossoverStrategy:
+    """Buys when the fast average crosses above the slow one and sells on the way down."""
+
+    def __init__(self, store, fast=5, slow=20):
+        self.store = store
+        self.fast = fast
+        self.slow = slow
+
+    def generate_signals(self, data):
+        features = self.store.view(data)
+        above = features.get("sma", window=self.fast) > features.get("sma", window=self.slow)
+        crossed = np.diff(above.astype(np.int64), prepend=0)
+        return crossed.astype(np.float64)  # +1 on the cross up, -1 on the cross down
+
+
+class TestFeatureStore:
+    def test_strategies_share_features(self):
+        """Test that runs over the same data compute each feature once and match pandas."""
+        data = make_data()
+        store = FeatureStore()
+        results = [Backtest(initial_capital=1000).run(data, CrossoverStrategy(store, fast, 20), mode="vectorized")
+                   for fast in (5, 10, 5)]
+        assert results[0]["trades"] == results[2]["trades"]
+        assert store.misses == 3  # sma 5, sma 20, sma 10
+        assert store.hits == 3
+        expected = data["price"].rolling(20).mean().to_numpy()
+        assert np.allclose(store.get(data, "sma", window=20), expected, equal_nan=True)
+        # A copy of the same rows has the same fingerprint; different rows do not
+        assert dataset_fingerprint(data.copy()) == dataset_fingerprint(data)
+        assert dataset_fingerprint(data.iloc[1:]) != dataset_fingerprint(data)
+
+    def test_lru_eviction_and_disk_spill(self, tmp_path):
+        """Test that the memory budget evicts the oldest entries and the spill files serve them again."""
+        data = make_data()
+        row_bytes = len(data) * 8
+        store = FeatureStore(max_bytes=2 * row_bytes, spill_dir=str(tmp_path))
+        fingerprint = dataset_fingerprint(data)
+        store.get(data, "sma", fingerprint, window=5)
+        store.get(data, "ema", fingerprint, window=5)
+        store.get(data, "sma", fingerprint, window=5)  # Now the most recently used
+        store.get(data, "zscore", fingerprint, window=5)  # Evicts ema
+        assert len(store) == 2 and store.nbytes == 2 * row_bytes
+        store.get(data, "ema", fingerprint, window=5)
+        assert store.disk_hits == 1 and store.misses == 3
+
+        # Another store (e.g. another process or a later run) reuses the spilled files
+        other = FeatureStore(spill_dir=str(tmp_path))
+        values = other.get(data, "zscore", window=5)
+        assert other.disk_hits == 1 and other.misses == 0
+        assert not values.flags.writeable
+
+    def test_custom_feature(self, monkeypatch, tmp_path):
+        """Test registering features, re-registering a name with new code, and the errors."""
+        # Undone after the test
+        monkeypatch.setattr("trading_bot.features.FEATURES", dict(FEATURES))
+        monkeypatch.setattr("trading_bot.features.FEATURE_VERSIONS", {})
+        register_feature("range_pct", lambda data, window: (
+            data["price"].rolling(window).max() / data["price"].rolling(window).min() - 1).to_numpy() * 100)
+        register_feature("broken", lambda data: np.zeros(3))
+        data = make_data(50)
+        store = FeatureStore(spill_dir=str(tmp_path))
+        view = store.view(data)
+        assert view.value("range_pct", 49, window=10) >= 0
+        assert view.value("range_pct", 48, window=10) >= 0  # Served by the view, not the store
+        assert store.misses == 1 and store.hits == 0
+
+        # Same name and qualname, new body: the spilled result of the old code is not served
+        register_feature("range_pct", lambda data, window: np.ones(len(data)))
+        assert FeatureStore(spill_dir=str(tmp_path)).get(data, "range_pct", window=10)[0] == 1.0
+        with pytest.raises(ValueError, match="Unknown feature"):
+            store.get(data, "nope")
+        with pytest.raises(ValueError, match="returned 3 values for 50 rows"):
+            store.get(data, "broken")
+        spread = store.get(pd.DataFrame({"binance_price": [100.0, 101.0], "kraken_price": [101.0, 100.0]}),
+                           "spread_pct")
+        assert np.allclose(spread, [1.0, 1.0])
@@ -0,0 +1,89 @@
+import sys
+import os
+
+import numpy as np
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from trading_bot.kline_store import KlineStore, parse_kline_filename
+from trading_bot.triangular_backtest import align_asof, run_triangular_backtest
+
+
+def write_klines(directory, symbol, day, closes, start_us=1752364800000000, step_us=60000000):
+    """Write a Binance-style 1m kline CSV with microsecond timestamps."""
+    path = os.path.join(directory, f"{symbol}-1m-{day}.csv")
+    with open(path, "w") as f:
+        for i, close in enumerate(closes):
+            open_time = start_us + i * step_us
+            close_time = open_time + step_us - 1
+            f.write(f"{open_time},{close},{close},{close},{close},1.5,{close_time},10.0,3,0.5,5.0,0\n")
+    return path
+
+
+class TestKlineStore:
+    def test_parse_kline_filename(self):
+        """Test that symbol, interval and date come from the dump file name."""
+        assert parse_kline_filename("data/SOLBTC-1m-2025-07-13.csv") == ("SOLBTC", "1m", "2025-07-13")
+
+    def test_ingest_once_and_load_columns(self, tmp_path):
+        """Test that a CSV is converted once and loads back as typed, mapped columns."""
+        path = write_klines(str(tmp_path), "BTCUSDT", "2025-07-13", [100.0, 101.5, 99.25])
+        store = KlineStore(str(tmp_path / "store"))
+        assert store.ingest_csv(path)
+        assert not store.ingest_csv(path)  # Already stored
+
+        data = KlineStore(str(tmp_path / "store")).load_day("BTCUSDT", "1m", "2025-07-13")
+        assert isinstance(data["close"], np.memmap)
+        assert data["close"].tolist() == [100.0, 101.5, 99.25]
+        assert data["close_time"].dtype == np.int64
+        assert data["close_time"][0] == (1752364800000000 + 60000000 - 1) // 1000  # Milliseconds
+
+    def test_load_range_across_days(self, tmp_path):
+        """Test that loads filter by date and by close time."""
+        store = KlineStore(str(tmp_path / "store"))
+        store.ingest_csv(write_klines(str(tmp_path), "SOLUSDT", "2025-07-13", [1.0, 2.0, 3.0]))
+        store.ingest_csv(write_klines(str(tmp_path), "SOLUSDT", "2025-07-14", [4.0, 5.0],
+                                      start_us=1752451200000000))
+        assert store.dates("SOLUSDT", "1m") == ["2025-07-13", "2025-07-14"]
+        assert store.load("SOLUSDT", "1m", "2025-07-13", "2025-07-14")["close"].tolist() == [1.0, 2.0, 3.0, 4.0, 5.0]
+        assert store.load("SOLUSDT", "1m", "2025-07-14")["close"].tolist() == [4.0, 5.0]
+
+        second_close = store.load_day("SOLUSDT", "1m", "2025-07-13")["close_time"][1]
+        sliced = store.load("SOLUSDT", "1m", "2025-07-13", "2025-07-13", columns=["close"], start_ms=second_close)
+        assert sliced["close"].tolist() == [2.0, 3.0]
+
+        frame = store.load_frame("SOLUSDT", "1m", "2025-07-14", price_column="SOLUSDT")
+        assert list(frame.columns) == ["timestamp", "SOLUSDT"]
+        assert str(frame["timestamp"].iloc[0]) == "2025-07-14 00:00:59.999000"
+
+
+class TestTriangularBacktest:
+    def test_matches_row_by_row_formula_over_two_days(self, tmp_path):
+        """Test that the vectorized scan finds the same trades as the old per-row loop."""
+        rng = np.random.default_rng(3)
+        expected = []
+        for day, start_us in (("2025-07-13", 1752364800000000), ("2025-07-14", 1752451200000000)):
+            btc = 60000 + np.cumsum(rng.normal(0, 10, 300))
+            sol = 150 + np.cumsum(rng.normal(0, 0.1, 300))
+            solbtc = sol / btc * (1 + rng.normal(0, 0.0005, 300))
+            write_klines(str(tmp_path), "BTCUSDT", day, btc, start_us)
+            write_klines(str(tmp_path), "SOLUSDT", day, sol, start_us)
+            write_klines(str(tmp_path), "SOLBTC", day, solbtc, start_us)
+            for b, s_, x in zip(btc, sol, solbtc):
+                spread_pct = (x * b - s_) / s_ * 100
+                if abs(spread_pct) > 0.05:
+                    expected.append((abs(spread_pct), "forward" if spread_pct > 0 else "reverse"))
+
+        results = run_triangular_backtest(KlineStore(str(tmp_path / "store")), ("SOLUSDT", "SOLBTC", "BTCUSDT"),
+                                          "2025-07-13", "2025-07-14", threshold_pct=0.05, csv_dir=str(tmp_path))
+        assert results["periods"] == 600
+        assert results["total_trades"] == len(expected)
+        assert np.allclose(results["trades"]["spread_pct"], [pct for pct, _ in expected])
+        assert list(results["trades"]["direction"]) == [direction for _, direction in expected]
+
+    def test_align_asof_tolerance(self):
+        """Test that asof alignment takes the last earlier value within tolerance."""
+        values, found = align_asof(np.array([5, 10, 30]), np.array([4, 10, 20]), np.array([1.0, 2.0, 3.0]), 5)
+        assert values.tolist()[:2] == [1.0, 2.0]
+        assert found.tolist() == [True, True, False]
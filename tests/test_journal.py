@@ -0,0 +1,72 @@
+import sys
+import os
+import logging
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from trading_bot.backtest import Backtest
+from trading_bot.models import Quote
+from trading_bot.journal import (TradeJournal, journal_files, load_backtest_data, load_journal_frame,
+                                 read_journal, setup_console_logging)
+from trading_bot.strategy import Strategy
+
+
+class TestTradeJournal:
+    def test_records_round_trip(self, tmp_path):
+        """Test that queued records are on disk, in order, once the journal is closed."""
+        with TradeJournal(str(tmp_path)) as journal:
+            journal.quote(Quote("kraken", "XBTUSDT", 60100.0, 1.0, 1.5))
+            journal.trade({"type": "BTC", "spread_pct": 0.3, "legs": ("a", "b")})
+        records = list(read_journal(str(tmp_path)))
+        assert [r["kind"] for r in records] == ["quote", "trade"]
+        assert records[0]["price"] == 60100.0 and records[0]["ts"] == 1.5 and records[0]["exchange"] == "kraken"
+        assert records[1]["legs"] == ["a", "b"]
+        assert list(read_journal(str(tmp_path), kinds=["trade"])) == records[1:]
+
+    def test_rotation_and_restart(self, tmp_path):
+        """Test that big files rotate and a restart never appends to an old file."""
+        with TradeJournal(str(tmp_path), max_bytes=200, fsync_every=1) as journal:
+            for i in range(20):
+                journal.record("tick", i=i)
+        with TradeJournal(str(tmp_path)) as journal:
+            journal.record("tick", i=20)
+        files = journal_files(str(tmp_path))
+        assert len(files) > 2
+        assert [r["i"] for r in read_journal(str(tmp_path))] == list(range(21))
+
+    def test_truncated_line_is_skipped(self, tmp_path):
+        """Test that a record cut short by a crash does not stop the reader."""
+        with TradeJournal(str(tmp_path)) as journal:
+            journal.record("tick", i=1)
+            path = journal.path
+        with open(path, "a") as f:
+            f.write('{"kind":"tick","i":')
+        assert [r["i"] for r in read_journal(str(tmp_path))] == [1]
+
+    def test_loads_into_backtester(self, tmp_path):
+        """Test that journaled quotes replay through Backtest.run."""
+        with TradeJournal(str(tmp_path)) as journal:
+            for i, price in enumerate([100.0, 101.0, 102.0, 104.0]):
+                journal.quote(Quote("binance", "BTCUSDT", price, i, i + 0.1))
+                journal.quote(Quote("kraken", "XBTUSDT", price + 50, i, i + 0.1))
+        data = load_backtest_data(str(tmp_path))
+        assert list(data.columns) == ["timestamp", "price"]
+        assert data["price"].tolist() == [100.0, 101.0, 102.0, 104.0]
+        results = Backtest(initial_capital=1000).run(data, Strategy())
+        assert results["total_trades"] == 3  # Every even price buys
+        assert len(load_journal_frame(str(tmp_path), "quote")) == 8
+
+    def test_console_logging_is_journaled(self, tmp_path, capsys):
+        """Test that log lines are printed by the listener and copied into the journal."""
+        journal = TradeJournal(str(tmp_path))
+        listener = setup_console_logging(journal)
+        try:
+            logging.getLogger("test").info("🎯 opportunity")
+        finally:
+            listener.stop()
+            logging.getLogger().handlers = []
+            journal.close()
+        assert "🎯 opportunity" in capsys.readouterr().out
+        (record,) = read_journal(str(tmp_path), kinds=["log"])
+        assert record["message"] == "🎯 opportunity" and record["logger"] == "test"
@@ -0,0 +1,60 @@
+import sys
+import os
+
+import numpy as np
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from trading_bot.backtest import Backtest
+from trading_bot.chunks import frame_chunks
+from trading_bot.kernels import KernelStrategy, TickAdapter, run_kernel
+from trading_bot.strategy import Strategy
+from test_backtest import ThresholdStrategy, make_data
+
+
+class DipBuyer(KernelStrategy):
+    """Buys after a drop of more than 2 and sells after a rise of more than 2; keeps the last price as state."""
+
+    @staticmethod
+    def kernel(price, volume, state, out):
+        for i in range(price.shape[0]):
+            if state[0] > 0:
+                if price[i] < state[0] - 2:
+                    out[i] = 1.0
+                elif price[i] > state[0] + 2:
+                    out[i] = -1.0
+            state[0] = price[i]
+
+    def initial_state(self):
+        return np.zeros(1)
+
+
+class TestKernels:
+    def test_example_strategy_kernel_matches_tick_path(self):
+        """Test that auto mode picks the kernel and trades like on_tick."""
+        data = make_data()
+        tick = Backtest().run(data, Strategy(), mode="tick")
+        kernel = Backtest().run(data, Strategy())
+        assert kernel["trades"] == tick["trades"]
+        assert kernel["final_equity"] == tick["final_equity"]
+
+    def test_kernel_state_carries_across_chunks(self):
+        """Test that a chunked run continues the kernel state, matching one whole run and on_tick."""
+        data = make_data()
+        whole = Backtest(initial_capital=1000).run(data, DipBuyer())
+        chunked = Backtest(initial_capital=1000).run_stream(frame_chunks(data, 50), DipBuyer())
+        tick = Backtest(initial_capital=1000).run(data, DipBuyer(), mode="tick")
+        assert whole["total_trades"] > 0
+        assert chunked["trades"] == whole["trades"]
+        assert tick["trades"] == whole["trades"]
+
+    def test_tick_adapter(self):
+        """Test that a dict-only strategy runs through the signal path with the same trades."""
+        data = make_data()
+        strategy = ThresholdStrategy()
+        tick = Backtest(initial_capital=1000).run(data, strategy, mode="tick")
+        adapted = Backtest(initial_capital=1000).run(data, TickAdapter(strategy), mode="vectorized")
+        assert adapted["trades"] == tick["trades"]
+        signals, _ = run_kernel(DipBuyer(), data)
+        assert signals.dtype == np.float64 and len(signals) == len(data)
@@ -0,0 +1,65 @@
+import sys
+import os
+import json
+import logging
+import urllib.request
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from trading_bot.metrics import NULL_METRICS, JsonDumper, Metrics, MetricsServer, start_metrics
+
+
+class TestMetrics:
+    def test_histogram_buckets_and_quantiles(self):
+        """Test that observations land in the right buckets and quantiles come from them."""
+        metrics = Metrics()
+        for value in (0.0002, 0.0002, 0.003, 0.2):
+            metrics.observe("fetch_network_seconds", value, exchange="binance")
+        histogram = metrics.histogram("fetch_network_seconds", exchange="binance")
+        assert histogram.count == 4
+        assert histogram.quantile(0.5) == 0.00025
+        assert histogram.quantile(0.99) == 0.25
+
+    def test_prometheus_text(self):
+        """Test the text exposition format of counters and histograms."""
+        metrics = Metrics()
+        metrics.inc("fetch_errors_total", exchange="kraken", kind="timeout")
+        with metrics.timer("spread_calc_seconds"):
+            pass
+        text = metrics.render_prometheus()
+        assert '# TYPE fetch_errors_total counter' in text
+        assert 'fetch_errors_total{exchange="kraken",kind="timeout"} 1' in text
+        assert 'spread_calc_seconds_bucket{le="+Inf"} 1' in text
+        assert 'spread_calc_seconds_count 1' in text
+
+    def test_null_metrics_records_nothing(self):
+        """Test that the disabled registry accepts every call and exports nothing."""
+        with NULL_METRICS.timer("strategy_on_tick_seconds"):
+            NULL_METRICS.inc("fetch_requests_total", exchange="binance")
+        assert not NULL_METRICS.enabled
+        assert NULL_METRICS.render_prometheus() == ""
+
+    def test_endpoint_and_json_dump(self, tmp_path, caplog):
+        """Test that the HTTP endpoint and the JSON dumper export the same series."""
+        metrics = Metrics()
+        metrics.inc("fetch_requests_total", 3, exchange="binance")
+        server = MetricsServer(metrics, port=0).start()
+        try:
+            with urllib.request.urlopen(server.url, timeout=5) as response:
+                assert 'fetch_requests_total{exchange="binance"} 3' in response.read().decode()
+        finally:
+            server.stop()
+
+        path = str(tmp_path / "metrics.json")
+        JsonDumper(metrics, path).dump()
+        with open(path) as f:
+            (counter,) = json.load(f)["counters"]
+        assert counter["labels"] == {"exchange": "binance"} and counter["value"] == 3
+
+        # The runners' startup lines go through logging (and so into the journal)
+        with caplog.at_level(logging.INFO, logger="trading_bot.metrics"):
+            _, exporters = start_metrics(json_path=path)
+        for exporter in exporters:
+            exporter.stop()
+        assert f"Metrics written to {path}" in caplog.text
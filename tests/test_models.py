@@ -0,0 +1,81 @@
+import sys
+import os
+import json
+import pickle
+
+import numpy as np
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from trading_bot.backtest import Backtest
+from trading_bot.data_fetcher import DataFetcher
+from trading_bot.ledger import TradeLedger
+from trading_bot.models import Exchange, Quote, Side, Signal, Trade, Venue, quote_batch, signal_batch, to_exchange
+from trading_bot.strategy import ArbitrageStrategy
+from test_backtest import make_data
+
+
+class Alternate:
+    """Buys and sells on alternate rows, returning a typed and a dict signal in turn."""
+
+    def __init__(self):
+        self.row = 0
+
+    def on_tick(self, data):
+        self.row += 1
+        if self.row % 2:
+            return Signal(Side.BUY, 1)
+        return {"side": "sell", "qty": 1}
+
+
+class TestModels:
+    def test_spread_and_signal_read_like_dicts(self):
+        """Test that the typed spread/signal records keep the old dict interface."""
+        spread = DataFetcher.calculate_spread(60000.0, 60600.0)
+        assert spread.lower_exchange is Exchange.BINANCE and spread.spread_pct == 1.0
+        assert spread["higher_exchange"] == "kraken" and spread["spread"] == 600.0
+
+        signal = ArbitrageStrategy(min_spread_pct=0.5).check_prices(60000.0, 60600.0)
+        assert isinstance(signal, Signal) and signal.side is Side.ARBITRAGE
+        assert signal == {"side": "arbitrage", "buy_exchange": "binance", "sell_exchange": "kraken",
+                          "buy_price": 60000.0, "sell_price": 60600.0, "spread_pct": 1.0, "qty": 1}
+        assert json.loads(json.dumps({**signal})) == signal.to_dict()
+        assert signal.get("missing", 7) == 7 and "buy_price" in signal
+        assert Signal("sell", 2) == {"side": "sell", "qty": 2}
+
+    def test_trades_are_typed_records(self):
+        """Test that ledger rows are Trade records that still export as the old dicts."""
+        results = Backtest(initial_capital=1000).run(make_data(), Alternate(), mode="tick")
+        trades = results["trades"]
+        assert len(trades) > 0
+        first = trades[0]
+        assert isinstance(first, Trade) and first.side in (Side.BUY, Side.SELL)
+        exported = trades.to_dicts()[0]
+        assert type(exported) is dict and exported == first
+        assert set(exported) == {"timestamp", "side", "price", "qty", "cost" if first.side is Side.BUY else "revenue"}
+        ledger = TradeLedger()
+        ledger.append(0, "buy", 1, 10.0)
+        ledger.append(1, Side.SELL, 1, 11.0)
+        assert [trade["side"] for trade in ledger] == ["buy", "sell"] and ledger[1]["revenue"] == 11.0
+
+    def test_batches(self):
+        """Test that quotes and signals pack into structured arrays with integer codes."""
+        kraken = Quote("kraken", "XBTUSDT", 60100.0, 1.0, 1.2)
+        assert kraken.exchange is Exchange.KRAKEN and kraken == Quote(Exchange.KRAKEN, "XBTUSDT", 60100.0, 1.0, 1.2)
+        assert kraken._replace(price=1.0).exchange is Exchange.KRAKEN
+        quotes = quote_batch([Quote("binance", "BTCUSDT", 60000.0, 1.0, 1.1), kraken])
+        assert quotes.dtype["exchange"] == np.int8 and list(quotes["exchange"]) == [1, 2]
+        assert quotes["symbol"][1] == "XBTUSDT" and quotes["price"].sum() == 120100.0
+        signals = signal_batch([Signal(Side.BUY, 2), Signal.arbitrage(DataFetcher.calculate_spread(100.0, 101.0))])
+        assert list(signals["side"]) == [1, 2] and list(signals["sell_exchange"]) == [0, 2]
+
+    def test_unknown_exchange_names_are_registered(self):
+        """Test that a venue missing from Exchange gets its own code instead of an error."""
+        gate = Quote("gateio", "BTCUSDT", 60050.0, 1.0, 1.1)
+        assert isinstance(gate.exchange, Venue) and gate.exchange.label == "gateio"
+        assert to_exchange("gateio") is gate.exchange and to_exchange(int(gate.exchange)) is gate.exchange
+        spread = DataFetcher.calculate_spread(60000.0, 60050.0, "binance", "gateio")
+        assert spread["higher_exchange"] == "gateio" and spread.lower_exchange is Exchange.BINANCE
+        assert quote_batch([gate])["exchange"][0] == int(gate.exchange)
+        assert pickle.loads(pickle.dumps(gate)).exchange.label == "gateio"
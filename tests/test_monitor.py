@@ -0,0 +1,95 @@
+import sys
+import os
+import time
+
+import numpy as np
+import pytest
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from trading_bot.exchanges import BinanceAdapter, KrakenAdapter, OkxAdapter, make_adapters
+from trading_bot.monitor import SpreadMonitor, load_config, pick_symbols
+from trading_bot.stream import BookTop
+
+
+def top(exchange, symbol, bid, ask, received_ts=100.0):
+    return BookTop(exchange, symbol, bid, 1.0, ask, 1.0, received_ts)
+
+
+class TestExchangeAdapters:
+    def test_symbols_are_normalized(self):
+        """Test that every venue's naming ends up as the same BASE+QUOTE symbol."""
+        kraken = KrakenAdapter().parse({"result": {
+            "XXBTZUSD": {"b": ["60000.0", "1", "1.0"], "a": ["60001.0", "1", "2.0"]},
+            "XBTUSDT": {"b": ["60010.0", "1", "1.0"], "a": ["60011.0", "1", "2.0"]},
+            "SOLUSD": {"b": ["150.0", "1", "1.0"], "a": ["150.1", "1", "2.0"]},
+            **{legacy: {"b": ["10.0", "1", "1.0"], "a": ["10.1", "1", "2.0"]}
+               for legacy in ("XXRPZUSD", "XLTCZUSD", "XXLMZUSD", "XETCZUSD", "XXMRZUSD", "XZECZUSD",
+                              "XETHZEUR", "XXDGZUSD", "XETHXXBT")},
+        }}, received_ts=1.0)
+        assert sorted(t.symbol for t in kraken) == [
+            "BTCUSD", "BTCUSDT", "DOGEUSD", "ETCUSD", "ETHBTC", "ETHEUR", "LTCUSD", "SOLUSD", "XLMUSD",
+            "XMRUSD", "XRPUSD", "ZECUSD"]
+        okx = OkxAdapter().parse({"data": [{"instId": "BTC-USDT", "bidPx": "1", "bidSz": "2", "askPx": "3",
+                                            "askSz": "4"}]}, received_ts=1.0)
+        binance = BinanceAdapter().parse([
+            {"symbol": "BTCUSDT", "bidPrice": "1", "bidQty": "2", "askPrice": "3", "askQty": "4"},
+            {"symbol": "FOOBAR", "bidPrice": "1", "bidQty": "2", "askPrice": "3", "askQty": "4"},  # Unknown quote
+            {"symbol": "ETHUSDT", "bidPrice": "0", "bidQty": "0", "askPrice": "0", "askQty": "0"},  # Empty book
+        ], received_ts=1.0)
+        assert [t.symbol for t in okx] == [t.symbol for t in binance] == ["BTCUSDT"]
+        with pytest.raises(ValueError):
+            make_adapters(["binance", "nowhere"])
+
+
+class TestSpreadMonitor:
+    def test_matrix_matches_pairwise_check(self):
+        """Test that the vectorized scan finds exactly the pairs a loop over venue pairs finds."""
+        rng = np.random.default_rng(1)
+        symbols = [f"C{i}USDT" for i in range(50)]
+        venues = ["a", "b", "c", "d"]
+        fees = {"a": 0.1, "b": 0.2, "c": 0.0, "d": 0.1}
+        monitor = SpreadMonitor(symbols, venues, threshold_pct=0.2, fees=fees, max_age=10)
+        tops = []
+        for symbol in symbols:
+            for venue in venues:
+                mid = 100 * (1 + rng.normal(0, 0.004))
+                tops.append(top(venue, symbol, mid - 0.01, mid + 0.01))
+        monitor.update(tops)
+        found = {(o.symbol, o.buy_venue, o.sell_venue) for o in monitor.scan(now=100.0)}
+        quotes = {(t.exchange, t.symbol): t for t in tops}
+        expected = set()
+        for symbol in symbols:
+            for buy in venues:
+                for sell in venues:
+                    ask, bid = quotes[(buy, symbol)].ask, quotes[(sell, symbol)].bid
+                    if buy != sell and (bid - ask) / ask * 100 - fees[buy] - fees[sell] >= 0.2:
+                        expected.add((symbol, buy, sell))
+        assert expected and found == expected
+
+    def test_stale_quotes_are_ignored(self):
+        """Test that a venue whose quote is too old is left out of the comparison."""
+        monitor = SpreadMonitor(["BTCUSDT"], ["binance", "kraken"], threshold_pct=0.1, max_age=2.0)
+        monitor.update([top("binance", "BTCUSDT", 99.9, 100.0, received_ts=100.0),
+                        top("kraken", "BTCUSDT", 101.0, 101.1, received_ts=95.0),
+                        top("okx", "BTCUSDT", 1.0, 2.0)])  # Venue not watched
+        assert monitor.scan(now=96.0)[0].buy_venue == "binance"
+        assert monitor.scan(now=100.0) == []
+
+    def test_scales_to_hundreds_of_symbols(self, tmp_path):
+        """Test that a 300-symbol x 5-venue snapshot is stored and scanned well under a second."""
+        symbols = [f"C{i}USDT" for i in range(300)]
+        venues = ["binance", "kraken", "okx", "bybit", "kucoin"]
+        monitor = SpreadMonitor(symbols, venues)
+        tops = [top(venue, symbol, 99.9, 100.0, received_ts=time.time()) for symbol in symbols for venue in venues]
+        start = time.perf_counter()
+        monitor.update(tops)
+        monitor.scan()
+        assert time.perf_counter() - start < 0.1
+
+        assert pick_symbols({"a": tops[:10], "b": tops[:2]}, ["USDT"]) == ["C0USDT"]
+        config_path = tmp_path / "monitor.json"
+        config_path.write_text('{"venues": ["binance", "okx"], "threshold_pct": 0.5}')
+        config = load_config(str(config_path))
+        assert config["venues"] == ["binance", "okx"] and config["interval"] == 0.5
@@ -0,0 +1,75 @@
+import sys
+import os
+import time
+
+import numpy as np
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from trading_bot.backtest import Backtest
+from trading_bot.models import Quote
+from trading_bot.journal import TradeJournal
+from trading_bot.quotes import (QuoteRecorder, ReplayQuoteSource, quote_ticks_frame, replay,
+                                replay_vectorized)
+from trading_bot.strategy import ArbitrageStrategy
+
+BINANCE = [60000.0, 60100.0, 60400.0, 60050.0]
+KRAKEN = [60000.0, 60000.0, 60000.0, 59700.0]
+
+
+def record(directory):
+    """Record the price pairs above through a QuoteRecorder, as a live run would."""
+    live = ReplayQuoteSource(list(range(len(BINANCE))), BINANCE, KRAKEN)
+    with TradeJournal(directory) as journal:
+        recorder = QuoteRecorder(live, journal)
+        while not live.exhausted:
+            recorder.get_both_quotes()
+
+
+class TestQuoteReplay:
+    def test_strategy_runs_on_injected_quotes(self):
+        """Test that the strategy takes its quotes from the given source, not the network."""
+        source = ReplayQuoteSource([0, 1, 2, 3], BINANCE, KRAKEN)
+        results = replay(ArbitrageStrategy(min_spread_pct=0.5, quote_source=source), source)
+        assert results["ticks"] == 4
+        assert [s["sell_exchange"] for s in results["signals"]] == ["binance", "binance"]
+        assert source.get_both_quotes() == (None, None)
+
+    def test_recorded_quotes_replay_in_order(self, tmp_path):
+        """Test that a recording replays to the same price pairs."""
+        record(str(tmp_path))
+        source = ReplayQuoteSource.from_journal(str(tmp_path))
+        pairs = [tuple(quote.price for quote in source.get_both_quotes()) for _ in range(len(source))]
+        # Each pair is logged as two quotes, so every Binance update shows with the previous Kraken price
+        assert pairs[-1] == (BINANCE[-1], KRAKEN[-1])
+        assert (BINANCE[2], KRAKEN[2]) in pairs
+
+    def test_wall_clock_pace(self):
+        """Test that speed=1 waits for the recorded gaps and speed=None does not."""
+        source = ReplayQuoteSource([0.0, 0.15], BINANCE[:2], KRAKEN[:2], speed=1.0)
+        start = time.perf_counter()
+        source.get_both_quotes()
+        source.get_both_quotes()
+        assert time.perf_counter() - start >= 0.14
+
+        # A 10 s gap is not waited for without a speed
+        source = ReplayQuoteSource([0.0, 10.0], BINANCE[:2], KRAKEN[:2], speed=None)
+        start = time.perf_counter()
+        source.get_both_quotes()
+        assert source.get_both_quotes()[0].price == BINANCE[1]
+        assert time.perf_counter() - start < 1.0
+
+    def test_backtest_and_vectorized_replay_agree(self, tmp_path):
+        """Test that Backtest.run, per-tick replay and the array replay find the same signals."""
+        record(str(tmp_path))
+        data = quote_ticks_frame(str(tmp_path))
+        strategy = ArbitrageStrategy(min_spread_pct=0.5)
+        results = Backtest(initial_capital=100000).run(data, strategy)
+        fast = replay_vectorized(strategy, data["binance_price"], data["kraken_price"])
+        assert results["total_trades"] == 2 * fast["signal_count"]  # A buy and a sell per signal
+        assert np.isclose(results["final_equity"] - 100000, fast["gross_profit"])
+
+        source = ReplayQuoteSource.from_journal(str(tmp_path))
+        slow = replay(ArbitrageStrategy(min_spread_pct=0.5, quote_source=source), source)
+        assert len(slow["signals"]) == fast["signal_count"]
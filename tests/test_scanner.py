@@ -0,0 +1,59 @@
+import sys
+import os
+import math
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from trading_bot.scanner import TriangleScanner, split_symbol
+
+PRICES = {
+    "BTCUSDT": 60000.0,
+    "SOLUSDT": 150.0,
+    "SOLBTC": 0.0025,
+    "ETHUSDT": 3000.0,
+    "ETHBTC": 0.05,
+    "SOLETH": 0.05,
+}
+
+
+class TestTriangleScanner:
+    def test_split_symbol(self):
+        """Test that symbols are split on the longest matching quote currency."""
+        assert split_symbol("SOLBTC") == ("SOL", "BTC")
+        assert split_symbol("BTCFDUSD") == ("BTC", "FDUSD")
+        assert split_symbol("USDT") is None
+
+    def test_finds_every_triangle_once(self):
+        """Test that each 3-currency cycle is listed exactly once."""
+        scanner = TriangleScanner.from_prices(PRICES)
+        cycles = {frozenset(currencies) for currencies in scanner.cycle_currencies}
+        assert scanner.cycle_count == 4
+        assert cycles == {
+            frozenset({"BTC", "SOL", "USDT"}), frozenset({"ETH", "BTC", "USDT"}),
+            frozenset({"SOL", "ETH", "USDT"}), frozenset({"SOL", "ETH", "BTC"}),
+        }
+
+    def test_four_leg_cycles(self):
+        """Test that 4-leg cycles are added on request."""
+        scanner = TriangleScanner.from_prices(PRICES, max_legs=4)
+        assert scanner.cycle_count == 4 + 3
+
+    def test_matches_sol_triangle_formula(self):
+        """Test that the SOL triangle profit matches the implied-price spread."""
+        prices = dict(PRICES, SOLUSDT=149.0)
+        scanner = TriangleScanner.from_prices(prices, min_profit_pct=0.1)
+        (best, *_) = scanner.opportunities()
+        implied = prices["SOLBTC"] * prices["BTCUSDT"]
+        assert set(best.currencies) == {"SOL", "BTC", "USDT"}
+        assert math.isclose(best.profit_pct, (implied / prices["SOLUSDT"] - 1) * 100)
+        # Cheap SOL on the USDT book: buy it there, sell it for BTC, sell the BTC
+        assert ("SOLUSDT", "buy") in best.legs and ("SOLBTC", "sell") in best.legs
+
+    def test_update_only_touches_changed_cycles(self):
+        """Test that an update reports only cycles that use the changed symbol."""
+        scanner = TriangleScanner.from_prices(PRICES, min_profit_pct=0.1)
+        assert scanner.opportunities() == []
+        assert scanner.update({"BTCUSDT": 60000.0}) == []  # Unchanged price
+        found = scanner.update({"ETHBTC": 0.051})
+        assert found and all(any(symbol == "ETHBTC" for symbol, _ in o.legs) for o in found)
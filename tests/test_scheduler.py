@@ -0,0 +1,99 @@
+import sys
+import os
+import threading
+import time
+
+import pytest
+import requests
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from trading_bot.scheduler import AdaptivePoller, RequestScheduler, TokenBucket
+
+
+def http_error(status, retry_after=None):
+    response = requests.Response()
+    response.status_code = status
+    if retry_after is not None:
+        response.headers["Retry-After"] = str(retry_after)
+    return requests.HTTPError(f"{status} error", response=response)
+
+
+class TestRequestScheduler:
+    def test_bucket_limits_rate(self):
+        """Test that requests beyond the burst wait for the refill."""
+        bucket = TokenBucket(rate=20.0, capacity=2)
+        start = time.perf_counter()
+        for _ in range(4):
+            bucket.acquire()
+        # Two from the burst, two more at 20/s
+        assert 0.08 <= time.perf_counter() - start < 0.5
+
+    def test_rate_limit_is_retried_after_pause(self):
+        """Test that a 429 pauses the exchange for Retry-After and the request is retried."""
+        scheduler = RequestScheduler({"test": (1000.0, 10.0)}, backoff_base=0.001)
+        attempts = []
+
+        def request():
+            attempts.append(time.perf_counter())
+            if len(attempts) == 1:
+                raise http_error(429, retry_after=0.1)
+            return "ok"
+
+        assert scheduler.call("test", None, request) == "ok"
+        assert attempts[1] - attempts[0] >= 0.09
+
+    def test_client_errors_are_not_retried(self):
+        """Test that errors a retry cannot fix are raised at once."""
+        scheduler = RequestScheduler(backoff_base=0.001)
+        calls = []
+
+        def request():
+            calls.append(1)
+            raise http_error(404)
+
+        with pytest.raises(requests.HTTPError):
+            scheduler.call("binance", None, request)
+        assert len(calls) == 1
+
+    def test_bad_json_is_not_retried(self):
+        """Test that an unparseable body is raised at once, though requests makes it an OSError."""
+        scheduler = RequestScheduler(backoff_base=0.001)
+        calls = []
+
+        def request():
+            calls.append(1)
+            raise requests.exceptions.JSONDecodeError("Expecting value", "<html>", 0)
+
+        with pytest.raises(requests.exceptions.JSONDecodeError):
+            scheduler.call("binance", None, request)
+        assert len(calls) == 1
+
+    def test_identical_requests_are_coalesced(self):
+        """Test that callers asking for the same thing at once share one request."""
+        scheduler = RequestScheduler()
+        calls = []
+
+        def request():
+            calls.append(1)
+            time.sleep(0.1)
+            return len(calls)
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(scheduler.call("binance", "btc", request)))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(calls) == 1
+        assert results == [1] * 5
+
+    def test_adaptive_poll_interval(self):
+        """Test that polling speeds up as the spread nears the threshold."""
+        poller = AdaptivePoller(threshold_pct=0.2, min_interval=1.0, max_interval=10.0)
+        assert poller.next_interval(None) == 10.0
+        assert poller.next_interval(0.05) == 10.0
+        assert poller.next_interval(0.15) == pytest.approx(5.5)
+        assert poller.next_interval(0.3) == 1.0
@@ -0,0 +1,70 @@
+import sys
+import os
+import functools
+import time
+
+import numpy as np
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from trading_bot.sharded import ASK, BID, QuoteBoard, ShardedScanner, SimulatedFeed, shard_bounds
+from trading_bot.stream import BookTop
+
+
+class TestQuoteBoard:
+    def test_seqlock_read(self):
+        """Test that reads see whole quotes and give up on a cell whose write never finishes."""
+        board = QuoteBoard.create(["BTCUSDT", "ETHUSDT"], ["binance", "kraken"])
+        try:
+            other = QuoteBoard.attach(board.spec)  # A second mapping, as another process has
+            assert other.write_tops([BookTop("kraken", "ETHUSDT", 3000.0, 1, 3001.0, 1, 10.0),
+                                     BookTop("kraken", "DOGEUSDT", 0.1, 1, 0.2, 1, 10.0)]) == 1
+            values = board.read()
+            assert values[1, 1, BID] == 3000.0 and values[1, 1, ASK] == 3001.0
+            assert np.isnan(values[0]).all()
+
+            # A writer stopped between its two version bumps: the cell is never returned half-written
+            other.seq[1, 1] += 1
+            other.values[1, 1, BID] = 3100.0
+            values = board.read(1, 2, retries=3)
+            assert np.isnan(values[0, 1]).all() and board.torn_reads == 1
+            other.values[1, 1, ASK] = 3101.0
+            other.seq[1, 1] += 1
+            assert list(board.read(1, 2)[0, 1, :2]) == [3100.0, 3101.0]
+            other.close()
+        finally:
+            board.close()
+
+    def test_shard_bounds(self):
+        """Test that shards cover every row once, in near-equal contiguous ranges."""
+        assert shard_bounds(10, 3) == [(0, 3), (3, 7), (7, 10)]
+        assert shard_bounds(2, 4) == [(0, 1), (1, 2)]
+        assert shard_bounds(0, 4) == [(0, 0)]
+
+
+class TestShardedScanner:
+    def test_finds_spreads_across_processes(self):
+        """Test that scanner processes report every simulated dislocation of their shard."""
+        symbols = [f"SIM{i}USDT" for i in range(40)] + ["BTCUSDT", "ETHUSDT", "ETHBTC"]
+        prices = {"BTCUSDT": 60000.0, "ETHUSDT": 3000.0, "ETHBTC": 0.05}
+        feeds = {
+            "binance": functools.partial(SimulatedFeed, "binance", symbols, volatility_pct=0, prices=prices),
+            "kraken": functools.partial(SimulatedFeed, "kraken", symbols, skew_pct=1.0, volatility_pct=0,
+                                        prices=prices),
+        }
+        found = {}
+        triangles = []
+        with ShardedScanner(symbols, feeds, workers=2, threshold_pct=0.5, feed_interval=0.05,
+                            scan_interval=0.05, triangle_min_profit_pct=0.01) as scanner:
+            deadline = time.time() + 20
+            while len(found) < len(symbols) and time.time() < deadline:
+                for result in scanner.poll_results():
+                    for o in result.spreads:
+                        found[o.symbol] = o
+                    triangles.extend(result.triangles)
+        assert set(found) == set(symbols)
+        assert all(o.buy_venue == "binance" and o.sell_venue == "kraken" for o in found.values())
+        # Kraken's skew also lifts ETHBTC, which opens a 1% triangle there and none on Binance
+        assert triangles and {venue for venue, _ in triangles} == {"kraken"}
+        assert abs(triangles[-1][1].profit_pct - 1.0) < 1e-6
@@ -0,0 +1,74 @@
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from trading_bot.backtest import Backtest
+from trading_bot.stats import OnlineStats
+from test_backtest import ThresholdStrategy, make_data
+
+
+def max_drawdown_pct(equity, initial_equity):
+    """Reference drawdown from the whole curve: largest % drop from a running peak that starts at initial_equity."""
+    peak = np.maximum.accumulate(np.maximum(equity, initial_equity))
+    return max(0.0, float(((peak - equity) / peak * 100).max()))
+
+
+def random_curve(rows=1000, seed=3):
+    rng = np.random.default_rng(seed)
+    equity = 1000 * np.cumprod(1 + rng.normal(0, 0.01, rows))
+    positions = rng.integers(0, 2, rows)
+    timestamps = np.arange(rows, dtype=np.int64) * 60_000_000_000  # One tick a minute
+    return equity, positions, timestamps
+
+
+class TestOnlineStats:
+    def test_matches_full_curve_statistics(self):
+        """Test that the running values equal the ones computed from the whole curve."""
+        equity, positions, timestamps = random_curve()
+        stats = OnlineStats(1000.0)
+        for value, held, ts in zip(equity, positions, timestamps):
+            stats.update(value, held, ts)
+        returns = np.diff(np.concatenate(([1000.0], equity))) / np.concatenate(([1000.0], equity[:-1]))
+        snapshot = stats.snapshot()
+        assert snapshot["max_drawdown_pct"] == pytest.approx(max_drawdown_pct(equity, 1000.0))
+        assert snapshot["volatility"] == pytest.approx(returns.std(ddof=1))
+        assert snapshot["sharpe"] == pytest.approx(returns.mean() / returns.std(ddof=1))
+        assert snapshot["exposure_pct"] == pytest.approx(positions.mean() * 100)
+        assert snapshot["max_drawdown_seconds"] == snapshot["max_drawdown_ticks"] * 60
+
+    def test_chunked_extend_equals_per_tick_updates(self):
+        """Test that feeding arrays in chunks gives the same statistics as tick by tick."""
+        equity, positions, timestamps = random_curve()
+        one_by_one = OnlineStats(1000.0)
+        for value, held, ts in zip(equity, positions, timestamps):
+            one_by_one.update(value, held, ts)
+        chunked = OnlineStats(1000.0)
+        for start in range(0, len(equity), 137):
+            chunked.extend(equity[start:start + 137], positions[start:start + 137], timestamps[start:start + 137])
+        expected = one_by_one.snapshot()
+        for key, value in chunked.snapshot().items():
+            assert value == pytest.approx(expected[key]), key
+
+    def test_win_rate_and_turnover(self):
+        """Test that sells are scored against the average buy price."""
+        stats = OnlineStats(1000.0)
+        stats.record_trade("buy", 2, 100.0)
+        stats.record_trade("sell", 1, 110.0)  # Win
+        stats.record_trade("sell", 1, 90.0)  # Loss
+        snapshot = stats.snapshot()
+        assert snapshot["win_rate_pct"] == 50.0
+        assert snapshot["turnover"] == pytest.approx(0.4)
+
+    def test_backtest_modes_agree_without_equity_curve(self):
+        """Test that both backtest modes report the same statistics, with the curve off."""
+        data = make_data()
+        tick = Backtest(initial_capital=1000, record_equity=False).run(data, ThresholdStrategy(), mode="tick")
+        vectorized = Backtest(initial_capital=1000).run(data, ThresholdStrategy(), mode="vectorized")
+        assert len(tick["equity_curve"]) == 0
+        for key in ("max_drawdown_ticks", "sharpe", "sortino", "win_rate_pct", "turnover", "exposure_pct"):
+            assert tick[key] == pytest.approx(vectorized[key]), key
@@ -1,5 +1,6 @@
 import sys
 import os
+import subprocess
 
 # Add src to path so we can import our modules
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
@@ -29,4 +30,19 @@ class TestStrategy:
     def test_buy_signal_for_negative_even_price(self):
         """Test that strategy returns buy signal for negative even prices."""
         result = self.strategy.on_tick({"price": -10})
-        assert result == {"side": "buy", "qty": 1} 
\ No newline at end of file
+        assert result == {"side": "buy", "qty": 1} 
+
+class TestLeanImports:
+    def test_live_modules_do_not_import_pandas(self):
+        """Test that the live path loads without pandas/numpy and Backtest loads them lazily."""
+        src = os.path.join(os.path.dirname(__file__), '..', 'src')
+        code = (
+            "import sys; sys.path.insert(0, %r)\n"
+            "import trading_bot\n"
+            "from trading_bot.strategy import ArbitrageStrategy\n"
+            "from trading_bot.stream import BookTopCache\n"
+            "assert 'pandas' not in sys.modules and 'numpy' not in sys.modules\n"
+            "trading_bot.Backtest\n"
+            "assert 'pandas' in sys.modules\n" % src
+        )
+        subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,126 @@
+import sys
+import os
+import json
+import time
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from trading_bot.stream import (BookTopCache, LineSocketTransport, MarketDataFeed, ReplayServer,
+                                ReplayTransport, WebSocketTransport, parse_binance_book_ticker,
+                                parse_kraken_ticker)
+from trading_bot.strategy import ArbitrageStrategy
+
+
+def binance_frame(bid, ask, symbol="BTCUSDT"):
+    return json.dumps({"stream": f"{symbol.lower()}@bookTicker",
+                       "data": {"u": 1, "s": symbol, "b": str(bid), "B": "1.5", "a": str(ask), "A": "2.0"}})
+
+
+def kraken_frame(bid, ask, symbol="BTC/USDT"):
+    return json.dumps({"channel": "ticker", "type": "update",
+                       "data": [{"symbol": symbol, "bid": bid, "bid_qty": 0.5, "ask": ask, "ask_qty": 0.7}]})
+
+
+class FakeSocket:
+    """Stands in for a websocket-client connection: plays its frames, then reads "" like a closed socket."""
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+
+    def recv(self):
+        return self.frames.pop(0) if self.frames else ""
+
+    def close(self):
+        pass
+
+
+class DroppingWebSocket(WebSocketTransport):
+    """WebSocketTransport whose server closes the connection after each session's frames."""
+
+    def __init__(self, sessions):
+        super().__init__()
+        self.sessions = sessions
+        self.connects = 0
+
+    def connect(self, url):
+        if self.connects >= len(self.sessions):
+            raise ConnectionRefusedError("server gone")
+        self._ws = FakeSocket(self.sessions[self.connects])
+        self.connects += 1
+
+
+class TestParsers:
+    def test_binance_book_ticker(self):
+        """Test that combined-stream bookTicker frames become BookTops."""
+        (top,) = parse_binance_book_ticker(binance_frame(100.0, 100.5), received_ts=1.0)
+        assert (top.exchange, top.symbol, top.bid, top.ask, top.bid_qty) == ("binance", "BTCUSDT", 100.0, 100.5, 1.5)
+        assert top.mid == 100.25
+
+    def test_kraken_ticker_and_control_frames(self):
+        """Test that Kraken symbols are normalized and heartbeats are ignored."""
+        (top,) = parse_kraken_ticker(kraken_frame(99.0, 99.5))
+        assert (top.exchange, top.symbol) == ("kraken", "BTCUSDT")
+        assert parse_kraken_ticker(json.dumps({"channel": "heartbeat"})) == []
+
+
+class TestMarketDataFeed:
+    def test_cache_reports_only_changes(self):
+        """Test that identical tops are not reported as changes."""
+        cache = BookTopCache()
+        (top,) = parse_binance_book_ticker(binance_frame(100.0, 100.5), received_ts=1.0)
+        assert cache.update(top)
+        assert not cache.update(top._replace(received_ts=2.0))
+        assert cache.get("binance", "BTCUSDT").received_ts == 2.0
+
+    def test_replay_transport_feeds_callbacks(self, caplog):
+        """Test that a replayed stream fills the cache and fires callbacks, logging bad frames."""
+        frames = [(0.0, binance_frame(100, 101)), (0.0, binance_frame(100, 101)), (0.0, "{not json"),
+                  (0.0, binance_frame(102, 103))]
+        cache, seen = BookTopCache(), []
+        feed = MarketDataFeed("binance", ["BTCUSDT"], cache, seen.append, transport=ReplayTransport(frames))
+        feed.start().wait(5)
+        assert [top.bid for top in seen] == [100.0, 102.0]
+        assert cache.get("binance", "BTCUSDT").ask == 103.0
+        assert any("Skipping bad frame from binance" in record.getMessage() for record in caplog.records)
+
+    def test_live_feed_reconnects_when_server_closes(self):
+        """Test that a closed live socket leads to a reconnect instead of ending the feed."""
+        transport = DroppingWebSocket([[binance_frame(100, 101)], [binance_frame(102, 103)]])
+        cache, seen = BookTopCache(), []
+        feed = MarketDataFeed("binance", ["BTCUSDT"], cache, seen.append, transport=transport,
+                              reconnect_delay=0.01).start()
+        deadline = time.time() + 5
+        while len(seen) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        feed.stop()
+        assert [top.bid for top in seen] == [100.0, 102.0]
+        assert transport.connects == 2
+
+    def test_strategy_detects_spread_through_replay_server(self):
+        """Test the full path: local replay server -> socket feed -> strategy callback."""
+        strategy = ArbitrageStrategy(min_spread_pct=0.2)
+        cache, signals = BookTopCache(), []
+
+        def on_change(top):
+            signal = strategy.on_book_update(top, cache)
+            if signal:
+                signals.append(signal)
+
+        binance = ReplayServer([(0.0, binance_frame(60000, 60010))]).start()
+        kraken = ReplayServer([(0.0, kraken_frame(60400, 60410))]).start()
+        try:
+            feeds = [
+                MarketDataFeed("binance", ["BTCUSDT"], cache, on_change, transport=LineSocketTransport(), url=binance.url),
+                MarketDataFeed("kraken", ["BTCUSDT"], cache, on_change, transport=LineSocketTransport(), url=kraken.url),
+            ]
+            for feed in feeds:
+                feed.start()
+            for feed in feeds:
+                feed.wait(5)
+        finally:
+            binance.stop()
+            kraken.stop()
+        assert signals  # Both feeds may see the pair complete at the same moment
+        assert signals[0]["buy_exchange"] == "binance"
+        assert signals[0]["sell_exchange"] == "kraken"